@@ -1,8 +1,50 @@
+import time
+import inspect
+from .instrumentation import instrumented, mark_speak
+from .speech import get_speech_pipeline
+from .skill_registry import get_skill_registry
+
+
+def load_skills(core):
+    """
+    Skills del paquete para NeoCore: {nombre: LazySkill}. Ahora solo se
+    cargan las de `loader.eager`; el resto al dispararse una de sus
+    intenciones o, con el asistente en reposo, en el precalentamiento.
+    Los tiempos de carga quedan en core.skill_registry.timings.
+    """
+    registry = get_skill_registry(core)
+    registry.load_eager()
+    registry.warm_up()
+    return registry.proxies()
+
+
 class BaseSkill:
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # Handlers (métodos públicos que reciben `response`): tiempos por llamada
+        for name, value in list(vars(cls).items()):
+            if name.startswith('_') or not inspect.isfunction(value) or getattr(value, 'instrumented', False):
+                continue
+            if 'response' in inspect.signature(value).parameters:
+                setattr(cls, name, instrumented(value))
+
     def __init__(self, core):
         from modules.logger import app_logger
         self.core = core
         self.logger = app_logger
 
-    def speak(self, text):
-        self.core.event_queue.put({'type': 'speak', 'text': text})
+    def speak(self, text, progress=False):
+        """
+        Dice `text`. Con `progress=True` es un aviso ("Buscando...") que no se
+        llega a decir si la respuesta sale antes de la ventana de agrupado.
+        """
+        mark_speak()
+        self.core.last_speak_time = time.time()
+        get_speech_pipeline(self.core).say(text, progress=progress, source=type(self).__name__)
+
+    def set_speaker_status(self, status):
+        # Queda también en core para quien lo consulte sin leer la cola (p.ej. ScanScheduler)
+        self.core.speaker_status = status
+        # Lo dicho antes del cambio de estado sale antes que el evento
+        get_speech_pipeline(self.core).flush()
+        self.core.event_queue.put({'type': 'speaker_status', 'status': status})
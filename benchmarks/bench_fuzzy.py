@@ -0,0 +1,119 @@
+"""
+Benchmark de FuzzyMatcher con consultas mal reconocidas.
+
+Genera un índice sintético de nombres en español, mete los archivos objetivo
+y mide recall@5 y latencia (p50/p99) de consultas como las que devuelve el
+reconocedor de voz cuando se equivoca. COMMON son objetivos hechos de las
+mismas palabras que el relleno: casi todos sus trigramas son comunes.
+
+Uso: python benchmarks/bench_fuzzy.py [num_archivos]
+"""
+import os
+import sys
+import time
+import random
+import importlib
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(ROOT))
+PACKAGE = os.path.basename(ROOT)
+fuzzy = importlib.import_module(f"{PACKAGE}.fuzzy")
+name_index = importlib.import_module(f"{PACKAGE}.name_index")
+
+WORDS = [
+    "informe", "factura", "foto", "vacaciones", "proyecto", "notas", "copia", "contrato",
+    "presupuesto", "nomina", "recibo", "horario", "examen", "apuntes", "cancion", "video",
+    "boda", "cumple", "playa", "reunion", "acta", "plano", "manual", "guia", "receta",
+]
+EXTENSIONS = ["pdf", "jpg", "png", "txt", "docx", "mp3", "odt", "xlsx"]
+
+# (lo que entiende el reconocedor, archivo que el usuario quería)
+MISHEARD = [
+    ("vacasiones ibiza", "vacaciones_ibiza.jpg"),
+    ("bacaciones ibisa", "vacaciones_ibiza.jpg"),
+    ("curriculum vite", "curriculum_vitae.pdf"),
+    ("curiculum bitae punto pe de efe", "curriculum_vitae.pdf"),
+    ("yave wifi", "llave_wifi.txt"),
+    ("la llabe del wifi", "llave_wifi.txt"),
+    ("ipoteca", "hipoteca_banco.pdf"),
+    ("hipoteka banco", "hipoteca_banco.pdf"),
+    ("jenealogia familia", "genealogia_familia.odt"),
+    ("zelebración cumpleaños", "celebracion_cumpleanos.png"),
+    ("selebrasion cumpleanos", "celebracion_cumpleanos.png"),
+    ("declarasion renta", "declaracion_renta_2022.pdf"),
+    ("declaración de la renta", "declaracion_renta_2022.pdf"),
+    ("guitarra acordes", "acordes_guitarra.txt"),
+    ("presentasion cliente", "presentacion_cliente.odp"),
+    ("esquema red casa", "esquema_red_casa.png"),
+    ("exquema red", "esquema_red_casa.png"),
+    ("boz grabada", "voz_grabada.mp3"),
+    ("inventario almazen", "inventario_almacen.xlsx"),
+    ("cheque regalo jota pe ge", "cheque_regalo.jpg"),
+]
+
+COMMON = [
+    ("informe factura final", "informe_factura_final.pdf"),
+    ("imforme fatura final", "informe_factura_final.pdf"),
+    ("foto playa boda", "foto_playa_boda.jpg"),
+    ("foto playa voda", "foto_playa_boda.jpg"),
+    ("notas reunion acta", "notas_reunion_acta.txt"),
+    ("apuntes examen guia", "apuntes_examen_guia.odt"),
+    ("apuntes esamen gia", "apuntes_examen_guia.odt"),
+]
+
+
+def build_index(size, seed=7):
+    rng = random.Random(seed)
+    names = name_index.NameIndex()
+    now = time.time()
+    # Los objetivos en posiciones al azar: los ids recientes no tienen ventaja
+    targets = {rng.randrange(size): target for _, target in MISHEARD + COMMON}
+    for i in range(size):
+        if i in targets:
+            names.add(f"/home/usuario/Documentos/{targets[i]}", now)
+        words = rng.sample(WORDS, 2)
+        name = f"{words[0]}_{words[1]}_{i}.{rng.choice(EXTENSIONS)}"
+        depth = "/".join(rng.sample(WORDS, rng.randint(0, 4)))
+        names.add(f"/home/usuario/{depth}/{name}", now - rng.random() * 3e7)
+    return names
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    start = time.perf_counter()
+    names = build_index(size)
+    print(f"Índice: {len(names)} nombres en {time.perf_counter() - start:.1f}s")
+
+    matcher = fuzzy.FuzzyMatcher(names)
+    for label, cases in [("mal reconocidas", MISHEARD), ("trigramas comunes", COMMON)]:
+        print(f"{label}:")
+        run(matcher, cases)
+
+
+def run(matcher, cases):
+    latencies = []
+    hits = 0
+    for _ in range(5):
+        for query, target in cases:
+            t0 = time.perf_counter()
+            results = matcher.search(query, limit=5)
+            latencies.append((time.perf_counter() - t0) * 1000)
+            if any(os.path.basename(r['path']) == target for r in results):
+                hits += 1
+    for query, target in cases:
+        results = matcher.search(query, limit=5)
+        found = [os.path.basename(r['path']) for r in results]
+        mark = "ok  " if target in found else "FAIL"
+        print(f"  {mark} {query!r:40} -> {found[:1]}")
+
+    total = len(cases) * 5
+    print(f"  recall@5: {hits / total:.0%}")
+    print(f"  latencia: p50 {percentile(latencies, 50):.2f} ms, p99 {percentile(latencies, 99):.2f} ms")
+
+if __name__ == "__main__":
+    main()
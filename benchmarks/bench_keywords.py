@@ -0,0 +1,75 @@
+"""
+Micro-benchmark del matcher de palabras clave de FinderSkill.
+
+Compara el bucle `key in text.lower()` sobre todas las claves con el
+KeywordMatcher compilado (regex en forma de trie), para configuraciones de
+10 a 5000 claves, con frases que aciertan y que no.
+
+Uso: python benchmarks/bench_keywords.py [repeticiones]
+"""
+import os
+import sys
+import time
+import random
+import importlib
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(ROOT))
+PACKAGE = os.path.basename(ROOT)
+keywords = importlib.import_module(f"{PACKAGE}.keywords")
+
+SYLLABLES = ['ap', 'ache', 'ng', 'inx', 'sys', 'log', 'kern', 'auth', 'mail', 'cron', 'dock', 'er',
+             'post', 'gres', 'my', 'sql', 'red', 'is', 'nfs', 'samba', 'cups', 'ssh', 'ufw', 'xorg']
+PHRASES = ["búscame el log de {key} por favor", "enséñame el archivo de configuración del jardín"]
+
+
+def make_keys(n, rng):
+    keys = set()
+    while len(keys) < n:
+        keys.add(''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))))
+    return sorted(keys)
+
+
+def naive(mapping, text):
+    for key, value in mapping.items():
+        if key in text.lower():
+            return key, value
+    return None
+
+
+def timed(func, text, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func(text)
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def main():
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    rng = random.Random(1)
+    print(f"{'claves':>7} {'compilar':>10} {'bucle (acierto)':>16} {'matcher':>9} {'bucle (fallo)':>14} {'matcher':>9}")
+    for n in (10, 100, 1000, 5000):
+        keys = make_keys(n, rng)
+        mapping = {key: [f"/var/log/{key}.log"] for key in keys}
+        start = time.perf_counter()
+        matcher = keywords.KeywordMatcher(mapping)
+        build = (time.perf_counter() - start) * 1e3
+
+        # Acierto con la última clave: el peor caso del bucle
+        hit = PHRASES[0].format(key=keys[-1])
+        miss = PHRASES[1]
+        assert matcher.find(hit)[0] in hit
+        assert matcher.find(miss) is None and naive(mapping, miss) is None
+        print(f"{n:>7} {build:>8.1f}ms {timed(lambda t: naive(mapping, t), hit, repeat):>14.1f}µs "
+              f"{timed(matcher.find, hit, repeat):>7.1f}µs {timed(lambda t: naive(mapping, t), miss, repeat):>12.1f}µs "
+              f"{timed(matcher.find, miss, repeat):>7.1f}µs")
+
+    cache = keywords.PathCache()
+    paths = ["/var/log/syslog", "/var/log/no-existe.log", "/etc/hostname"]
+    cache.warm(paths)
+    print(f"primera ruta existente: os.path.exists {timed(lambda p: next((x for x in p if os.path.exists(x)), None), paths, repeat):.1f}µs, "
+          f"PathCache {timed(cache.first_existing, paths, repeat):.1f}µs")
+
+
+if __name__ == "__main__":
+    main()
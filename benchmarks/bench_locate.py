@@ -0,0 +1,127 @@
+"""
+Benchmark de la base de datos locate de FinderSkill.
+
+Genera un árbol sintético (solo el listado, sin tocar el disco), construye la
+base de datos y mide la latencia de búsqueda en el proceso para subcadenas,
+globs, filtros por clase y consultas sin resultados.
+
+La comparación con el camino anterior (un subproceso) se hace sobre un árbol
+real más pequeño creado en un directorio temporal: la misma consulta con la
+base de datos, con `find -iname` sobre ese árbol y, si está instalado, con
+`locate -i` (que usa la base del sistema, no ese árbol).
+
+Uso: python benchmarks/bench_locate.py [nº de archivos] [nº de archivos en disco]
+"""
+import os
+import sys
+import time
+import random
+import shutil
+import tempfile
+import importlib
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(ROOT))
+PACKAGE = os.path.basename(ROOT)
+locate_db = importlib.import_module(f"{PACKAGE}.locate_db")
+walker = importlib.import_module(f"{PACKAGE}.walker")
+
+WORDS = ['informe', 'factura', 'foto', 'vacaciones', 'borrador', 'notas', 'proyecto', 'canción',
+         'backup', 'config', 'datos', 'manual', 'README', 'IMG', 'año', 'final']
+EXTENSIONS = ['pdf', 'txt', 'md', 'jpg', 'PNG', 'mp3', 'log', 'json', 'py', 'c', 'h', 'so', 'html']
+QUERIES = [('factura', None), ('*.png', None), ('IMG_*.jpg', None), ('*informe*final*', None), ('vacaciones', [b'I']),
+           ('canción', [b'A']), ('zzzzqq', None), ('*.zzz', None)]
+
+
+class SyntheticWalker:
+    """Imita ParallelWalker.walk con un árbol generado al vuelo."""
+
+    def __init__(self, n_files, per_dir=20, seed=1):
+        self.n_files = n_files
+        self.per_dir = per_dir
+        self.seed = seed
+
+    def walk(self, roots, with_stats=False):
+        rng = random.Random(self.seed)
+        produced = 0
+        i = 0
+        while produced < self.n_files:
+            path = f"{roots[0]}/{rng.choice(WORDS)}{i % 50}/{rng.choice(WORDS)}_{i}"
+            files = [(f"{rng.choice(WORDS)}_{rng.choice(WORDS)}_{j}.{rng.choice(EXTENSIONS)}", None)
+                     for j in range(self.per_dir)]
+            produced += len(files)
+            i += 1
+            yield walker.DirListing(path, 0, files, [])
+
+
+def timed(func, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = func()
+    return (time.perf_counter() - start) / repeat, result
+
+
+def materialize(folder, n_files):
+    """Crea en disco (archivos vacíos) el mismo tipo de árbol que SyntheticWalker."""
+    for listing in SyntheticWalker(n_files).walk([folder]):
+        os.makedirs(listing.path, exist_ok=True)
+        for name, _ in listing.files:
+            open(os.path.join(listing.path, name), 'wb').close()
+
+
+def compare_subprocess(n_files, repeat=5):
+    folder = tempfile.mkdtemp()
+    try:
+        tree = os.path.join(folder, "arbol")
+        materialize(tree, n_files)
+        path = os.path.join(folder, "locate.db")
+        locate_db.build_locate_db(path, walker.ParallelWalker(exclude=[]), [tree])
+        db = locate_db.LocateDB(path)
+        print(f"frente a un subproceso ({n_files} archivos reales):")
+        seconds, results = timed(lambda: db.search('factura', limit=20), repeat)
+        print(f"  base de datos          {seconds * 1e3:7.2f} ms  {len(results)} resultados")
+        db.close()
+
+        def find():
+            output = subprocess.run(['find', tree, '-type', 'f', '-iname', '*factura*'],
+                                    capture_output=True, text=True).stdout
+            return output.splitlines()[:20]
+        seconds, results = timed(find, repeat)
+        print(f"  find -iname            {seconds * 1e3:7.2f} ms  {len(results)} resultados")
+        if shutil.which('locate'):
+            args = ['locate', '-i', '-l', '20', 'factura']
+            seconds, _ = timed(lambda: subprocess.run(args, capture_output=True), repeat)
+            print(f"  locate -i (base del sistema) {seconds * 1e3:7.2f} ms")
+    finally:
+        shutil.rmtree(folder)
+
+
+def main():
+    n_files = int(sys.argv[1]) if len(sys.argv) > 1 else 500000
+    disk_files = int(sys.argv[2]) if len(sys.argv) > 2 else 20000
+    folder = tempfile.mkdtemp()
+    path = os.path.join(folder, "locate.db")
+    try:
+        start = time.perf_counter()
+        locate_db.build_locate_db(path, SyntheticWalker(n_files), ['/home/usuario'])
+        print(f"construcción: {n_files} archivos en {time.perf_counter() - start:.2f}s, "
+              f"{os.path.getsize(path) / 1e6:.1f} MB")
+
+        start = time.perf_counter()
+        db = locate_db.LocateDB(path)
+        print(f"apertura (mmap): {(time.perf_counter() - start) * 1e3:.2f} ms")
+
+        for query, classes in QUERIES:
+            seconds, results = timed(lambda: db.search(query, limit=20, classes=classes), 20)
+            label = f"{query} [{b''.join(classes).decode()}]" if classes else query
+            print(f"  {label:<22} {seconds * 1e3:7.2f} ms  {len(results)} resultados")
+        db.close()
+    finally:
+        shutil.rmtree(folder)
+
+    compare_subprocess(disk_files)
+
+
+if __name__ == "__main__":
+    main()
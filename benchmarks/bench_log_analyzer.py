@@ -0,0 +1,98 @@
+"""
+Benchmark del analizador de logs en streaming.
+
+Genera logs sintéticos (formato de app.log con trazas de Python y un volcado
+de journald en formato export) y mide el throughput en MB/s de la detección,
+agrupación de trazas y agregación por firma.
+
+Uso: python benchmarks/bench_log_analyzer.py [MB]
+"""
+import os
+import sys
+import time
+import random
+import logging
+import importlib
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(ROOT))
+PACKAGE = os.path.basename(ROOT)
+log_analyzer = importlib.import_module(f"{PACKAGE}.log_analyzer")
+
+MESSAGES = [
+    "Wake word detected", "Intent recognized: consultar_estado", "Speaking response",
+    "Mango inference finished in 412 ms", "Scan complete. 120331 files indexed",
+    "Connected to MQTT broker at 192.168.1.20", "Playing /home/usuario/Música/lista.mp3",
+]
+ERRORS = [
+    "ERROR - Connection refused to 127.0.0.1:{port} (pid {pid})",
+    "ERROR - Could not open /var/lib/neo/cache/{hex}.bin",
+    "CRITICAL - Out of memory while loading model at 0x{hex}",
+]
+TRACEBACK = (
+    "ERROR - Unhandled exception in skill handler\n"
+    "Traceback (most recent call last):\n"
+    "  File \"/opt/neo/modules/skills/system.py\", line {line}, in check_status\n"
+    "    cpu = self.core.sysadmin_manager.get_cpu_usage()\n"
+    "ValueError: invalid literal for int() with base 10: '{hex}'\n"
+)
+
+
+def text_log(size, rng):
+    chunks = []
+    total = 0
+    second = 0
+    while total < size:
+        second += 1
+        stamp = time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime(1.7e9 + second)) + f",{rng.randint(0, 999):03d}"
+        roll = rng.random()
+        if roll < 0.01:
+            line = f"{stamp} - neo - " + TRACEBACK.format(line=rng.randint(10, 400), hex=f"{rng.getrandbits(32):x}")
+        elif roll < 0.03:
+            line = f"{stamp} - neo - " + rng.choice(ERRORS).format(
+                port=rng.randint(1000, 9000), pid=rng.randint(100, 40000), hex=f"{rng.getrandbits(48):x}") + "\n"
+        else:
+            line = f"{stamp} - neo - INFO - {rng.choice(MESSAGES)}\n"
+        chunks.append(line)
+        total += len(line)
+    return ''.join(chunks).encode()
+
+
+def journal_export(size, rng):
+    chunks = []
+    total = 0
+    cursor = 0
+    while total < size:
+        cursor += 1
+        priority = 3 if rng.random() < 0.02 else 6
+        message = f"Failed to start backup.service (code {rng.randint(1, 9)})" if priority == 3 else rng.choice(MESSAGES)
+        record = (
+            f"__CURSOR=s=abc;i={cursor:x}\n__REALTIME_TIMESTAMP={1700000000000000 + cursor * 1000}\n"
+            f"PRIORITY={priority}\n_SYSTEMD_UNIT=neo.service\nMESSAGE={message}\n\n"
+        )
+        chunks.append(record)
+        total += len(record)
+    return ''.join(chunks).encode()
+
+
+def measure(name, data, kind):
+    analyzer = log_analyzer.LogAnalyzer([], logging.getLogger("bench"), cursor=object())
+    start = time.perf_counter()
+    events = analyzer.feed(data, name, kind)
+    elapsed = time.perf_counter() - start
+    mb = len(data) / 1e6
+    print(f"{name:8} {mb:6.1f} MB en {elapsed:.2f}s -> {mb / elapsed:6.1f} MB/s, "
+          f"{len(events)} eventos, {len(analyzer.signatures)} firmas")
+    for entry in analyzer.top(3):
+        print(f"         {entry['count']:6}x {entry['signature'][:90]}")
+
+
+def main():
+    size = int(float(sys.argv[1]) * 1e6) if len(sys.argv) > 1 else 50 * 10**6
+    rng = random.Random(7)
+    measure("app.log", text_log(size, rng), 'text')
+    measure("journal", journal_export(size, rng), 'journal')
+
+
+if __name__ == "__main__":
+    main()
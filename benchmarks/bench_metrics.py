@@ -0,0 +1,55 @@
+"""
+Benchmark del coste del muestreador de métricas.
+
+Mide el tiempo de CPU por muestra y el overhead resultante con el intervalo
+por defecto (objetivo: < 0.5% de una CPU), y lo compara con leer los mismos
+valores abriendo los ficheros de /proc en cada consulta.
+
+Uso: python benchmarks/bench_metrics.py [segundos]
+"""
+import os
+import sys
+import time
+import importlib
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(ROOT))
+PACKAGE = os.path.basename(ROOT)
+metrics = importlib.import_module(f"{PACKAGE}.metrics")
+
+
+def main():
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 5.0
+
+    sampler = metrics.MetricsSampler()
+    samples = 2000
+    start = time.thread_time()
+    for _ in range(samples):
+        sampler.sample()
+    per_sample = (time.thread_time() - start) / samples
+    print(f"coste por muestra: {per_sample * 1e6:.0f} µs de CPU")
+    print(f"overhead estimado cada {metrics.DEFAULT_INTERVAL:.0f}s: {100 * per_sample / metrics.DEFAULT_INTERVAL:.4f}%")
+
+    start = time.thread_time()
+    for _ in range(samples):
+        for path in ('/proc/stat', '/proc/meminfo', '/proc/net/dev', '/proc/loadavg'):
+            with open(path, 'rb') as f:
+                f.read()
+    print(f"abriendo /proc cada vez: {(time.thread_time() - start) / samples * 1e6:.0f} µs de CPU por muestra")
+
+    # Medido en marcha, con el hilo real y el intervalo por defecto
+    sampler = metrics.MetricsSampler()
+    sampler.start()
+    time.sleep(seconds)
+    print(f"overhead medido en {seconds:.0f}s: {100 * sampler.overhead():.4f}% ({sampler.samples} muestras)")
+    print(f"CPU {sampler.current('cpu'):.1f}%  RAM {sampler.current('ram'):.1f}%  disco {sampler.current('disk'):.1f}%")
+
+    start = time.perf_counter()
+    for _ in range(10000):
+        sampler.averages('cpu')
+        sampler.trend('ram')
+    print(f"consulta de medias 1/5/15 + tendencia: {(time.perf_counter() - start) / 10000 * 1e6:.1f} µs")
+
+
+if __name__ == "__main__":
+    main()
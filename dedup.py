@@ -0,0 +1,192 @@
+"""
+Huellas de contenido y detección de duplicados sobre el índice de archivos.
+
+Para no leer más de lo necesario se filtra en tres etapas:
+1. Agrupar por tamaño (ya está en el índice, no cuesta nada).
+2. Solo en tamaños repetidos: hash del primer y último bloque.
+3. Solo si también coinciden: hash completo leyendo en bloques grandes.
+
+Las huellas se guardan con la firma (tamaño, mtime, inodo) del archivo, así
+que un archivo que no ha cambiado no se vuelve a leer nunca.
+"""
+import os
+import json
+import hashlib
+import threading
+
+HASH_FILE = "data/files_hashes.json"
+EDGE_BLOCK = 64 * 1024
+CHUNK = 1024 * 1024
+DEFAULT_MIN_SIZE = 4096
+
+
+def human_size(size):
+    for unit in ['bytes', 'KB', 'MB', 'GB']:
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == 'bytes' else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} TB"
+
+
+def edge_hash(path, size):
+    """Hash del primer y último bloque (el archivo entero si es pequeño)."""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        digest.update(f.read(EDGE_BLOCK))
+        if size > 2 * EDGE_BLOCK:
+            f.seek(-EDGE_BLOCK, os.SEEK_END)
+            digest.update(f.read(EDGE_BLOCK))
+        elif size > EDGE_BLOCK:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def full_hash(path):
+    digest = hashlib.blake2b(digest_size=32)
+    with open(path, 'rb', buffering=0) as f:
+        buffer = bytearray(CHUNK)
+        view = memoryview(buffer)
+        while True:
+            read = f.readinto(buffer)
+            if not read:
+                break
+            digest.update(view[:read])
+    return digest.hexdigest()
+
+
+class DuplicateFinder:
+    """
+    Calcula huellas de los candidatos a duplicado de un FileIndex.
+
+    `hashes` = {ruta: [tamaño, mtime, inodo, hash_bordes, hash_completo]};
+    si la firma no coincide con la del índice, la entrada se descarta.
+    """
+
+    def __init__(self, index, logger, hash_file=HASH_FILE, min_size=DEFAULT_MIN_SIZE):
+        self.index = index
+        self.logger = logger
+        self.hash_file = hash_file
+        self.min_size = min_size
+        self.lock = threading.Lock()
+        self.hashes = {}
+        self.groups = []
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.hash_file):
+            return
+        try:
+            with open(self.hash_file, 'r') as f:
+                self.hashes = json.load(f)
+            self.groups = self._group(self.hashes)
+        except Exception as e:
+            self.logger.error(f"Error loading file hashes: {e}")
+
+    def _group(self, hashes):
+        """Grupos de rutas con el mismo hash completo, primero los que más espacio desperdician."""
+        by_full = {}
+        for path, entry in hashes.items():
+            if entry[4] and entry[0] >= self.min_size:
+                by_full.setdefault(entry[4], []).append(path)
+        groups = [sorted(paths) for paths in by_full.values() if len(paths) > 1]
+        groups.sort(key=lambda paths: hashes[paths[0]][0] * (len(paths) - 1), reverse=True)
+        return groups
+
+    def _save(self):
+        folder = os.path.dirname(self.hash_file)
+        if folder and not os.path.exists(folder):
+            os.makedirs(folder)
+        tmp = self.hash_file + ".tmp"
+        with open(tmp, 'w') as f:
+            json.dump(self.hashes, f)
+        os.replace(tmp, self.hash_file)
+
+    def _files(self):
+        # Copia bajo el lock del índice: el watcher puede estar modificándolo
+        with self.index.lock:
+            return [
+                (os.path.join(folder, name), tuple(signature))
+                for folder, record in self.index.dirs.items()
+                for name, signature in record['files'].items()
+            ]
+
+    def update(self, throttle=None):
+        """
+        Recalcula los grupos de duplicados. Devuelve cuántos archivos se han
+        tenido que leer (0 si nada ha cambiado desde la última vez).
+        """
+        with self.lock:
+            by_size = {}
+            for path, signature in self._files():
+                if signature[0] >= self.min_size:
+                    by_size.setdefault(signature[0], []).append((path, signature))
+
+            hashes = {}
+            read = 0
+            for size, files in by_size.items():
+                if len(files) < 2:
+                    continue
+                by_edge = {}
+                for path, signature in files:
+                    entry = self._cached(path, signature)
+                    if entry[3] is None:
+                        if throttle:
+                            throttle()
+                        try:
+                            entry[3] = edge_hash(path, size)
+                            read += 1
+                        except OSError:
+                            continue
+                    hashes[path] = entry
+                    by_edge.setdefault(entry[3], []).append(entry + [path])
+
+                for candidates in by_edge.values():
+                    if len(candidates) < 2:
+                        continue
+                    for candidate in candidates:
+                        path = candidate[5]
+                        entry = hashes[path]
+                        if entry[4] is None:
+                            if throttle:
+                                throttle()
+                            try:
+                                entry[4] = full_hash(path)
+                                read += 1
+                            except OSError:
+                                continue
+
+            self.hashes = hashes
+            self.groups = self._group(hashes)
+            try:
+                self._save()
+            except Exception as e:
+                self.logger.error(f"Error saving file hashes: {e}")
+            self._publish(hashes)
+            return read
+
+    def _cached(self, path, signature):
+        entry = self.hashes.get(path)
+        if entry and tuple(entry[:3]) == signature:
+            return list(entry)
+        return list(signature) + [None, None]
+
+    def _publish(self, hashes):
+        # Si la base de datos lo admite, las huellas quedan junto al índice
+        db = self.index.core.db
+        if hasattr(db, 'update_file_hashes'):
+            try:
+                db.update_file_hashes([(path, entry[4]) for path, entry in hashes.items() if entry[4]])
+            except Exception as e:
+                self.logger.error(f"Error storing file hashes in DB: {e}")
+
+    def wasted_space(self):
+        total = 0
+        for paths in self.groups:
+            entry = self.hashes.get(paths[0])
+            if entry:
+                total += entry[0] * (len(paths) - 1)
+        return total
+
+    def largest_files(self, limit=5):
+        """Los archivos más grandes del índice (sin leer nada del disco)."""
+        return self.index.largest_files(limit)
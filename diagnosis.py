@@ -1,6 +1,15 @@
 import os
 import re
+import time
+import threading
+from collections import deque
 from . import BaseSkill
+from .log_tail import tail_lines, LogCursor
+from .log_analyzer import get_log_analyzer, error_signature
+from .diagnosis_cache import DiagnosisCache
+from .scan_scheduler import lower_priority
+from .health_monitor import get_health_monitor
+from .instrumentation import span
 
 class DiagnosisSkill(BaseSkill):
     """
@@ -11,17 +20,50 @@ class DiagnosisSkill(BaseSkill):
     def __init__(self, core=None):
         super().__init__(core)
         self.log_file = "logs/app.log" 
+        # Últimas líneas del log en memoria; cada diagnóstico solo lee lo añadido.
+        # El cursor no se guarda: tras reiniciar se vuelve a leer la cola, que
+        # cuesta lo mismo que seguir desde un cursor guardado
+        self.recent_lines = deque()
+        self.cursor = LogCursor(None, self.logger)
+        self.analyzer = None
+        self.cache = None
+        self.monitor = None
+        self.analyzing = set()  # firmas con un diagnóstico en segundo plano
+        self.analyzing_lock = threading.Lock()
+
+        config = self._config()
+        if config.get('enable_health_monitor', False):
+            self.monitor = get_health_monitor(core, self.logger)
+            self.monitor.start()
+        if config.get('precompute_diagnoses', False):
+            threading.Thread(target=self._precompute_loop, args=(config,), daemon=True).start()
+
+    def _config(self):
+        if not self.core:
+            return {}
+        return self.core.skills_config.get('diagnosis', {}).get('config', {})
 
     def realizar_diagnostico(self, command, response, **kwargs):
         """
         Punto de entrada principal para la intención 'realizar_diagnostico'.
         """
-        self.speak("Iniciando diagnóstico del sistema. Dame un segundo para leer los registros...")
+        # Con el monitor en marcha el estado ya está calculado: respuesta inmediata
+        if self.monitor and self.monitor.state:
+            self._report_monitor_state()
+            return
+
+        self.speak("Iniciando diagnóstico del sistema. Dame un segundo para leer los registros...", progress=True)
         
         # 1. Escanear logs
         errors = self._scan_logs_for_errors(lines=50)
         
+        # Errores repetidos en el resto de logs (sistema, journald)
+        recurring = self._recurring_errors(exclude_sources=[self.log_file])
+
         if not errors:
+            if recurring:
+                self._report_recurring(recurring)
+                return
             self.speak("He revisado los últimos registros y no veo errores críticos recientes. Todo parece normal.")
             return
 
@@ -36,6 +78,54 @@ class DiagnosisSkill(BaseSkill):
         else:
             self.speak(f"El error dice: {first_error['summary']}. Te sugiero revisar el log manualmente.")
 
+        if recurring:
+            self._report_recurring(recurring)
+
+    def _get_analyzer(self):
+        if self.analyzer is None:
+            self.analyzer = get_log_analyzer(self.core, self.logger)
+        return self.analyzer
+
+    def _report_monitor_state(self):
+        self.speak(self.monitor.summary())
+        top = self.monitor.state['top_errors']
+        if not top:
+            return
+        error = top[0]
+        times = "una vez" if error['count'] == 1 else f"{error['count']} veces"
+        self.speak(f"El error más repetido ({times}) es: {error['sample'].splitlines()[-1][:100]}")
+        if not self.core.ai_engine:
+            return
+        # La respuesta rápida no espera al modelo: sin diagnóstico en caché se pide en segundo plano
+        analysis = self._get_cache().get(error['signature'])
+        if analysis:
+            self.speak(analysis)
+        elif self._analyze_in_background(error['sample'], error['signature']):
+            self.speak("Estoy analizando la causa; te lo cuento en cuanto lo tenga.")
+
+    def _recurring_errors(self, limit=3, exclude_sources=None):
+        """Errores agregados por firma en todas las fuentes (solo lee lo nuevo)."""
+        try:
+            analyzer = self._get_analyzer()
+            # Si el monitor está en marcha es él quien lee los logs
+            if not (self.monitor and self.monitor.running):
+                analyzer.poll()
+            return analyzer.top(limit, exclude_sources=exclude_sources)
+        except Exception as e:
+            self.logger.error(f"Error analyzing logs: {e}")
+            return []
+
+    def _report_recurring(self, recurring):
+        top = recurring[0]
+        source = os.path.basename(top['source'])
+        times = "una vez" if top['count'] == 1 else f"{top['count']} veces"
+        self.speak(f"En {source} se repite un error {times}: {top['sample'].splitlines()[-1][:100]}")
+        # Si ya se diagnosticó en segundo plano, la explicación sale sin esperar al modelo
+        # (es un sondeo: que no esté no cuenta como fallo de la caché)
+        analysis = self._get_cache().peek(top['signature'])
+        if analysis:
+            self.speak(analysis)
+
     def _scan_logs_for_errors(self, lines=50):
         """Lee las últimas N líneas y busca patrones de error/critical."""
         found_errors = []
@@ -43,32 +133,50 @@ class DiagnosisSkill(BaseSkill):
             if not os.path.exists(self.log_file):
                 return []
 
-            with open(self.log_file, 'r') as f:
-                # Leer últimas lineas
-                # Forma eficiente para archivos grandes: seek al final y leer bloques hacia atrás
-                # Simplificación: leer todo si no es gigante, o usar deque
-                from collections import deque
-                last_lines = deque(f, maxlen=lines)
-                
-                for line in last_lines:
-                    if "ERROR" in line or "CRITICAL" in line or "Exception" in line:
-                        # Limpiar timestamp para el resumen
-                        parts = line.split(" - ")
-                        summary = parts[-1].strip() if len(parts) > 1 else line.strip()
-                        
-                        found_errors.append({
-                            'full_text': line.strip(),
-                            'summary': summary[:100] # Primeros 100 chars
-                        })
+            for line in self._recent_lines(lines):
+                if "ERROR" in line or "CRITICAL" in line or "Exception" in line:
+                    # Limpiar timestamp para el resumen
+                    parts = line.split(" - ")
+                    summary = parts[-1].strip() if len(parts) > 1 else line.strip()
+                    
+                    found_errors.append({
+                        'full_text': line.strip(),
+                        'summary': summary[:100] # Primeros 100 chars
+                    })
         except Exception as e:
             print(f"Error scanning logs: {e}")
             
         return found_errors
 
+    def _recent_lines(self, lines):
+        """
+        Últimas `lines` líneas del log sin leerlo entero: la primera vez (o si
+        el log ha rotado) se lee la cola hacia atrás desde el final; después
+        solo los bytes añadidos desde el cursor.
+        """
+        if self.recent_lines and self.recent_lines.maxlen == lines:
+            new, continuous = self.cursor.read_new(self.log_file, max_bytes=1024 * 1024)
+            if not continuous:
+                self.recent_lines.clear()
+            self.recent_lines.extend(new)
+        else:
+            tail, end = tail_lines(self.log_file, lines)
+            self.recent_lines = deque(tail, maxlen=lines)
+            self.cursor.seek_end(self.log_file, end)
+        return list(self.recent_lines)
+
     def _analyze_with_ai(self, error_text):
         """
         Usa Gemma/LLM para generar una explicación amigable y una propuesta de solución.
         """
+        # El mismo error repetido no vuelve a pasar por el modelo
+        signature = error_signature(error_text)
+        cached = self._get_cache().get(signature)
+        if cached:
+            return cached
+        return self._generate_diagnosis(error_text, signature)
+
+    def _generate_diagnosis(self, error_text, signature):
         prompt = (
             f"Actúa como un ingeniero de sistemas experto. Analiza el siguiente error de log:\n"
             f"'{error_text}'\n"
@@ -76,10 +184,76 @@ class DiagnosisSkill(BaseSkill):
             f"2. Propón una solución técnica concreta (comando o cambio de config) pero NO la ejecutes.\n"
             f"Respuesta muy concisa (máximo 2 frases)."
         )
-        
+
         # Usamos el chat manager o ai_engine directamente
         try:
-            response = self.core.ai_engine.generate(prompt, max_length=150)
+            with span('ai'):
+                response = self.core.ai_engine.generate(prompt, max_length=150)
+            if response:
+                self._get_cache().put(signature, response)
             return response
         except Exception:
             return "No he podido generar un diagnóstico detallado, pero el error parece importante."
+
+    def _analyze_in_background(self, error_text, signature):
+        """
+        Diagnostica `error_text` en otro hilo y lo dice al terminar. Devuelve
+        False si ese error ya se está analizando.
+        """
+        with self.analyzing_lock:
+            if signature in self.analyzing:
+                return False
+            self.analyzing.add(signature)
+
+        def run():
+            try:
+                # Quien lo pide ya ha mirado la caché
+                analysis = self._generate_diagnosis(error_text, signature)
+                if analysis:
+                    self.speak(analysis)
+            finally:
+                with self.analyzing_lock:
+                    self.analyzing.discard(signature)
+
+        threading.Thread(target=run, daemon=True).start()
+        return True
+
+    def _get_cache(self):
+        if self.cache is None:
+            config = self._config()
+            self.cache = DiagnosisCache(
+                max_entries=config.get('ai_cache_size', 500),
+                ttl=config.get('ai_cache_ttl', 168) * 3600,
+                logger=self.logger
+            )
+        return self.cache
+
+    def cache_stats(self):
+        """Aciertos/fallos de la caché de diagnósticos."""
+        return self._get_cache().stats()
+
+    def _precompute_loop(self, config):
+        """
+        Con el asistente en reposo, diagnostica por adelantado los errores más
+        repetidos que aún no están en caché, para que la respuesta sea inmediata.
+        """
+        lower_priority(self.logger)
+        interval = config.get('precompute_interval', 600)
+        quiet = config.get('precompute_quiet_after_speech', 60)
+        while True:
+            time.sleep(interval)
+            if not self.core.ai_engine:
+                continue
+            try:
+                cache = self._get_cache()
+                for entry in self._recurring_errors(limit=config.get('precompute_top', 5)):
+                    if cache.peek(entry['signature']) is not None:
+                        continue
+                    if getattr(self.core, 'speaker_status', 'idle') == 'busy':
+                        break
+                    if time.time() - getattr(self.core, 'last_speak_time', 0) < quiet:
+                        break
+                    self._analyze_with_ai(entry['sample'])
+                self.logger.debug(f"Diagnosis cache: {cache.stats()}")
+            except Exception as e:
+                self.logger.error(f"Error precomputing diagnoses: {e}")
@@ -0,0 +1,128 @@
+"""
+Caché persistente de diagnósticos de la IA por firma de error.
+
+La misma traza puede repetirse cientos de veces al día; la explicación del
+modelo es la misma. Las entradas se indexan por la firma normalizada de
+log_analyzer.error_signature (sin fechas, PIDs, direcciones ni rutas) y se
+expulsan por LRU y por antigüedad (TTL). Se guarda en disco en otro hilo,
+como mucho una vez cada `save_interval` segundos y de forma atómica.
+"""
+import os
+import json
+import time
+import threading
+from collections import OrderedDict
+
+CACHE_FILE = "data/diagnosis_cache.json"
+DEFAULT_MAX_ENTRIES = 500
+DEFAULT_TTL = 7 * 24 * 3600
+SAVE_INTERVAL = 5.0
+
+
+class DiagnosisCache:
+    """LRU + TTL; las altas se guardan agrupadas (ver flush)."""
+
+    def __init__(self, path=CACHE_FILE, max_entries=DEFAULT_MAX_ENTRIES, ttl=DEFAULT_TTL, logger=None,
+                 save_interval=SAVE_INTERVAL):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.logger = logger
+        self.save_interval = save_interval
+        self.save_pending = False
+        self.saved_at = 0.0
+        self.lock = threading.Lock()
+        self.save_lock = threading.Lock()
+        self.entries = OrderedDict()  # firma -> [diagnóstico, creado]
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+            now = time.time()
+            # Se guardan de menos a más reciente, así se conserva el orden LRU
+            for signature, entry in data:
+                if now - entry[1] < self.ttl:
+                    self.entries[signature] = entry
+        except Exception as e:
+            if self.logger:
+                self.logger.error(f"Error loading diagnosis cache: {e}")
+
+    def _schedule_save(self):
+        if self.save_pending:
+            return
+        self.save_pending = True
+        delay = max(0.0, self.save_interval - (time.monotonic() - self.saved_at))
+        timer = threading.Timer(delay, self.flush)
+        timer.daemon = True
+        timer.start()
+
+    def flush(self):
+        """Escribe la caché ya (write + rename)."""
+        with self.lock:
+            entries = list(self.entries.items())
+            self.save_pending = False
+            self.saved_at = time.monotonic()
+        try:
+            folder = os.path.dirname(self.path)
+            if folder and not os.path.exists(folder):
+                os.makedirs(folder)
+            tmp = self.path + ".tmp"
+            with self.save_lock:
+                with open(tmp, 'w') as f:
+                    json.dump(entries, f)
+                os.replace(tmp, self.path)
+        except Exception as e:
+            if self.logger:
+                self.logger.error(f"Error saving diagnosis cache: {e}")
+
+    def get(self, signature):
+        with self.lock:
+            entry = self.entries.get(signature)
+            if entry and time.time() - entry[1] >= self.ttl:
+                del self.entries[signature]
+                self.evictions += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(signature)
+            self.hits += 1
+            return entry[0]
+
+    def peek(self, signature):
+        """Como get, pero sin contar acierto/fallo ni tocar el orden LRU (para sondeos)."""
+        with self.lock:
+            entry = self.entries.get(signature)
+            if entry and time.time() - entry[1] < self.ttl:
+                return entry[0]
+            return None
+
+    def __contains__(self, signature):
+        return self.peek(signature) is not None
+
+    def put(self, signature, diagnosis):
+        with self.lock:
+            self.entries[signature] = [diagnosis, time.time()]
+            self.entries.move_to_end(signature)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+            self._schedule_save()
+
+    def stats(self):
+        with self.lock:
+            total = self.hits + self.misses
+            return {
+                'entries': len(self.entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / total, 3) if total else 0.0,
+                'evictions': self.evictions
+            }
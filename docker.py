@@ -1,4 +1,6 @@
 from . import BaseSkill
+from .executor import get_executor
+from .instrumentation import span
 import logging
 import json
 
@@ -17,7 +19,8 @@ class DockerSkill(BaseSkill):
         # 1. Intentar inferencia si Mango está disponible
         cmd_to_run = None
         if hasattr(self.core, 'mango_manager') and self.core.mango_manager:
-            mango_cmd, mango_conf = self.core.mango_manager.infer(command)
+            with span('ai'):
+                mango_cmd, mango_conf = self.core.mango_manager.infer(command)
             if mango_cmd and mango_conf > 0.6:
                 self.logger.info(f"MANGO (Docker Status) sugirió: {mango_cmd} ({mango_conf})")
                 cmd_to_run = mango_cmd
@@ -26,14 +29,16 @@ class DockerSkill(BaseSkill):
         if not cmd_to_run:
             cmd_to_run = "docker ps --format 'table {{.Names}}\t{{.Status}}\t{{.Image}}'"
 
-        # 3. Ejecutar
-        success, output = self.core.sysadmin_manager.run_command(cmd_to_run)
-        
-        if success:
-            # Smart Filtering se encargará de resumirlo si es largo en NeoCore
-            return f"Estado de contenedores ({cmd_to_run}):\n{output}"
-        else:
-            return f"Error ejecutando '{cmd_to_run}'. ¿Docker está corriendo?"
+        # 3. Ejecutar en la cola 'docker' sin bloquear al que despacha la intención
+        #    (el comando de Mango puede llevar tuberías, de ahí la shell)
+        def finished(result):
+            if result.ok:
+                self.speak(f"Estado de contenedores ({cmd_to_run}):\n{result.stdout}")
+            elif not result.cancelled:
+                self.speak(f"Error ejecutando '{cmd_to_run}'. ¿Docker está corriendo?")
+
+        self.speak("Consultando Docker...", progress=True)
+        get_executor(self.core).run(cmd_to_run, kind='docker', shell=True, timeout=20, on_done=finished)
 
     def accion_contenedor(self, command, params, response):
         """
@@ -47,7 +52,8 @@ class DockerSkill(BaseSkill):
         container_name = params.get('container_name')
         
         # Pasamos la frase completa a MANGO
-        mango_cmd, mango_conf = self.core.mango_manager.infer(command)
+        with span('ai'):
+            mango_cmd, mango_conf = self.core.mango_manager.infer(command)
         
         if mango_cmd and mango_conf > 0.6 and "docker" in mango_cmd:
             self.logger.info(f"MANGO sugirió: {mango_cmd} (Conf: {mango_conf})")
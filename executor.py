@@ -0,0 +1,242 @@
+"""
+Ejecución compartida de comandos externos para las skills.
+
+Cada clase de comando ('query', 'heavy', 'docker', 'network', ...) tiene su
+propio pool de hilos, así que su tamaño es el límite de concurrencia y un
+`apt-get upgrade` en 'heavy' nunca ocupa el hueco de un `systemctl` rápido.
+
+Los comandos se lanzan sin shell salvo que se pida explícitamente, con
+timeout, límite de salida capturada, lectura en streaming línea a línea
+(`on_line`) y cancelación (se mata el grupo de procesos entero).
+"""
+import os
+import time
+import signal
+import threading
+import subprocess
+from concurrent.futures import ThreadPoolExecutor, CancelledError
+from .instrumentation import span
+
+DEFAULT_LIMITS = {'default': 4, 'query': 4, 'docker': 2, 'network': 1, 'heavy': 1}
+DEFAULT_TIMEOUT = 30
+DEFAULT_MAX_OUTPUT = 1024 * 1024
+KILL_GRACE = 3
+
+_shared_lock = threading.Lock()
+
+
+def get_executor(core):
+    """CommandExecutor compartido por todas las skills."""
+    with _shared_lock:
+        executor = getattr(core, 'command_executor', None)
+        if executor is None:
+            config = core.skills_config.get('executor', {}).get('config', {})
+            executor = CommandExecutor(dict(DEFAULT_LIMITS, **config.get('limits', {})))
+            core.command_executor = executor
+        return executor
+
+
+class CommandResult:
+    def __init__(self, args):
+        self.args = args
+        self.returncode = None
+        self.stdout = ''
+        self.stderr = ''
+        self.truncated = False
+        self.cut = False  # cortado a propósito tras max_lines
+        self.timed_out = False
+        self.cancelled = False
+        self.duration = 0.0
+
+    @property
+    def ok(self):
+        # Si lo matamos tras max_lines, su código de salida (-SIGTERM) no es un fallo
+        return (self.returncode == 0 or self.cut) and not self.timed_out and not self.cancelled
+
+    def __repr__(self):
+        return f"CommandResult({self.args!r}, returncode={self.returncode}, timed_out={self.timed_out})"
+
+
+class CommandHandle:
+    """Comando en cola o en marcha: se puede esperar o cancelar."""
+
+    def __init__(self, args, kind='default'):
+        self.args = args
+        self.kind = kind
+        self.future = None
+        self.process = None
+        self.cancelled = threading.Event()
+
+    def result(self, timeout=None):
+        try:
+            return self.future.result(timeout)
+        except CancelledError:
+            result = CommandResult(self.args)
+            result.cancelled = True
+            return result
+
+    def done(self):
+        return self.future.done()
+
+    def cancel(self):
+        """Cancela el comando: lo saca de la cola o mata su grupo de procesos."""
+        self.cancelled.set()
+        if self.future.cancel():
+            return
+        _terminate(self.process)
+
+
+def _terminate(process):
+    if process is None or process.poll() is not None:
+        return
+    try:
+        os.killpg(process.pid, signal.SIGTERM)
+        try:
+            process.wait(KILL_GRACE)
+        except subprocess.TimeoutExpired:
+            os.killpg(process.pid, signal.SIGKILL)
+    except (ProcessLookupError, PermissionError):
+        pass
+
+
+class CommandExecutor:
+    def __init__(self, limits=None):
+        self.limits = dict(limits or DEFAULT_LIMITS)
+        self.pools = {}
+        self.running = set()
+        self.lock = threading.Lock()
+
+    def _pool(self, kind):
+        with self.lock:
+            pool = self.pools.get(kind)
+            if pool is None:
+                workers = self.limits.get(kind, self.limits.get('default', 4))
+                pool = self.pools[kind] = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"cmd-{kind}")
+            return pool
+
+    def run(self, args, kind='default', timeout=DEFAULT_TIMEOUT, max_output=DEFAULT_MAX_OUTPUT,
+            shell=False, on_line=None, on_done=None, max_lines=None, env=None, cwd=None):
+        """
+        Encola el comando y devuelve un CommandHandle sin bloquear.
+
+        `on_line(línea)` recibe la salida estándar según llega; `max_lines`
+        corta el comando tras N líneas (como `| head -n N`, con result.cut); `on_done(result)`
+        se llama al terminar, también si se cancela o vence el timeout.
+        """
+        handle = CommandHandle(args, kind)
+        handle.future = self._pool(kind).submit(
+            self._execute, handle, args, timeout, max_output, shell, on_line, max_lines, env, cwd
+        )
+        if on_done:
+            handle.future.add_done_callback(lambda _: on_done(handle.result()))
+        return handle
+
+    def run_sync(self, args, **kwargs):
+        """Como run, pero espera al resultado (solo bloquea al que llama)."""
+        with span('subprocess'):
+            return self.run(args, **kwargs).result()
+
+    def call(self, func, *args, kind='default', on_done=None, **kwargs):
+        """Ejecuta una función bloqueante (p.ej. un speedtest de sysadmin) en el pool de su clase."""
+        future = self._pool(kind).submit(func, *args, **kwargs)
+        if on_done:
+            future.add_done_callback(lambda f: on_done(_outcome(f)))
+        return future
+
+    def cancel_all(self, kind=None):
+        with self.lock:
+            handles = [h for h in self.running if kind is None or h.kind == kind]
+        for handle in handles:
+            handle.cancel()
+        return len(handles)
+
+    def _execute(self, handle, args, timeout, max_output, shell, on_line, max_lines, env, cwd):
+        result = CommandResult(args)
+        if handle.cancelled.is_set():
+            result.cancelled = True
+            return result
+
+        start = time.monotonic()
+        try:
+            process = subprocess.Popen(
+                args, shell=shell, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                stdin=subprocess.DEVNULL, env=env, cwd=cwd, text=True, errors='replace',
+                bufsize=1, start_new_session=True
+            )
+        except OSError as e:
+            result.returncode = 127
+            result.stderr = str(e)
+            return result
+
+        handle.process = process
+        with self.lock:
+            self.running.add(handle)
+        # cancel() pudo llegar entre la comprobación de arriba y el Popen
+        if handle.cancelled.is_set():
+            _terminate(process)
+
+        def expire():
+            result.timed_out = True
+            _terminate(process)
+
+        timer = threading.Timer(timeout, expire) if timeout else None
+        if timer:
+            timer.daemon = True
+            timer.start()
+
+        stderr = []
+        reader = threading.Thread(target=_drain, args=(process.stderr, stderr, max_output), daemon=True)
+        reader.start()
+
+        stdout = []
+        size = 0
+        lines = 0
+        try:
+            for line in process.stdout:
+                lines += 1
+                if size < max_output:
+                    stdout.append(line)
+                    size += len(line)
+                else:
+                    result.truncated = True
+                if on_line:
+                    on_line(line.rstrip('\n'))
+                if max_lines and lines >= max_lines:
+                    # Si ya había salido por su cuenta, su código de salida vale
+                    result.cut = process.poll() is None
+                    _terminate(process)
+                    break
+            process.wait()
+        finally:
+            # Si on_line lanza una excepción el hijo no puede quedarse vivo
+            if process.poll() is None:
+                _terminate(process)
+                process.wait()
+            if timer:
+                timer.cancel()
+            reader.join(KILL_GRACE)
+            with self.lock:
+                self.running.discard(handle)
+
+        result.returncode = process.returncode
+        result.stdout = ''.join(stdout)[:max_output]
+        result.stderr = ''.join(stderr)
+        result.cancelled = handle.cancelled.is_set()
+        result.duration = time.monotonic() - start
+        return result
+
+
+def _outcome(future):
+    """Resultado de un future terminado, o la excepción (CancelledError si se canceló)."""
+    if future.cancelled():
+        return CancelledError()
+    error = future.exception()
+    return future.result() if error is None else error
+
+
+def _drain(stream, chunks, max_output):
+    size = 0
+    for line in stream:
+        if size < max_output:
+            chunks.append(line)
+            size += len(line)
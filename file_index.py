@@ -0,0 +1,594 @@
+"""
+Índice incremental de archivos para FilesSkill.
+
+En lugar de vaciar el índice y recorrer de nuevo todo `scan_paths`, se guarda
+el estado del último escaneo (mtime de cada directorio y (tamaño, mtime, inodo)
+de cada archivo) y solo se envían a la base de datos las altas, cambios y bajas.
+
+Las escrituras se hacen por lotes desde un hilo consumidor (IndexWriter), de
+forma que el recorrido del disco y las escrituras en la base de datos se solapan.
+
+El estado se guarda como snapshot binario (ver index_snapshot.py) que se abre
+con mmap al arrancar, así que cargarlo no cuesta nada aunque haya millones de
+archivos.
+"""
+import os
+import re
+import time
+import heapq
+import queue
+import fnmatch
+import threading
+from datetime import datetime
+from .walker import ParallelWalker, LiveSearch
+from .name_index import NameIndex
+from .fuzzy import FuzzyMatcher
+from .index_snapshot import SnapshotDirs, save_snapshot
+from .scan_scheduler import ScanAborted
+from .instrumentation import spanned
+
+SNAPSHOT_FILE = "data/files_index.snap"
+DEFAULT_BATCH_SIZE = 5000
+DEFAULT_MAX_PENDING = 50000
+STATE_SAVE_INTERVAL = 60
+LARGEST_KEPT = 20
+
+_shared_lock = threading.Lock()
+
+
+def get_file_index(core):
+    """FileIndex compartido por todas las skills que buscan archivos."""
+    with _shared_lock:
+        index = getattr(core, 'file_index', None)
+        if index is None:
+            index = FileIndex(core)
+            core.file_index = index
+        return index
+
+
+def find_files(core, pattern, root=None, limit=5, timeout=10):
+    """
+    Búsqueda de archivos dentro del proceso (sin `find` ni shell): primero el
+    índice y, si no hay nada, un recorrido paralelo de `root` que para a los
+    `limit` resultados o a los `timeout` segundos. Como `find -iname`: un
+    nombre sin comodines tiene que ser el nombre entero, y un glob cubre el
+    nombre entero. Devuelve (rutas, origen) con origen 'index' o 'walk'.
+    """
+    index = get_file_index(core)
+    roots = [os.path.expanduser(root)] if root else None
+    needle = pattern.lower()
+    if any(c in pattern for c in '*?['):
+        match = lambda name: fnmatch.fnmatch(name.lower(), needle)
+        # Para el índice se usa el trozo literal más largo del glob y se filtra después
+        query = max(re.split(r'[*?\[\]]', pattern), key=len)
+    else:
+        match = lambda name: name.lower() == needle
+        query = pattern
+    if len(query) >= 3:
+        results = index.search(query, limit=200) or []
+        paths = [
+            r['path'] for r in results
+            if match(os.path.basename(r['path'])) and (not roots or is_under(r['path'], roots))
+        ]
+        if paths:
+            return paths[:limit], 'index'
+
+    search_roots = roots or index.config.get('scan_paths') or [os.path.expanduser("~")]
+    search = LiveSearch(ParallelWalker.from_config(index.config), search_roots, pattern,
+                        max_results=limit, timeout=timeout, match=match)
+    return list(search), 'walk'
+
+
+def _extension(name):
+    return name.split('.')[-1].lower() if '.' in name else ''
+
+
+def is_under(path, roots):
+    """True si `path` es alguna de las raíces o está dentro de ellas."""
+    for root in roots:
+        root = root.rstrip(os.sep) or os.sep
+        if path == root or path.startswith(root if root == os.sep else root + os.sep):
+            return True
+    return False
+
+
+class IndexWriter:
+    """
+    Consumidor que escribe en `core.db` por lotes.
+
+    El productor (el escaneo) llama a `upsert()` / `remove()`; las filas se
+    agrupan en lotes de `batch_size` y se encolan en una cola acotada, por lo
+    que nunca hay más de `max_pending` filas en memoria esperando a escribirse.
+    Cada lote va a `db.index_files_many()` (una transacción por lote). Con
+    `generation` las filas se escriben marcadas con ella, para poder borrar
+    después las que no se han vuelto a ver (`db.prune_file_index`).
+    """
+
+    def __init__(self, db, logger, batch_size=DEFAULT_BATCH_SIZE, max_pending=DEFAULT_MAX_PENDING,
+                 generation=None):
+        self.db = db
+        self.logger = logger
+        self.generation = generation
+        self.batch_size = max(1, batch_size)
+        self.queue = queue.Queue(maxsize=max(1, max_pending // self.batch_size))
+        self.upserts = []
+        self.removals = []
+        self.errors = 0
+        self.thread = None
+
+    def __enter__(self):
+        self.thread = threading.Thread(target=self._consume, daemon=True)
+        self.thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def upsert(self, row):
+        self.upserts.append(row)
+        if len(self.upserts) >= self.batch_size:
+            self._flush_upserts()
+
+    def remove(self, path):
+        self.removals.append(path)
+        if len(self.removals) >= self.batch_size:
+            self._flush_removals()
+
+    def _flush_upserts(self):
+        if self.upserts:
+            self.queue.put(('upsert', self.upserts))
+            self.upserts = []
+
+    def _flush_removals(self):
+        if self.removals:
+            self.queue.put(('remove', self.removals))
+            self.removals = []
+
+    def sync(self):
+        """Espera a que todo lo encolado hasta ahora esté escrito."""
+        self._flush_removals()
+        self._flush_upserts()
+        self.queue.join()
+
+    def close(self):
+        """Vacía los lotes pendientes y espera a que el consumidor termine."""
+        if not self.thread:
+            return
+        self._flush_removals()
+        self._flush_upserts()
+        self.queue.put(None)
+        self.thread.join()
+        self.thread = None
+
+    def _consume(self):
+        while True:
+            item = self.queue.get()
+            if item is None:
+                self.queue.task_done()
+                break
+            kind, rows = item
+            try:
+                if kind == 'upsert':
+                    self._write_upserts(rows)
+                else:
+                    self._write_removals(rows)
+            except Exception as e:
+                self.errors += 1
+                self.logger.error(f"Error writing file index batch ({len(rows)} rows): {e}")
+            finally:
+                self.queue.task_done()
+
+    def _write_upserts(self, rows):
+        if self.generation is not None:
+            self.db.index_files_many(rows, generation=self.generation)
+            return
+        if hasattr(self.db, 'index_files_many'):
+            self.db.index_files_many(rows)
+            return
+        # DB antigua sin API por lotes
+        for row in rows:
+            self.db.index_file(*row)
+
+    def _write_removals(self, paths):
+        if hasattr(self.db, 'remove_files_from_index'):
+            self.db.remove_files_from_index(paths)
+        else:
+            self.logger.warning(
+                f"DB has no remove_files_from_index(); {len(paths)} stale entries kept in the index."
+            )
+
+
+class FileIndex:
+    """
+    Mantiene sincronizado `core.db` con el sistema de archivos.
+
+    Si el mtime de un directorio no ha cambiado desde el último escaneo, su
+    listado tampoco (igual que hace updatedb), así que no se vuelve a leer;
+    pero editar un archivo en sitio no cambia el mtime del directorio, así
+    que sus archivos conocidos sí se vuelven a stat-ear.
+    """
+
+    def __init__(self, core, snapshot_file=SNAPSHOT_FILE):
+        self.core = core
+        self.snapshot_file = snapshot_file
+        self.lock = threading.Lock()       # estado en memoria (dirs, names, ...)
+        self.scan_lock = threading.Lock()  # un solo update() a la vez
+        self.dirs = {}
+        self.extensions = None
+        self.walk_options = None
+        self.last_scan = None
+        self.saved_at = 0
+        self.names = None
+        self.building_names = False
+        self.largest = []  # [[tamaño, ruta]] de los LARGEST_KEPT mayores, se rehace al guardar
+        self._load_state()
+
+    @property
+    def config(self):
+        return self.core.skills_config.get('files', {}).get('config', {})
+
+    def walker(self):
+        return ParallelWalker.from_config(self.config)
+
+    def _load_state(self):
+        try:
+            if not os.path.exists(self.snapshot_file):
+                return
+            self.dirs = SnapshotDirs(self.snapshot_file)
+            meta = self.dirs.meta
+            self.extensions = meta.get('extensions')
+            self.walk_options = meta.get('walk_options')
+            self.largest = meta.get('largest', [])
+            if meta.get('last_scan'):
+                self.last_scan = datetime.fromtimestamp(meta['last_scan'])
+        except Exception as e:
+            self.core.app_logger.error(f"Error loading file index state: {e}")
+            self.dirs = {}
+            self.extensions = None
+
+    def _save_state(self):
+        self.largest = self._write_snapshot(self.dirs, self.extensions, self.walk_options)
+
+    def _write_snapshot(self, dirs, extensions, walk_options):
+        """Escribe el snapshot de `dirs`; devuelve los archivos más grandes que guarda en la meta."""
+        largest = heapq.nlargest(LARGEST_KEPT, (
+            [signature[0], os.path.join(folder, name)]
+            for folder, record in dirs.items()
+            for name, signature in record['files'].items()
+        ))
+        meta = {
+            'extensions': extensions,
+            'walk_options': walk_options,
+            'last_scan': self.last_scan.timestamp() if self.last_scan else None,
+            'largest': largest
+        }
+        save_snapshot(self.snapshot_file, dirs, meta)
+        return largest
+
+    def _materialize(self):
+        """Pasa el snapshot mapeado a un dict antes de modificarlo en sitio."""
+        if not isinstance(self.dirs, dict):
+            self.dirs = dict(self.dirs.items())
+
+    def update(self, roots=None, throttle=None):
+        """
+        Ejecuta un escaneo incremental. Devuelve (altas/cambios, bajas).
+
+        El índice de la base de datos nunca se vacía mientras dura el escaneo,
+        así que las búsquedas siguen devolviendo resultados completos. Sin
+        estado previo (primera vez) todas las filas se escriben de nuevo con
+        una generación nueva y al terminar se borran las de generaciones
+        anteriores (`db.prune_file_index`); si cambia `scan_types` se releen
+        todos los directorios y se aplica la diferencia.
+
+        `self.lock` solo se toma al empezar y al sustituir el estado al final:
+        durante el recorrido el watcher, la búsqueda por nombre y los
+        duplicados siguen funcionando con el estado anterior.
+
+        Con `roots` solo se reescanean esos subárboles (lo usa el watcher
+        para los directorios que no ha podido vigilar).
+
+        `throttle()` se llama entre directorio y directorio (ver ScanScheduler):
+        puede bloquear para pausar el escaneo o lanzar ScanAborted. En los
+        escaneos completos se guarda un checkpoint cada `scan_checkpoint_interval`
+        segundos y al abortar, así que el siguiente escaneo continúa desde ahí.
+        """
+        with self.scan_lock:
+            with self.lock:
+                extensions = sorted(self.config.get('scan_types', []))
+                paths = self.config.get('scan_paths', []) if roots is None else roots
+                # Copia: refresh_dirs puede modificar self.dirs durante el recorrido
+                previous = self.dirs if isinstance(self.dirs, SnapshotDirs) else dict(self.dirs)
+                rebuild = roots is None and not previous
+                if rebuild:
+                    self.names = None
+
+            db = self.core.db
+            generation = None
+            if rebuild:
+                if hasattr(db, 'prune_file_index'):
+                    generation = time.time_ns()
+                else:
+                    self.core.app_logger.warning(
+                        "DB has no prune_file_index(); stale entries from before this rebuild are kept."
+                    )
+
+            counts = [0, 0]
+            new_dirs = {}
+
+            walker = self.walker()
+            walk_options = [walker.exclude, walker.one_file_system]
+            # Si cambian las exclusiones o los tipos, los listados guardados no valen (pero sí las firmas)
+            same_listing = walk_options == self.walk_options and extensions == self.extensions
+            reusable = previous if same_listing else {}
+
+            def reuse(path, mtime):
+                record = reusable.get(path)
+                if record and record['mtime'] == mtime:
+                    return record['subdirs']
+                return None
+
+            checkpoint_every = self.config.get('scan_checkpoint_interval', 600)
+            next_checkpoint = time.monotonic() + checkpoint_every
+            aborted = None
+
+            with self._writer(generation) as writer:
+                try:
+                    for listing in walker.walk(paths, match=self._matcher(extensions), reuse=reuse):
+                        new_dirs[listing.path] = self._record(listing, previous.get(listing.path), writer, counts)
+                        if throttle:
+                            throttle()
+                        # En una reconstrucción no hay estado previo con el que continuar
+                        if roots is None and not rebuild and time.monotonic() >= next_checkpoint:
+                            writer.sync()
+                            self._save_checkpoint(previous, new_dirs, extensions, walk_options, same_listing)
+                            next_checkpoint = time.monotonic() + checkpoint_every
+                except ScanAborted as e:
+                    aborted = e
+
+                if aborted is None:
+                    # Directorios que han desaparecido (o raíces quitadas de la config)
+                    scope = None if roots is None else [os.path.expanduser(r) for r in roots]
+                    for folder, old in previous.items():
+                        if folder not in new_dirs and (scope is None or is_under(folder, scope)):
+                            self._drop_files(folder, old, writer, counts)
+
+            if aborted is not None:
+                if roots is None and not rebuild:
+                    with self.lock:
+                        self._materialize()
+                        if not same_listing:
+                            self._invalidate_listings(self.dirs)
+                        self.dirs.update(new_dirs)
+                        self.extensions = extensions
+                        self.walk_options = walk_options
+                        self._persist()
+                raise aborted
+
+            if generation is not None and writer.errors:
+                self.core.app_logger.warning("File index rebuild had write errors; stale entries not pruned.")
+            elif generation is not None:
+                # Las filas de esta generación ya están todas escritas (writer cerrado)
+                try:
+                    db.prune_file_index(generation)
+                except Exception as e:
+                    self.core.app_logger.error(f"Error pruning stale file index entries: {e}")
+
+            with self.lock:
+                if roots is None:
+                    self.dirs = new_dirs
+                    self.extensions = extensions
+                    self.walk_options = walk_options
+                    self.last_scan = datetime.now()
+                else:
+                    self._materialize()
+                    self.dirs = {k: v for k, v in self.dirs.items() if not is_under(k, scope)}
+                    self.dirs.update(new_dirs)
+                self._persist()
+
+            return counts[0], counts[1]
+
+    @staticmethod
+    def _invalidate_listings(dirs):
+        """Con otros tipos u otras exclusiones, los listados no visitados se tienen que releer."""
+        for folder, record in list(dirs.items()):
+            dirs[folder] = dict(record, mtime=-1.0)
+
+    def _save_checkpoint(self, previous, new_dirs, extensions, walk_options, same_listing):
+        """
+        Guarda en disco el progreso de un escaneo a medias: los directorios ya
+        visitados con su estado nuevo y el resto con el anterior. Como las
+        escrituras de lo visitado ya están en la base de datos, si el proceso
+        muere el siguiente escaneo reutiliza esos directorios y sigue por
+        donde iba. El estado en memoria no se toca hasta que el escaneo acaba.
+        """
+        merged = dict(previous.items())
+        if not same_listing:
+            self._invalidate_listings(merged)
+        merged.update(new_dirs)
+        try:
+            self._write_snapshot(merged, extensions, walk_options)
+        except Exception as e:
+            self.core.app_logger.error(f"Error saving file index checkpoint: {e}")
+
+    def refresh_dirs(self, folders):
+        """
+        Relee solo los directorios indicados (sin bajar por sus subárboles).
+
+        Los subdirectorios nuevos se recorren enteros y los desaparecidos se
+        dan de baja. Devuelve (altas/cambios, bajas).
+        """
+        with self.lock:
+            self._materialize()
+            extensions = self.extensions or []
+            walker = self.walker()
+            match = self._matcher(extensions)
+            counts = [0, 0]
+            new_roots = []
+
+            with self._writer() as writer:
+                for folder in folders:
+                    old = self.dirs.get(folder)
+                    listing = walker.list_dir(folder, match=match)
+                    if listing is None:
+                        self._drop_subtree(folder, writer, counts)
+                        continue
+
+                    self.dirs[folder] = self._record(listing, old, writer, counts)
+                    previous_subdirs = set(old['subdirs']) if old else set()
+                    for name in set(listing.subdirs) - previous_subdirs:
+                        new_roots.append(os.path.join(folder, name))
+                    for name in previous_subdirs - set(listing.subdirs):
+                        self._drop_subtree(os.path.join(folder, name), writer, counts)
+
+                if new_roots:
+                    for listing in walker.walk(new_roots, match=match):
+                        self.dirs[listing.path] = self._record(listing, self.dirs.get(listing.path), writer, counts)
+
+            # Con ráfagas de eventos no se reescribe el estado en cada lote
+            if time.time() - self.saved_at >= STATE_SAVE_INTERVAL:
+                self._persist()
+            return counts[0], counts[1]
+
+    def _matcher(self, extensions):
+        def match(name):
+            return not extensions or _extension(name) in extensions
+        return match
+
+    def _record(self, listing, old, writer, counts):
+        if listing.files is None:
+            files = self._restat_dir(listing.path, old, writer, counts)
+        else:
+            files = self._diff_dir(listing, old, writer, counts)
+        return {'mtime': listing.mtime, 'files': files, 'subdirs': listing.subdirs}
+
+    def _restat_dir(self, folder, old, writer, counts):
+        """Directorio sin cambios: solo stat de sus archivos conocidos (sin scandir)."""
+        files = {}
+        for name, signature in old['files'].items():
+            path = os.path.join(folder, name)
+            try:
+                stats = os.stat(path)
+            except OSError:
+                self._remove(path, writer, counts)
+                continue
+            files[name] = self._signature(path, name, stats, signature, writer, counts)
+        return files
+
+    def _signature(self, path, name, stats, old_signature, writer, counts):
+        """Firma (tamaño, mtime, inodo) del archivo; si ha cambiado, lo manda a la DB."""
+        signature = [stats.st_size, stats.st_mtime, stats.st_ino]
+        if old_signature is None or list(old_signature) != signature:
+            self._upsert((
+                path,
+                name,
+                _extension(name),
+                stats.st_size,
+                datetime.fromtimestamp(stats.st_mtime)
+            ), stats.st_mtime, writer, counts)
+        return signature
+
+    def _drop_files(self, folder, record, writer, counts):
+        for name in record['files']:
+            self._remove(os.path.join(folder, name), writer, counts)
+
+    def _drop_subtree(self, folder, writer, counts):
+        for path in [k for k in self.dirs if is_under(k, [folder])]:
+            self._drop_files(path, self.dirs.pop(path), writer, counts)
+
+    def _upsert(self, row, mtime, writer, counts):
+        writer.upsert(row)
+        counts[0] += 1
+        if self.names is not None:
+            self.names.add(row[0], mtime)
+
+    def _remove(self, path, writer, counts):
+        writer.remove(path)
+        counts[1] += 1
+        if self.names is not None:
+            self.names.remove(path)
+
+    @spanned('index')
+    def search(self, query, limit=10):
+        """
+        Busca por nombre en el índice de trigramas en memoria.
+
+        El índice se construye en segundo plano a partir del estado la primera
+        vez que se pide. Mientras no esté listo devuelve None y el llamante
+        usa `db.search_files_index`.
+        """
+        if self.names is None:
+            self.load_names()
+            return None
+        return self.names.search(query, limit)
+
+    @spanned('index')
+    def fuzzy_search(self, query, limit=5):
+        """Búsqueda aproximada (fonética + distancia de edición). None si no está listo."""
+        if self.names is None or not self.names.phonetic:
+            self.load_names()
+            return None
+        return FuzzyMatcher(self.names).search(query, limit)
+
+    def load_names(self):
+        """Lanza la construcción del índice de nombres si aún no existe."""
+        if self.names is None and self.dirs and not self.building_names:
+            self.building_names = True
+            threading.Thread(target=self._build_names, daemon=True).start()
+
+    def _build_names(self):
+        try:
+            with self.lock:
+                names = NameIndex(phonetic=self.config.get('fuzzy_search', True))
+                for folder, record in self.dirs.items():
+                    for name, signature in record['files'].items():
+                        names._insert(os.path.join(folder, name), signature[1])
+                self.names = names
+            self.core.app_logger.info(f"File name index ready ({len(names)} entries).")
+        except Exception as e:
+            self.core.app_logger.error(f"Error building file name index: {e}")
+        finally:
+            self.building_names = False
+
+    def _persist(self):
+        self.saved_at = time.time()
+        try:
+            self._save_state()
+        except Exception as e:
+            self.core.app_logger.error(f"Error saving file index state: {e}")
+
+    def _writer(self, generation=None):
+        return IndexWriter(
+            self.core.db,
+            self.core.app_logger,
+            batch_size=self.config.get('index_batch_size', DEFAULT_BATCH_SIZE),
+            max_pending=self.config.get('index_max_pending', DEFAULT_MAX_PENDING),
+            generation=generation
+        )
+
+    def _diff_dir(self, listing, old, writer, counts):
+        """Compara los archivos de un directorio releído con el estado anterior."""
+        old_files = old['files'] if old else {}
+        files = {}
+        for name, stats in listing.files:
+            files[name] = self._signature(
+                os.path.join(listing.path, name), name, stats, old_files.get(name), writer, counts
+            )
+
+        for name in old_files:
+            if name not in files:
+                self._remove(os.path.join(listing.path, name), writer, counts)
+        return files
+
+    def largest_files(self, limit=5):
+        """
+        [(tamaño, ruta)] de los archivos más grandes. No toma el lock: sale de
+        la lista que se rehace al guardar el estado, así que responde también
+        durante un escaneo (con los datos del último guardado).
+        """
+        return [tuple(entry) for entry in self.largest[:limit]]
+
+    def file_count(self):
+        if isinstance(self.dirs, SnapshotDirs):
+            return self.dirs.file_count()
+        return sum(len(record['files']) for record in self.dirs.values())
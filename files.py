@@ -2,88 +2,178 @@ from modules.BlueberrySkills import BaseSkill
 import os
 import threading
 import time
-from datetime import datetime
+from .file_index import get_file_index
+from .walker import ParallelWalker, LiveSearch
+from .watcher import IndexWatcher, InotifyUnavailable
+from .fuzzy import normalize_spoken
+from .scan_scheduler import ScanScheduler, ScanAborted, lower_priority
+from .dedup import DuplicateFinder, human_size
+from .recent import get_recent_results
+from .instrumentation import span
 
 class FilesSkill(BaseSkill):
     def __init__(self, core):
         super().__init__(core)
         self.scanning = False
-        self.last_scan = None
-        self.last_scan = None
-        
-        # Force initial scan on startup (in background)
-        threading.Thread(target=self.run_indexing, daemon=True).start()
+        self.index = get_file_index(core)
+        self.last_scan = self.index.last_scan
+        self.watcher = None
+        self.live_search = None
+        self.scheduler = None
+        self.dedup = None
+        self.recent = get_recent_results(core)
         
+        # Con snapshot previo basta un escaneo incremental de puesta al día,
+        # retrasado para no competir con el arranque del resto del core
+        config = self.core.skills_config.get('files', {}).get('config', {})
+        delay = config.get('startup_scan_delay', 120) if self.last_scan else 0
         self.schedule_scan()
+        threading.Thread(target=self._startup_scan, args=(delay,), daemon=True).start()
+
+    def _startup_scan(self, delay):
+        if delay:
+            time.sleep(delay)
+        lower_priority(self.core.app_logger)
+        try:
+            self.run_indexing(throttle=self.scheduler.wait_idle if self.scheduler else None)
+        except ScanAborted:
+            self.core.app_logger.info("Startup scan stopped; progress saved.")
 
     def schedule_scan(self):
         """Inicia el scheduler de escaneo si está habilitado."""
         try:
             config = self.core.skills_config.get('files', {}).get('config', {})
             if config.get('enable_indexing', False):
-                interval = config.get('scan_interval', 24) * 3600
-                # Simple timer loop in a thread
-                threading.Thread(target=self._scan_loop, args=(interval,), daemon=True).start()
+                self.scheduler = ScanScheduler(self.core, config, self.run_indexing, self.last_scan)
+                self.scheduler.start()
         except Exception as e:
             self.core.app_logger.error(f"Error scheduling scan: {e}")
 
-    def _scan_loop(self, interval):
-        while True:
-            self.run_indexing()
-            time.sleep(interval)
-
-    def run_indexing(self):
-        """Ejecuta el escaneo e indexación."""
-        if self.scanning: return
+    def run_indexing(self, throttle=None):
+        """
+        Ejecuta el escaneo e indexación. Devuelve True solo si el escaneo se
+        ha completado (no si ya había otro en marcha o si ha fallado), para
+        que el planificador no lo cuente como hecho. ScanAborted (lanzado por
+        `throttle`) se propaga al llamante.
+        """
+        if self.scanning:
+            return False
         self.scanning = True
+        scanned = False
         self.core.app_logger.info("Starting file system scan...")
         
         try:
+            # Incremental: solo altas, cambios y bajas desde el último escaneo
+            changed, removed = self.index.update(throttle=throttle)
+            self.core.app_logger.info(
+                f"Scan complete. {self.index.file_count()} files indexed ({changed} new/changed, {removed} removed)."
+            )
+            self.last_scan = self.index.last_scan
+            scanned = True
+            if self.scheduler:
+                self.scheduler.last_scan = time.time()
+            # Precarga el índice de nombres para que la primera búsqueda no espere
             config = self.core.skills_config.get('files', {}).get('config', {})
-            paths = config.get('scan_paths', [])
-            extensions = config.get('scan_types', [])
-            
-            # Clear old index? Maybe partial updates are better, but for now full re-index is safer
-            self.core.db.clear_file_index()
-            
-            count = 0
-            count = 0
-            for raw_path in paths:
-                path = os.path.expanduser(raw_path)
-                if not os.path.exists(path): continue
-                for root, dirs, files in os.walk(path):
-                    for file in files:
-                        ext = file.split('.')[-1].lower() if '.' in file else ''
-                        if not extensions or ext in extensions:
-                            full_path = os.path.join(root, file)
-                            try:
-                                stats = os.stat(full_path)
-                                self.core.db.index_file(
-                                    full_path, 
-                                    file, 
-                                    ext, 
-                                    stats.st_size, 
-                                    datetime.fromtimestamp(stats.st_mtime)
-                                )
-                                count += 1
-                            except Exception as e:
-                                pass # Permission error etc
-            
-            self.core.app_logger.info(f"Scan complete. Indexed {count} files.")
-            self.last_scan = datetime.now()
+            if config.get('enable_indexing', False):
+                self.index.load_names()
+            # Huellas de contenido opcionales: solo se leen archivos nuevos o cambiados
+            if config.get('enable_dedup', False):
+                read = self.duplicates().update(throttle=throttle)
+                self.core.app_logger.info(f"Duplicate check complete ({read} files hashed).")
+        except ScanAborted:
+            raise
         except Exception as e:
             self.core.app_logger.error(f"Error during scan: {e}")
         finally:
             self.scanning = False
 
+        if scanned and not self.watcher:
+            self.start_watcher()
+        return scanned
+
+    def start_watcher(self):
+        """Arranca el watcher inotify si está habilitado (necesita un escaneo previo)."""
+        config = self.core.skills_config.get('files', {}).get('config', {})
+        if not config.get('enable_watcher', False):
+            return
+        try:
+            self.watcher = IndexWatcher(
+                self.index,
+                self.core.app_logger,
+                coalesce=config.get('watch_coalesce', 2.0),
+                poll_interval=config.get('watch_poll_interval', 600)
+            )
+            self.watcher.start()
+        except InotifyUnavailable as e:
+            self.core.app_logger.warning(f"File watcher disabled: {e}")
+
+    def duplicates(self):
+        if self.dedup is None:
+            config = self.core.skills_config.get('files', {}).get('config', {})
+            self.dedup = DuplicateFinder(self.index, self.core.app_logger, min_size=config.get('dedup_min_size', 4096))
+        return self.dedup
+
+    def find_duplicates(self, command, response, **kwargs):
+        """Comando de voz: "¿qué archivos están duplicados?" """
+        if self.scanning:
+            self.speak("Estoy escaneando los archivos; pregúntame de nuevo en un momento.")
+            return
+        dedup = self.duplicates()
+        if not dedup.groups and not dedup.hashes:
+            self.speak("Buscando archivos duplicados. Esto puede tardar un poco.")
+            threading.Thread(target=self._run_duplicates_async, daemon=True).start()
+            return
+        self._report_duplicates()
+
+    def _run_duplicates_async(self):
+        try:
+            self.duplicates().update()
+        except Exception as e:
+            self.speak(f"Hubo un error buscando duplicados: {e}")
+            return
+        self._report_duplicates()
+
+    def _report_duplicates(self):
+        dedup = self.duplicates()
+        if not dedup.groups:
+            self.speak("No he encontrado archivos duplicados.")
+            return
+        first = dedup.groups[0]
+        self.recent.add(first[0], source='files')
+        self.speak(
+            f"Hay {len(dedup.groups)} grupos de archivos duplicados que ocupan {human_size(dedup.wasted_space())} de más. "
+            f"El mayor es {os.path.basename(first[0])}, repetido {len(first)} veces."
+        )
+
+    def disk_hogs(self, command, response, **kwargs):
+        """Comando de voz: "¿qué está ocupando el disco?" (solo con el índice, sin leer el disco)."""
+        largest = self.duplicates().largest_files(limit=3)
+        if not largest:
+            self.speak("Todavía no tengo archivos indexados.")
+            return
+        names = ", ".join(f"{os.path.basename(path)} con {human_size(size)}" for size, path in largest)
+        self.speak(f"Los archivos más grandes son: {names}.")
+        wasted = self.duplicates().wasted_space()
+        if wasted:
+            self.speak(f"Además, los duplicados ocupan {human_size(wasted)} de más.")
+
     def scan_now(self, command, response, **kwargs):
         """Comando de voz para forzar escaneo."""
+        if self.scanning:
+            self.speak("Ya estoy escaneando los archivos.")
+            return
         self.speak("Iniciando escaneo del sistema. Esto puede tardar un poco.")
         threading.Thread(target=self._run_scan_async).start()
 
     def _run_scan_async(self):
-        self.run_indexing()
-        self.speak("Escaneo de archivos completado.")
+        try:
+            scanned = self.run_indexing()
+        except ScanAborted:
+            scanned = False
+        if scanned:
+            self.speak("Escaneo de archivos completado.")
+        else:
+            self.speak("No he podido completar el escaneo de archivos.")
 
     def search_file(self, command, response, **kwargs):
         # "busca el archivo [nombre] en [ruta]"
@@ -111,20 +201,7 @@ class FilesSkill(BaseSkill):
                     break
         
         # Normalize phonetic extensions (Always apply this)
-        replacements = {
-            " punto ": ".",
-            "punto ": ".",
-            " jota peje": "jpg",
-            " jota pe ge": "jpg",
-            " pe ene ge": "png",
-            " pe de efe": "pdf",
-            " te equis te": "txt"
-        }
-        
-        for spoken, written in replacements.items():
-            target = target.replace(spoken, written)
-            
-        target = target.strip()
+        target = normalize_spoken(target)
         path = None
         
         if " en " in target:
@@ -144,37 +221,100 @@ class FilesSkill(BaseSkill):
         # Try Database Search First
         config = self.core.skills_config.get('files', {}).get('config', {})
         if config.get('enable_indexing', False) and not path:
-            self.speak(f"Buscando '{target}' en mi índice...")
-            results = self.core.db.search_files_index(target)
+            self.speak(f"Buscando '{target}' en mi índice...", progress=True)
+            results = self.index.search(target, limit=config.get('search_limit', 10))
+            if results is None:
+                with span('db'):
+                    results = self.core.db.search_files_index(target)
             if results:
                 # Save context
-                self.core.context['last_found_file'] = results[0]['path']
+                self.recent.add(results[0]['path'], source='files')
                 
                 if len(results) == 1:
                     self.speak(f"Lo encontré: {results[0]['path']}")
                 else:
                     self.speak(f"Encontré {len(results)} coincidencias. La primera es: {results[0]['path']}")
                 return
-            else:
-                self.speak("No estaba en mi índice, buscando en el sistema...")
+
+            # Nombre mal reconocido: probar coincidencia aproximada antes de recorrer el disco
+            similar = self.index.fuzzy_search(target, limit=3)
+            if similar and similar[0]['score'] >= config.get('fuzzy_min_score', 0.75):
+                self.recent.add(similar[0]['path'], source='files')
+                self.speak(f"No encontré '{target}' exactamente, pero lo más parecido es: {similar[0]['path']}")
+                return
+
+            self.speak("No estaba en mi índice, buscando en el sistema...", progress=True)
 
         # Fallback to live search
         # Default to user home instead of root for performance and relevance
         search_path = path if path else os.path.expanduser("~")
-        self.speak(f"{response} Buscando '{target}' en {search_path}...")
-        success, results = self.core.file_manager.search_files(target, search_path)
-        
-        if success:
-            if not results:
-                self.speak("No encontré ningún archivo con ese nombre.")
-            elif len(results) == 1:
-                self.core.context['last_found_file'] = results[0]
-                self.speak(f"Lo encontré: {results[0]}")
+        self.speak(f"{response} Buscando '{target}' en {search_path}...", progress=True)
+        self.cancel_live_search()
+        search = LiveSearch(
+            ParallelWalker.from_config(config),
+            [search_path],
+            target,
+            max_results=config.get('live_search_limit', 50),
+            timeout=config.get('live_search_timeout', 30),
+            on_progress=self._report_search_progress
+        )
+        self.live_search = search
+        threading.Thread(target=self._run_live_search, args=(search, target), daemon=True).start()
+
+    def _run_live_search(self, search, target):
+        """Anuncia la primera coincidencia en cuanto aparece y sigue buscando."""
+        results = []
+        try:
+            for path in search:
+                results.append(path)
+                if len(results) == 1:
+                    self.recent.add(path, source='files')
+                    self.speak(f"Lo encontré: {path}")
+        except Exception as e:
+            self.speak(f"Hubo un error en la búsqueda: {e}")
+            return
+        finally:
+            if self.live_search is search:
+                self.live_search = None
+
+        status = 'cancelled' if search.cancelled.is_set() else 'timeout' if search.timed_out else 'done'
+        self._report_search_progress(search, status)
+        if status == 'cancelled':
+            return
+
+        if not results:
+            if search.timed_out:
+                self.speak(f"No he encontrado '{target}' en {search.timeout} segundos. Dejo de buscar.")
             else:
-                self.core.context['last_found_file'] = results[0]
-                self.speak(f"Encontré {len(results)} coincidencias. La primera es: {results[0]}")
+                self.speak("No encontré ningún archivo con ese nombre.")
+        elif len(results) >= search.max_results:
+            self.speak(f"Encontré al menos {len(results)} coincidencias; paro aquí.")
+        elif len(results) > 1:
+            self.speak(f"En total encontré {len(results)} coincidencias.")
+
+    def _report_search_progress(self, search, status='progress'):
+        self.core.event_queue.put({
+            'type': 'file_search',
+            'status': status,
+            'query': search.target,
+            'dirs': search.dirs,
+            'matches': search.found
+        })
+
+    def cancel_live_search(self):
+        """Cancela la búsqueda en vivo en curso, si la hay."""
+        search = self.live_search
+        if search:
+            search.cancel()
+            return True
+        return False
+
+    def cancel_search(self, command, response, **kwargs):
+        """Comando de voz para detener una búsqueda en curso."""
+        if self.cancel_live_search():
+            self.speak("Búsqueda cancelada.")
         else:
-            self.speak(f"Hubo un error en la búsqueda: {results}")
+            self.speak("No hay ninguna búsqueda en curso.")
 
     def read_file(self, command, response, **kwargs):
         # "lee el archivo [ruta]"
@@ -193,14 +333,15 @@ class FilesSkill(BaseSkill):
             path = target
         else:
             # Buscar primero
-            self.speak(f"Buscando '{target}' para leerlo...")
+            self.cancel_live_search()
+            self.speak(f"Buscando '{target}' para leerlo...", progress=True)
             success, results = self.core.file_manager.search_files(target, "/")
             if not success or not results:
                 self.speak("No encontré el archivo.")
                 return
             path = results[0]
 
-        self.speak(f"Leyendo {path}...")
+        self.speak(f"Leyendo {path}...", progress=True)
         success, content = self.core.file_manager.read_file(path)
         
         if success:
@@ -1,15 +1,28 @@
 import os
-import json
 import time
-import subprocess
+import threading
 from modules.logger import app_logger
 from modules.utils import load_json_data
+from .file_index import get_file_index, is_under
+from .fuzzy import normalize_spoken
+from .executor import get_executor
+from .scan_scheduler import lower_priority
+from .locate_db import LocateDB, write_locate_db
+from .recent import get_recent_results
+from .keywords import KeywordMatcher, PathCache
+from .instrumentation import instrumented, span
+
+LOCATE_DB = "data/finder_locate.db"
+LOCATE_CLASSES = [b'A', b'I', b'D', b'L']
 
 class FinderSkill:
     def __init__(self, core):
         self.core = core
         self.name = "finder"
-        self.cache_file = "data/finder_history.json"
+        self.recent = get_recent_results(core)
+        self.locate_db = None
+        self.locate_lock = threading.Lock()
+        self.building_locate = False
         
         # Load Configs
         self.sys_logs = load_json_data("config/sys_logs.json")
@@ -28,6 +41,10 @@ class FinderSkill:
             except Exception as e:
                 app_logger.error(f"Error optimizing logs for distro: {e}")
 
+        # Claves compiladas una vez (ya con el orden por distro) y rutas comprobadas de antemano
+        self._compile_keywords()
+
+    @instrumented
     def execute(self, command_text, intent_data):
         """
         Routes intent to specific handlers:
@@ -50,29 +67,22 @@ class FinderSkill:
         """Logic to find logs or documents."""
         # 1. Check Keywords for System Logs
         # text: "buscame el log de apache"
-        for key, paths in self.sys_logs.items():
-            if key in text.lower():
-                # Check existance
-                valid_path = None
-                for p in paths:
-                    if os.path.exists(p):
-                        valid_path = p
-                        break
-                
-                if valid_path:
-                    self._cache_result(valid_path, "log")
-                    return f"He encontrado el log de {key} en {valid_path}. Di 'muestramelo' para verlo."
-                else:
-                    return f"No encuentro el log de {key} en las rutas esperadas."
+        found = self.log_keywords.find(text)
+        if found:
+            key, paths = found
+            valid_path = self.path_cache.first_existing(paths)
+            if valid_path:
+                self.recent.add(valid_path, "log", source=self.name)
+                return f"He encontrado el log de {key} en {valid_path}. Di 'muestramelo' para verlo."
+            else:
+                return f"No encuentro el log de {key} en las rutas esperadas."
 
         # 2. Check User Docs Shortcuts
         # text: "busca el manual de instalacion"
-        if "manuals" in self.user_docs:
-            for key, path in self.user_docs["manuals"].items():
-                if key in text.lower() or key.replace("_", " ") in text.lower():
-                     if os.path.exists(path):
-                         self._cache_result(path, "pdf")
-                         return f"He encontrado el manual '{key}'. Di 'abrelo' para ver."
+        for key, path in self.manual_keywords.find_all(text):
+            if self.path_cache.exists(path):
+                self.recent.add(path, "pdf", source=self.name)
+                return f"He encontrado el manual '{key}'. Di 'abrelo' para ver."
 
         # 3. Fuzzy Search (Mango / Find)
         # Fallback to general search if no intent matched above
@@ -82,33 +92,35 @@ class FinderSkill:
         
         search_term = self._extract_search_term(text)
         if search_term:
+             # Índice de FilesSkill (exacto y aproximado) antes de lanzar locate
+             search_term = normalize_spoken(search_term)
+             best = self._search_index(search_term)
+             if best:
+                 ftype = "audio" if self._is_audio(best) else "doc"
+                 self.recent.add(best, ftype, source=self.name)
+                 return f"Encontré {os.path.basename(best)}. ¿Quieres verlo?"
+
              # Sanitize
              search_term = search_term.replace(" ", "*") # Fuzzy spaces
-             
-             # Locate command (fastest)
-             try:
-                 cmd = ["locate", "-i", search_term]
-                 result = subprocess.run(cmd, capture_output=True, text=True)
-                 paths = result.stdout.strip().split('\n')
-                 paths = [p for p in paths if p] # filter empty
-                 
-                 if paths:
-                     # Filter by safety (images, docs, audio)
-                     safe_paths = [p for p in paths if self._is_safe_ext(p)]
-                     
-                     if safe_paths:
-                         best = safe_paths[0] # Take first match
-                         ftype = "audio" if self._is_audio(best) else "doc"
-                         self._cache_result(best, ftype)
-                         return f"Encontré {os.path.basename(best)}. ¿Quieres verlo?"
-             except Exception as e:
-                 app_logger.error(f"Locate failed: {e}")
+
+             # Base de datos locate propia, consultada en el proceso
+             paths = self._search_locate_db(search_term)
+             if paths is None:
+                 paths = self._run_locate(search_term)
+
+             # Filter by safety (images, docs, audio)
+             safe_paths = [p for p in paths if self._is_safe_ext(p)]
+             if safe_paths:
+                 best = safe_paths[0] # Take first match
+                 ftype = "audio" if self._is_audio(best) else "doc"
+                 self.recent.add(best, ftype, source=self.name)
+                 return f"Encontré {os.path.basename(best)}. ¿Quieres verlo?"
         
         return "No he encontrado nada con ese nombre."
 
     def handle_show(self, text):
         """Displays the cached file."""
-        cached = self._get_cached_result()
+        cached = self.recent.last()
         if not cached:
             return "No tengo ningún archivo en memoria reciente."
         
@@ -148,27 +160,110 @@ class FinderSkill:
             self.core.web_server.socketio.emit('visual:close', {})
         return "Cerrando visor."
 
-    def _cache_result(self, path, ftype):
-        data = {
-            "path": path,
-            "type": ftype,
-            "timestamp": time.time()
-        }
-        with open(self.cache_file, 'w') as f:
-            json.dump(data, f)
-            
-    def _get_cached_result(self):
-        if os.path.exists(self.cache_file):
-            try:
-                with open(self.cache_file, 'r') as f:
-                    data = json.load(f)
-                    # 24h Expiry
-                    if time.time() - data['timestamp'] < 86400:
-                        return data
-            except:
-                pass
+    def _search_index(self, term):
+        """Busca en el índice de archivos; primero por subcadena y luego aproximado."""
+        try:
+            index = get_file_index(self.core)
+            results = index.search(term) or []
+            safe = [r['path'] for r in results if self._is_safe_ext(r['path'])]
+            if safe:
+                return safe[0]
+
+            similar = index.fuzzy_search(term) or []
+            safe = [r['path'] for r in similar if r['score'] >= 0.75 and self._is_safe_ext(r['path'])]
+            if safe:
+                return safe[0]
+        except Exception as e:
+            app_logger.error(f"Index search failed: {e}")
         return None
 
+    def _compile_keywords(self):
+        """Matchers de logs y manuales, y caché de stat de sus rutas."""
+        logs = {key: paths if isinstance(paths, list) else [paths] for key, paths in self.sys_logs.items()}
+        manuals = self.user_docs.get("manuals", {})
+        self.log_keywords = KeywordMatcher(logs)
+        self.manual_keywords = KeywordMatcher(manuals, aliases=lambda key: [key.replace("_", " ")])
+        self.path_cache = PathCache(ttl=self._config().get('stat_cache_ttl', 60))
+        paths = [p for candidates in logs.values() for p in candidates] + list(manuals.values())
+        threading.Thread(target=self.path_cache.warm, args=(paths,), daemon=True).start()
+
+    def _config(self):
+        return self.core.skills_config.get('finder', {}).get('config', {})
+
+    def _get_locate_db(self):
+        """
+        LocateDB abierta, o None. Se (re)construye en segundo plano a partir
+        del estado del índice de archivos (sin recorrer el disco otra vez)
+        cuando falta, el índice ha escaneado después o pasa de la edad máxima.
+        """
+        config = self._config()
+        index = get_file_index(self.core)
+        with self.locate_lock:
+            if self.locate_db is None and os.path.exists(LOCATE_DB):
+                try:
+                    self.locate_db = LocateDB(LOCATE_DB)
+                except Exception as e:
+                    app_logger.error(f"Error opening locate database: {e}")
+            db = self.locate_db
+            stale = (
+                db is None
+                or (index.last_scan is not None and db.built < index.last_scan.timestamp())
+                or time.time() - db.built > config.get('locate_db_max_age', 86400)
+            )
+            # Sin ningún escaneo del índice no hay nada con qué construirla
+            if stale and index.dirs and not self.building_locate:
+                self.building_locate = True
+                threading.Thread(target=self._build_locate_db, args=(index,), daemon=True).start()
+            return db
+
+    def _build_locate_db(self, index):
+        lower_priority(app_logger)
+        # Por defecto, todo lo que cubre el índice (scan_paths); `locate_roots` lo acota
+        roots = [os.path.expanduser(r) for r in self._config().get('locate_roots', [])]
+        with index.lock:
+            # El snapshot mapeado no cambia; el dict sí (watcher), así que se copia
+            dirs = index.dirs if not isinstance(index.dirs, dict) else dict(index.dirs)
+        try:
+            start = time.monotonic()
+            count = write_locate_db(LOCATE_DB, (
+                (folder, list(record['files'])) for folder, record in dirs.items()
+                if not roots or is_under(folder, roots)
+            ))
+            db = LocateDB(LOCATE_DB)
+            with self.locate_lock:
+                # La anterior se libera sola cuando nadie la usa (mmap de un archivo ya reemplazado)
+                self.locate_db = db
+            app_logger.info(f"Locate database built: {count} files in {time.monotonic() - start:.1f}s")
+        except Exception as e:
+            app_logger.error(f"Error building locate database: {e}")
+        finally:
+            with self.locate_lock:
+                self.building_locate = False
+
+    def _search_locate_db(self, term):
+        """Rutas que casan con `term` en la base propia, o None si aún no existe."""
+        db = self._get_locate_db()
+        if db is None:
+            return None
+        # Con comodines el glob cubre el nombre entero: "informe*final" -> "*informe*final*"
+        query = f"*{term}*" if '*' in term else term
+        try:
+            with span('db'):
+                return db.search(query, limit=50, classes=LOCATE_CLASSES, accept=self._is_safe_ext)
+        except Exception as e:
+            app_logger.error(f"Locate database search failed: {e}")
+            return None
+
+    def _run_locate(self, term):
+        """`locate` del sistema, solo mientras la base propia no existe (índice sin escanear)."""
+        try:
+            cmd = ["locate", "-i", "-l", "500", term]
+            result = get_executor(self.core).run_sync(cmd, kind='query', timeout=5)
+            return [p for p in result.stdout.strip().split('\n') if p]
+        except Exception as e:
+            app_logger.error(f"Locate failed: {e}")
+            return []
+
     def _extract_search_term(self, text):
         # Very naive extraction: remove "busca", "encuentra", "archivo"
         removals = ["busca", "búscame", "encuentra", "el", "archivo", "fichero", "llamado", "un", "una"]
@@ -0,0 +1,283 @@
+"""
+Búsqueda aproximada de nombres de archivo para consultas habladas.
+
+El reconocimiento de voz confunde letras que suenan igual en español
+(b/v, c/s/z, ll/y, h muda...) y deletrea las extensiones ("jota pe ge").
+Aquí se combinan:
+- normalización de la frase hablada (extensiones deletreadas, "punto"),
+- una clave fonética española por palabra,
+- distancia de edición sobre el nombre sin extensión,
+- la extensión como señal aparte.
+Los candidatos salen del índice de trigramas (NameIndex), de modo que el
+coste no depende del número total de archivos.
+"""
+import os
+import re
+import heapq
+import unicodedata
+from bisect import bisect_left
+from collections import Counter
+
+SPOKEN_EXTENSIONS = {
+    " punto ": ".",
+    "punto ": ".",
+    " jota peje": "jpg",
+    " jota pe ge": "jpg",
+    " pe ene ge": "png",
+    " pe de efe": "pdf",
+    " te equis te": "txt"
+}
+
+TOKEN_SPLIT = re.compile(r'[^0-9a-zñ]+|(?<=[a-zñ])(?=[0-9])|(?<=[0-9])(?=[a-zñ])')
+PHONETIC_MARK = '\x02'
+
+# Máximo de candidatos que se puntúan con distancia de edición
+MAX_CANDIDATES = 50
+# Ids que se cuentan de las listas de trigramas más raras; las comunes solo
+# suman a esos candidatos (ver FuzzyMatcher._count)
+MAX_SEED = 2000
+
+
+def normalize_spoken(text):
+    """Convierte extensiones dictadas ("informe punto pe de efe") en texto."""
+    for spoken, written in SPOKEN_EXTENSIONS.items():
+        text = text.replace(spoken, written)
+    return text.strip()
+
+
+def strip_accents(text):
+    text = unicodedata.normalize('NFD', text)
+    return ''.join(c for c in text if unicodedata.category(c) != 'Mn' or c == '̃')
+
+
+def split_name(name):
+    """'Informe_Final-2023.PDF' -> (['informe', 'final', '2023'], 'pdf')"""
+    name = name.lower()
+    stem, ext = os.path.splitext(name)
+    if not stem:
+        stem, ext = ext, ''
+    stem = unicodedata.normalize('NFC', strip_accents(stem))
+    return [t for t in TOKEN_SPLIT.split(stem) if t], ext.lstrip('.')
+
+
+def phonetic_key(word):
+    """
+    Clave fonética española sencilla: agrupa las letras que el
+    reconocedor confunde (b/v/w, c/k/q, c/s/z, g/j, ll/y, h muda).
+    """
+    word = word.lower()
+    out = []
+    i = 0
+    n = len(word)
+    while i < n:
+        c = word[i]
+        nxt = word[i + 1] if i + 1 < n else ''
+        if c == 'h':
+            i += 1
+            continue
+        if c == 'c' and nxt == 'h':
+            out.append('X'); i += 2; continue
+        if c == 'l' and nxt == 'l':
+            out.append('Y'); i += 2; continue
+        if c == 'q' and nxt == 'u':
+            out.append('K'); i += 2; continue
+        if c == 'g' and nxt == 'u' and i + 2 < n and word[i + 2] in 'eiéí':
+            out.append('G'); i += 2; continue
+        if c == 'c':
+            out.append('S' if nxt in 'eiéí' else 'K')
+        elif c == 'g':
+            out.append('J' if nxt in 'eiéí' else 'G')
+        elif c in 'zs':
+            out.append('S')
+        elif c in 'bvw':
+            out.append('B')
+        elif c in 'kq':
+            out.append('K')
+        elif c == 'j':
+            out.append('J')
+        elif c == 'y':
+            out.append('I' if not nxt or nxt not in 'aeiouáéíóú' else 'Y')
+        elif c == 'x':
+            out.append('KS')
+        elif c == 'ñ':
+            out.append('NY')
+        elif c in 'áà':
+            out.append('A')
+        elif c in 'éè':
+            out.append('E')
+        elif c in 'íì':
+            out.append('I')
+        elif c in 'óò':
+            out.append('O')
+        elif c in 'úùü':
+            out.append('U')
+        else:
+            out.append(c.upper())
+        i += 1
+
+    # Letras dobles suenan como una
+    key = []
+    for ch in ''.join(out):
+        if not key or key[-1] != ch:
+            key.append(ch)
+    return ''.join(key)
+
+
+def phonetic_grams(name):
+    """Trigramas de las claves fonéticas de cada palabra, marcados para no
+    chocar con los trigramas del nombre."""
+    tokens, _ = split_name(name)
+    grams = set()
+    for token in tokens:
+        key = '^' + phonetic_key(token) + '$'
+        for i in range(len(key) - 2):
+            grams.add(PHONETIC_MARK + key[i:i + 3])
+    return grams
+
+
+def levenshtein(a, b):
+    """
+    Distancia de edición con el algoritmo bit-paralelo de Myers/Hyyrö:
+    una pasada por `b` con operaciones sobre enteros, mucho más rápido en
+    Python que la tabla de programación dinámica.
+    """
+    if not a:
+        return len(b)
+    if not b:
+        return len(a)
+    peq = {}
+    for i, c in enumerate(a):
+        peq[c] = peq.get(c, 0) | (1 << i)
+    mask = (1 << len(a)) - 1
+    last = 1 << (len(a) - 1)
+    pv, mv, score = mask, 0, len(a)
+    for c in b:
+        eq = peq.get(c, 0)
+        xv = eq | mv
+        xh = (((eq & pv) + pv) ^ pv) | eq
+        ph = mv | (~(xh | pv) & mask)
+        mh = pv & xh
+        if ph & last:
+            score += 1
+        elif mh & last:
+            score -= 1
+        ph = ((ph << 1) | 1) & mask
+        mh = (mh << 1) & mask
+        pv = mh | (~(xv | ph) & mask)
+        mv = ph & xv
+    return score
+
+
+def similarity(a, b):
+    """1.0 = iguales, 0.0 = nada que ver."""
+    longest = max(len(a), len(b))
+    if not longest:
+        return 1.0
+    return 1.0 - levenshtein(a, b) / longest
+
+
+class FuzzyMatcher:
+    """
+    Ranking aproximado sobre un NameIndex.
+
+    1. Pre-filtro: se cuentan los trigramas (de texto y fonéticos) que cada
+       nombre comparte con la consulta y se quedan los MAX_CANDIDATES mejores.
+       Los candidatos salen de las listas más raras; las comunes solo se
+       cruzan con ellos, así una consulta de palabras frecuentes no recorre
+       medio índice ni pierde esos trigramas.
+    2. Puntuación: similitud de edición del nombre completo y por palabra,
+       coincidencia de claves fonéticas y de extensión.
+    """
+
+    def __init__(self, names):
+        self.names = names
+
+    def search(self, query, limit=5, min_score=0.5):
+        """Devuelve [{'path', 'score'}] con score en [0, 1], de mayor a menor."""
+        query = normalize_spoken(query.lower())
+        q_tokens, q_ext = split_name(query)
+        if not q_tokens:
+            return []
+        q_stem = ' '.join(q_tokens)
+        q_keys = [phonetic_key(t) for t in q_tokens]
+
+        grams = set()
+        compact = ''.join(q_tokens)
+        for text in [compact] + q_tokens:
+            for i in range(len(text) - 2):
+                grams.add(text[i:i + 3])
+        grams |= phonetic_grams(query)
+
+        with self.names.lock:
+            postings = [self.names.postings.get(gram) for gram in grams]
+            hits = self._count(sorted((p for p in postings if p), key=len))
+            top = hits.most_common(MAX_CANDIDATES)
+            # Los que comparten mucho menos que el mejor no llegan a min_score
+            top = [(doc, count) for doc, count in top if count * 2 >= top[0][1]]
+            candidates = [(self.names.paths[doc], self.names.names[doc]) for doc, _ in top]
+
+        scored = []
+        for path, name in candidates:
+            if path is None:
+                continue
+            score = self._score(name, q_stem, q_tokens, q_keys, q_ext)
+            if score >= min_score:
+                scored.append((score, path))
+
+        best = heapq.nlargest(limit, scored)
+        return [{'path': path, 'score': round(score, 3)} for score, path in best]
+
+    @staticmethod
+    def _count(postings):
+        """
+        Trigramas compartidos por candidato. `postings` va de la lista más
+        corta a la más larga: se cuentan enteras las que caben en MAX_SEED
+        ids (y las que hagan falta para reunir MAX_CANDIDATES) y dan los
+        candidatos; cada lista restante solo se
+        cruza con ellos, por búsqueda binaria (los ids de cada lista están
+        ordenados) o por intersección de conjuntos si la lista no es mucho
+        más larga que los candidatos.
+        """
+        hits = Counter()
+        budget = MAX_SEED
+        rest = []
+        for posting in postings:
+            # Una lista que no cabe solo entra si aún faltan candidatos
+            if len(posting) <= budget or len(hits) < MAX_CANDIDATES:
+                hits.update(posting)
+                budget -= len(posting)
+            else:
+                rest.append(posting)
+        seeded = set(hits)
+        for posting in rest:
+            size = len(posting)
+            if len(seeded) * 16 < size:
+                found = [doc for doc in seeded if posting[min(bisect_left(posting, doc), size - 1)] == doc]
+            else:
+                found = seeded.intersection(posting)
+            hits.update(found)
+        return hits
+
+    def _score(self, name, q_stem, q_tokens, q_keys, q_ext):
+        tokens, ext = split_name(name)
+        if not tokens:
+            return 0.0
+        whole = similarity(q_stem.replace(' ', ''), ''.join(tokens))
+
+        # Cada palabra de la consulta contra su mejor pareja en el nombre
+        per_token = 0.0
+        keys = [phonetic_key(t) for t in tokens]
+        for q_token, q_key in zip(q_tokens, q_keys):
+            best = 0.0
+            for token, key in zip(tokens, keys):
+                if q_key == key:
+                    best = 1.0
+                    break
+                best = max(best, similarity(q_token, token), 0.9 * similarity(q_key, key))
+            per_token += best
+        per_token /= len(q_tokens)
+
+        score = max(whole, per_token)
+        if q_ext:
+            score += 0.1 if q_ext == ext else -0.2
+        return max(0.0, min(1.0, score))
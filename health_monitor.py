@@ -0,0 +1,201 @@
+"""
+Monitor de salud en segundo plano.
+
+Cada `health_interval` segundos:
+- procesa lo nuevo de los logs (LogAnalyzer) y cuenta errores por firma,
+- toma CPU, RAM y disco de sysadmin_manager,
+- compara cada serie con su media móvil exponencial (EWMA) y marca como
+  anomalía lo que se aleja más de `health_z_threshold` desviaciones.
+
+El resultado queda en `state`, que las skills leen sin esperar a nada. Las
+anomalías nuevas se avisan por core.event_queue, como mucho una vez cada
+`health_alert_interval` segundos por tipo.
+"""
+import math
+import time
+import threading
+from collections import deque
+from .log_analyzer import get_log_analyzer
+from .scan_scheduler import lower_priority
+
+DEFAULT_INTERVAL = 30
+DEFAULT_Z_THRESHOLD = 3.0
+DEFAULT_ALERT_INTERVAL = 900
+# Muestras antes de fiarse de la desviación
+MIN_SAMPLES = 10
+# Desviación mínima: tras una serie plana (0 errores) un salto sí es anómalo
+MIN_STD = 1.0
+# Intervalos que se guardan por firma (ventana de tasas de error)
+WINDOW = 120
+MAX_TRACKED = 200
+# Umbrales absolutos (%) que se avisan aunque la serie siempre haya estado alta
+LIMITS = {'cpu': 95.0, 'ram': 92.0, 'disk': 90.0}
+
+_shared_lock = threading.Lock()
+
+
+def get_health_monitor(core, logger):
+    """HealthMonitor compartido (lo leen DiagnosisSkill y SystemSkill)."""
+    with _shared_lock:
+        monitor = getattr(core, 'health_monitor', None)
+        if monitor is None:
+            monitor = HealthMonitor(core, logger)
+            core.health_monitor = monitor
+        return monitor
+
+
+class Ewma:
+    """Media y varianza exponenciales; O(1) por muestra."""
+
+    __slots__ = ('alpha', 'mean', 'var', 'count')
+
+    def __init__(self, alpha=0.1):
+        self.alpha = alpha
+        self.mean = 0.0
+        self.var = 0.0
+        self.count = 0
+
+    def update(self, value):
+        """Añade `value` y devuelve su z-score respecto a lo visto antes."""
+        if self.count == 0:
+            self.mean = value
+            self.count = 1
+            return 0.0
+        diff = value - self.mean
+        z = diff / max(math.sqrt(self.var), MIN_STD)
+        incr = self.alpha * diff
+        self.mean += incr
+        self.var = (1 - self.alpha) * (self.var + diff * incr)
+        self.count += 1
+        return z if self.count > MIN_SAMPLES else 0.0
+
+
+def _percent(value):
+    try:
+        return float(str(value).strip().rstrip('%'))
+    except (TypeError, ValueError):
+        return None
+
+
+class HealthMonitor:
+    """
+    `state` = {'time', 'metrics': {cpu, ram, disk}, 'error_rate',
+    'anomalies': [{kind, key, value, z, message}], 'top_errors': [...]}
+    """
+
+    def __init__(self, core, logger):
+        self.core = core
+        self.logger = logger
+        config = core.skills_config.get('diagnosis', {}).get('config', {})
+        self.interval = config.get('health_interval', DEFAULT_INTERVAL)
+        self.z_threshold = config.get('health_z_threshold', DEFAULT_Z_THRESHOLD)
+        self.alert_interval = config.get('health_alert_interval', DEFAULT_ALERT_INTERVAL)
+        self.analyzer = get_log_analyzer(core, logger)
+        self.metrics = {name: Ewma() for name in LIMITS}
+        self.error_rate = Ewma()
+        self.signatures = {}  # firma -> (Ewma, deque de cuentas por intervalo)
+        self.last_alert = {}
+        self.state = None
+        self.running = False
+
+    def start(self):
+        if self.running:
+            return
+        self.running = True
+        threading.Thread(target=self._loop, daemon=True).start()
+
+    def _loop(self):
+        lower_priority(self.logger)
+        while self.running:
+            try:
+                self.sample()
+            except Exception as e:
+                self.logger.error(f"Health monitor error: {e}")
+            time.sleep(self.interval)
+
+    def sample(self):
+        """Una pasada del monitor; deja el resultado en `state`."""
+        now = time.time()
+        anomalies = []
+
+        events = self.analyzer.poll()
+        counts = {}
+        for event in events:
+            counts[event['signature']] = counts.get(event['signature'], 0) + 1
+        z = self.error_rate.update(len(events))
+        if z > self.z_threshold and len(events) >= 3:
+            anomalies.append(self._anomaly('errors', 'total', len(events), z,
+                                           f"Hay un pico de errores en los logs: {len(events)} en {self.interval} segundos."))
+
+        for signature in set(counts) | set(self.signatures):
+            tracked = self.signatures.get(signature)
+            if tracked is None:
+                if len(self.signatures) >= MAX_TRACKED:
+                    continue
+                tracked = self.signatures[signature] = (Ewma(), deque(maxlen=WINDOW))
+            count = counts.get(signature, 0)
+            tracked[1].append(count)
+            z = tracked[0].update(count)
+            if z > self.z_threshold and count >= 3:
+                anomalies.append(self._anomaly('error_signature', signature, count, z,
+                                               f"Un error se está repitiendo más de lo normal: {signature[:80]}"))
+        # Se olvidan las firmas que llevan toda la ventana sin aparecer
+        for signature in [s for s, (_, window) in self.signatures.items() if len(window) == WINDOW and not any(window)]:
+            del self.signatures[signature]
+
+        metrics = self._read_metrics()
+        for name, value in metrics.items():
+            if value is None:
+                continue
+            z = self.metrics[name].update(value)
+            if value >= LIMITS[name] or (z > self.z_threshold and value > 50):
+                anomalies.append(self._anomaly(name, name, value, z, f"Uso de {name.upper()} alto: {value:.0f}%."))
+
+        self.state = {
+            'time': now,
+            'metrics': metrics,
+            'error_rate': len(events) / self.interval,
+            'anomalies': anomalies,
+            'top_errors': self.analyzer.top(3, since=now - WINDOW * self.interval)
+        }
+        for anomaly in anomalies:
+            self._alert(anomaly, now)
+
+    def _read_metrics(self):
+        # El muestreador de /proc, si está en marcha, ya tiene los valores sin coste
+        sampler = getattr(self.core, 'metrics_sampler', None)
+        if sampler and sampler.current('cpu') is not None:
+            return {name: sampler.current(name) for name in LIMITS}
+        manager = self.core.sysadmin_manager
+        if not manager:
+            return {}
+        metrics = {}
+        for name, getter in (('cpu', 'get_cpu_usage'), ('ram', 'get_ram_usage'), ('disk', 'get_disk_usage')):
+            try:
+                metrics[name] = _percent(getattr(manager, getter)())
+            except Exception:
+                metrics[name] = None
+        return metrics
+
+    def _anomaly(self, kind, key, value, z, message):
+        return {'kind': kind, 'key': key, 'value': value, 'z': round(z, 2), 'message': message}
+
+    def _alert(self, anomaly, now):
+        key = (anomaly['kind'], anomaly['key'])
+        if now - self.last_alert.get(key, 0) < self.alert_interval:
+            return
+        self.last_alert[key] = now
+        self.core.event_queue.put({'type': 'health_alert', **anomaly})
+
+    def summary(self):
+        """Resumen hablado del último estado (None si aún no hay muestras)."""
+        state = self.state
+        if state is None:
+            return None
+        parts = [anomaly['message'] for anomaly in state['anomalies']]
+        metrics = state['metrics']
+        if metrics.get('cpu') is not None and metrics.get('ram') is not None:
+            parts.append(f"CPU al {metrics['cpu']:.0f}% y RAM al {metrics['ram']:.0f}%.")
+        if not state['anomalies']:
+            parts.insert(0, "No veo nada anómalo.")
+        return " ".join(parts)
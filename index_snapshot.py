@@ -0,0 +1,163 @@
+"""
+Snapshot binario del estado del índice de archivos.
+
+Formato (little-endian), pensado para abrirse con mmap sin decodificarlo:
+
+    cabecera   MAGIC, versión, longitud de meta, nº de directorios
+    meta       JSON (tipos indexados, opciones del walker, último escaneo...)
+    dirs       tabla fija de DIR_ENTRY ordenada por ruta (búsqueda binaria)
+    files      FILE_ENTRY contiguos de cada directorio
+    subdirs    STR_REF contiguos de cada directorio
+    blob       todas las cadenas en UTF-8
+
+Al arrancar solo se lee la cabecera y la meta; cada directorio se decodifica
+cuando se consulta.
+"""
+import os
+import mmap
+import json
+import struct
+from collections.abc import Mapping
+
+MAGIC = b'BBIX'
+VERSION = 1
+
+HEADER = struct.Struct('<4sIIQ')        # magic, version, meta_len, n_dirs
+DIR_ENTRY = struct.Struct('<QIdQIQI')   # path_off, path_len, mtime, files_idx, n_files, subdirs_idx, n_subdirs
+FILE_ENTRY = struct.Struct('<QIQdQ')    # name_off, name_len, size, mtime, ino
+STR_REF = struct.Struct('<QI')          # name_off, name_len
+
+
+def save_snapshot(path, dirs, meta):
+    """Escribe `dirs` ({ruta: registro}) y `meta` de forma atómica."""
+    blob = bytearray()
+    strings = {}
+
+    def ref(text):
+        data = os.fsencode(text)
+        offset = strings.get(data)
+        if offset is None:
+            offset = strings[data] = len(blob)
+            blob.extend(data)
+        return offset, len(data)
+
+    ordered = sorted((os.fsencode(folder), folder) for folder in dirs)
+    dir_table = bytearray()
+    file_table = bytearray()
+    subdir_table = bytearray()
+    n_files = n_subdirs = 0
+
+    for _, folder in ordered:
+        record = dirs[folder]
+        path_off, path_len = ref(folder)
+        files = record['files']
+        subdirs = record['subdirs']
+        dir_table += DIR_ENTRY.pack(path_off, path_len, record['mtime'], n_files, len(files), n_subdirs, len(subdirs))
+        for name, (size, mtime, ino) in files.items():
+            name_off, name_len = ref(name)
+            file_table += FILE_ENTRY.pack(name_off, name_len, size, mtime, ino)
+        for name in subdirs:
+            subdir_table += STR_REF.pack(*ref(name))
+        n_files += len(files)
+        n_subdirs += len(subdirs)
+
+    meta_bytes = json.dumps(meta).encode()
+    folder = os.path.dirname(path)
+    if folder and not os.path.exists(folder):
+        os.makedirs(folder)
+    tmp = path + ".tmp"
+    with open(tmp, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, len(meta_bytes), len(ordered)))
+        f.write(meta_bytes)
+        f.write(dir_table)
+        f.write(file_table)
+        f.write(subdir_table)
+        f.write(blob)
+    os.replace(tmp, path)
+
+
+class SnapshotDirs(Mapping):
+    """
+    Vista de solo lectura {ruta: registro} sobre un snapshot mapeado en
+    memoria. Los registros tienen la misma forma que los de FileIndex.dirs.
+    """
+
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            self.mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, meta_len, self.count = HEADER.unpack_from(self.mm, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"Unsupported index snapshot: {path}")
+        start = HEADER.size
+        self.meta = json.loads(self.mm[start:start + meta_len])
+        self.dirs_at = start + meta_len
+        n_files, n_subdirs = self._totals()
+        self.files_at = self.dirs_at + self.count * DIR_ENTRY.size
+        self.subdirs_at = self.files_at + n_files * FILE_ENTRY.size
+        self.blob_at = self.subdirs_at + n_subdirs * STR_REF.size
+
+    def _totals(self):
+        if not self.count:
+            return 0, 0
+        entry = DIR_ENTRY.unpack_from(self.mm, self.dirs_at + (self.count - 1) * DIR_ENTRY.size)
+        return entry[3] + entry[4], entry[5] + entry[6]
+
+    def _entry(self, i):
+        return DIR_ENTRY.unpack_from(self.mm, self.dirs_at + i * DIR_ENTRY.size)
+
+    def _str(self, offset, length):
+        start = self.blob_at + offset
+        return os.fsdecode(self.mm[start:start + length])
+
+    def _find(self, key):
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            entry = self._entry(mid)
+            start = self.blob_at + entry[0]
+            candidate = self.mm[start:start + entry[1]]
+            if candidate < key:
+                lo = mid + 1
+            elif candidate > key:
+                hi = mid
+            else:
+                return entry
+        return None
+
+    def _decode(self, entry):
+        _, _, mtime, files_idx, n_files, subdirs_idx, n_subdirs = entry
+        files = {}
+        base = self.files_at + files_idx * FILE_ENTRY.size
+        for i in range(n_files):
+            name_off, name_len, size, fmtime, ino = FILE_ENTRY.unpack_from(self.mm, base + i * FILE_ENTRY.size)
+            files[self._str(name_off, name_len)] = [size, fmtime, ino]
+        subdirs = []
+        base = self.subdirs_at + subdirs_idx * STR_REF.size
+        for i in range(n_subdirs):
+            subdirs.append(self._str(*STR_REF.unpack_from(self.mm, base + i * STR_REF.size)))
+        return {'mtime': mtime, 'files': files, 'subdirs': subdirs}
+
+    def __getitem__(self, folder):
+        entry = self._find(os.fsencode(folder))
+        if entry is None:
+            raise KeyError(folder)
+        return self._decode(entry)
+
+    def __contains__(self, folder):
+        return self._find(os.fsencode(folder)) is not None
+
+    def __iter__(self):
+        for i in range(self.count):
+            entry = self._entry(i)
+            yield self._str(entry[0], entry[1])
+
+    def __len__(self):
+        return self.count
+
+    def items(self):
+        for i in range(self.count):
+            entry = self._entry(i)
+            yield self._str(entry[0], entry[1]), self._decode(entry)
+
+    def file_count(self):
+        return self._totals()[0]
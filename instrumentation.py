@@ -0,0 +1,317 @@
+"""
+Latencia de las skills: cuánto tarda cada handler y en qué.
+
+BaseSkill envuelve sus handlers (métodos públicos con parámetro `response`)
+y anota por llamada el tiempo real, el de CPU y lo que tardó en llegar el
+primer `speak()`. Dentro de una llamada, `span(kind)` mide los tramos
+caros: subprocesos, base de datos, índice en memoria, Mango/IA y red. Todo
+acaba en histogramas de cubetas fijas (un contador por cubeta), que se
+vuelcan a data/ como JSON y en formato de texto de Prometheus.
+
+Con `profile` activo, un hilo muestrea cada `profile_interval` segundos las
+pilas de los hilos que están dentro de un handler y guarda las de las
+llamadas que superan `profile_threshold`.
+"""
+import os
+import sys
+import json
+import time
+import threading
+import functools
+from collections import Counter, deque
+
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+JSON_FILE = "data/skill_metrics.json"
+PROMETHEUS_FILE = "data/skill_metrics.prom"
+DEFAULT_DUMP_INTERVAL = 60
+DEFAULT_PROFILE_THRESHOLD = 1.0
+DEFAULT_PROFILE_INTERVAL = 0.01
+MAX_SLOW_CALLS = 20
+
+_shared_lock = threading.Lock()
+_local = threading.local()
+
+
+def get_instrumentation(core):
+    """Instrumentation compartida; arranca el volcado periódico y, si se pide, el perfilador."""
+    instrumentation = getattr(core, 'instrumentation', None)
+    if instrumentation is not None:
+        return instrumentation
+    with _shared_lock:
+        instrumentation = getattr(core, 'instrumentation', None)
+        if instrumentation is None:
+            config = core.skills_config.get('instrumentation', {}).get('config', {})
+            instrumentation = Instrumentation(
+                enabled=config.get('enabled', True),
+                logger=core.app_logger,
+                profile=config.get('profile', False),
+                profile_threshold=config.get('profile_threshold', DEFAULT_PROFILE_THRESHOLD),
+                profile_interval=config.get('profile_interval', DEFAULT_PROFILE_INTERVAL)
+            )
+            if instrumentation.enabled:
+                instrumentation.start(config.get('dump_interval', DEFAULT_DUMP_INTERVAL))
+            core.instrumentation = instrumentation
+        return instrumentation
+
+
+class Histogram:
+    """Cubetas acumuladas al estilo Prometheus (segundos)."""
+
+    __slots__ = ('counts', 'count', 'total', 'max')
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds):
+        i = 0
+        while i < len(BUCKETS) and seconds > BUCKETS[i]:
+            i += 1
+        self.counts[i] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def quantile(self, q):
+        """Cota superior de la cubeta donde cae el cuantil `q`."""
+        if not self.count:
+            return None
+        target = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= target:
+                return BUCKETS[i] if i < len(BUCKETS) else self.max
+        return self.max
+
+    def to_dict(self):
+        return {
+            'count': self.count,
+            'sum': round(self.total, 6),
+            'max': round(self.max, 6),
+            'p50': self.quantile(0.5),
+            'p95': self.quantile(0.95),
+            'buckets': dict(zip([str(b) for b in BUCKETS] + ['+Inf'], self.counts))
+        }
+
+
+class Call:
+    """Llamada a un handler en curso (una por hilo)."""
+
+    __slots__ = ('instrumentation', 'skill', 'handler', 'start', 'cpu_start', 'first_speak', 'stacks')
+
+    def __init__(self, instrumentation, skill, handler):
+        self.instrumentation = instrumentation
+        self.skill = skill
+        self.handler = handler
+        self.first_speak = None
+        self.stacks = None
+        self.start = time.perf_counter()
+        self.cpu_start = time.thread_time()
+
+
+def mark_speak():
+    """Lo llama BaseSkill.speak: anota el primer speak de la llamada en curso."""
+    call = getattr(_local, 'call', None)
+    if call is not None and call.first_speak is None:
+        call.first_speak = time.perf_counter()
+
+
+class span:
+    """
+    `with span('subprocess'):` mide un tramo dentro del handler en curso.
+    Fuera de un handler (hilos de fondo) no hace nada.
+    """
+
+    __slots__ = ('kind', 'call', 'start')
+
+    def __init__(self, kind):
+        self.kind = kind
+
+    def __enter__(self):
+        self.call = getattr(_local, 'call', None)
+        if self.call is not None:
+            self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        call = self.call
+        if call is not None:
+            call.instrumentation.observe(
+                'span', (call.skill, call.handler, self.kind), time.perf_counter() - self.start
+            )
+        return False
+
+
+def spanned(kind):
+    """Decorador: toda la función cuenta como un tramo `kind`."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(kind):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def instrumented(func):
+    """
+    Envuelve un handler. Si ya hay una llamada en curso en el hilo (un handler
+    que llama a otro), cuenta como tramo 'call:<nombre>' de la de fuera.
+    """
+    name = func.__name__
+
+    @functools.wraps(func)
+    def wrapper(self, *args, **kwargs):
+        outer = getattr(_local, 'call', None)
+        if outer is not None:
+            with span(f"call:{name}"):
+                return func(self, *args, **kwargs)
+        core = getattr(self, 'core', None)
+        instrumentation = getattr(core, 'instrumentation', None) or (get_instrumentation(core) if core else None)
+        if instrumentation is None or not instrumentation.enabled:
+            return func(self, *args, **kwargs)
+        call = Call(instrumentation, getattr(self, 'name', None) or type(self).__name__, name)
+        _local.call = call
+        instrumentation.begin(call)
+        try:
+            return func(self, *args, **kwargs)
+        finally:
+            _local.call = None
+            instrumentation.end(call)
+
+    wrapper.instrumented = True
+    return wrapper
+
+
+class Instrumentation:
+    def __init__(self, enabled=True, logger=None, profile=False,
+                 profile_threshold=DEFAULT_PROFILE_THRESHOLD, profile_interval=DEFAULT_PROFILE_INTERVAL):
+        self.enabled = enabled
+        self.logger = logger
+        self.histograms = {}  # (métrica, etiquetas) -> Histogram
+        self.lock = threading.Lock()
+        self.profile = profile
+        self.profile_threshold = profile_threshold
+        self.profile_interval = profile_interval
+        self.active = {}  # id de hilo -> Call (solo con perfilador)
+        self.slow_calls = deque(maxlen=MAX_SLOW_CALLS)
+
+    def start(self, dump_interval=DEFAULT_DUMP_INTERVAL):
+        if dump_interval:
+            threading.Thread(target=self._dump_loop, args=(dump_interval,), daemon=True).start()
+        if self.profile:
+            threading.Thread(target=self._profile_loop, daemon=True).start()
+
+    def observe(self, metric, labels, seconds):
+        key = (metric, labels)
+        with self.lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram()
+            histogram.observe(seconds)
+
+    def begin(self, call):
+        if self.profile:
+            call.stacks = Counter()
+            with self.lock:
+                self.active[threading.get_ident()] = call
+
+    def end(self, call):
+        wall = time.perf_counter() - call.start
+        labels = (call.skill, call.handler)
+        self.observe('wall', labels, wall)
+        self.observe('cpu', labels, time.thread_time() - call.cpu_start)
+        if call.first_speak is not None:
+            self.observe('first_speak', labels, call.first_speak - call.start)
+        if self.profile:
+            with self.lock:
+                self.active.pop(threading.get_ident(), None)
+            if wall >= self.profile_threshold and call.stacks:
+                self.slow_calls.append({
+                    'skill': call.skill,
+                    'handler': call.handler,
+                    'wall': round(wall, 3),
+                    'at': time.time(),
+                    'samples': sum(call.stacks.values()),
+                    'stacks': call.stacks.most_common(10)
+                })
+
+    def _profile_loop(self):
+        """Muestreo de pilas: solo de los hilos con un handler en curso."""
+        while True:
+            time.sleep(self.profile_interval)
+            frames = sys._current_frames()
+            # Bajo el lock: end() deja de ver actualizaciones en cuanto saca la llamada
+            with self.lock:
+                for ident, call in self.active.items():
+                    frame = frames.get(ident)
+                    stack = []
+                    while frame is not None and len(stack) < 30:
+                        code = frame.f_code
+                        stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}:{frame.f_lineno}")
+                        frame = frame.f_back
+                    if stack:
+                        call.stacks[';'.join(reversed(stack))] += 1
+
+    def snapshot(self):
+        with self.lock:
+            items = [(metric, labels, h.to_dict()) for (metric, labels), h in self.histograms.items()]
+        data = {'updated': time.time(), 'wall': [], 'cpu': [], 'first_speak': [], 'span': []}
+        for metric, labels, values in sorted(items, key=lambda item: (item[0], item[1])):
+            entry = {'skill': labels[0], 'handler': labels[1]}
+            if metric == 'span':
+                entry['kind'] = labels[2]
+            entry.update(values)
+            data[metric].append(entry)
+        data['slow_calls'] = list(self.slow_calls)
+        return data
+
+    def slowest(self, limit=5):
+        """Handlers con mayor p95 de tiempo real: [(skill, handler, p95, llamadas)]."""
+        rows = [(e['skill'], e['handler'], e['p95'], e['count']) for e in self.snapshot()['wall']]
+        return sorted(rows, key=lambda row: row[2] or 0, reverse=True)[:limit]
+
+    def to_prometheus(self):
+        with self.lock:
+            items = [(metric, labels, list(h.counts), h.count, h.total) for (metric, labels), h in self.histograms.items()]
+        lines = []
+        for metric in ('wall', 'cpu', 'first_speak', 'span'):
+            name = f"skill_{metric}_seconds"
+            lines.append(f"# TYPE {name} histogram")
+            for _, labels, counts, count, total in sorted(i for i in items if i[0] == metric):
+                tags = f'skill="{labels[0]}",handler="{labels[1]}"'
+                if metric == 'span':
+                    tags += f',kind="{labels[2]}"'
+                cumulative = 0
+                for bound, n in zip([str(b) for b in BUCKETS] + ['+Inf'], counts):
+                    cumulative += n
+                    lines.append(f'{name}_bucket{{{tags},le="{bound}"}} {cumulative}')
+                lines.append(f"{name}_sum{{{tags}}} {total:.6f}")
+                lines.append(f"{name}_count{{{tags}}} {count}")
+        return "\n".join(lines) + "\n"
+
+    def dump(self, json_file=JSON_FILE, prometheus_file=PROMETHEUS_FILE):
+        """Escribe ambos volcados de forma atómica."""
+        for path, text in ((json_file, json.dumps(self.snapshot(), indent=1)), (prometheus_file, self.to_prometheus())):
+            folder = os.path.dirname(path)
+            if folder and not os.path.exists(folder):
+                os.makedirs(folder)
+            tmp = path + ".tmp"
+            with open(tmp, 'w') as f:
+                f.write(text)
+            os.replace(tmp, path)
+
+    def _dump_loop(self, interval):
+        while True:
+            time.sleep(interval)
+            if not self.histograms:
+                continue
+            try:
+                self.dump()
+            except Exception as e:
+                if self.logger:
+                    self.logger.error(f"Error dumping skill metrics: {e}")
@@ -0,0 +1,201 @@
+"""
+Trabajos largos en segundo plano (actualización del sistema, speedtest...).
+
+Cada trabajo tiene un ID y un estado que se actualiza según llega la salida
+del comando; los cambios de progreso se publican en core.event_queue como
+eventos 'job_progress'. "¿Cómo va la actualización?" solo lee el último
+trabajo con ese nombre. El historial es un anillo acotado.
+"""
+import re
+import time
+import itertools
+import threading
+from collections import deque
+from .executor import get_executor
+
+DEFAULT_HISTORY = 50
+# Como mucho un evento de progreso por trabajo en este intervalo (s)
+PROGRESS_EVENT_INTERVAL = 1.0
+
+_shared_lock = threading.Lock()
+
+
+def get_job_manager(core):
+    """JobManager compartido por todas las skills."""
+    with _shared_lock:
+        manager = getattr(core, 'job_manager', None)
+        if manager is None:
+            manager = JobManager(core)
+            core.job_manager = manager
+        return manager
+
+
+class Job:
+    def __init__(self, job_id, name, description):
+        self.id = job_id
+        self.name = name
+        self.description = description
+        self.status = 'queued'
+        self.progress = None  # 0-100, o None si no se puede estimar
+        self.stage = None
+        self.started = time.time()
+        self.finished = None
+        self.result = None
+        self.handle = None
+        self.last_event = 0.0
+
+    @property
+    def active(self):
+        return self.status in ('queued', 'running')
+
+    def as_dict(self):
+        return {
+            'id': self.id, 'name': self.name, 'status': self.status, 'progress': self.progress,
+            'stage': self.stage, 'started': self.started, 'finished': self.finished
+        }
+
+
+class JobManager:
+    def __init__(self, core, history=DEFAULT_HISTORY):
+        self.core = core
+        self.history = deque(maxlen=history)
+        self.latest = {}
+        self.ids = itertools.count(1)
+        self.lock = threading.Lock()
+
+    def _new(self, name, description):
+        with self.lock:
+            job = Job(next(self.ids), name, description)
+            self.history.append(job)
+            self.latest[name] = job
+        return job
+
+    def start_command(self, name, description, args, parser=None, on_done=None, **kwargs):
+        """
+        Lanza `args` en el CommandExecutor como trabajo `name`. `parser(job, línea)`
+        actualiza job.progress / job.stage con cada línea de salida.
+        """
+        job = self._new(name, description)
+
+        def on_line(line):
+            if job.status == 'queued':
+                job.status = 'running'
+            if parser and parser(job, line):
+                self._publish(job)
+
+        def finished(result):
+            self._finish(job, result, result.ok, result.cancelled)
+            if on_done:
+                on_done(job)
+
+        job.handle = get_executor(self.core).run(args, on_line=on_line, on_done=finished, **kwargs)
+        self._publish(job, force=True)
+        return job
+
+    def start_call(self, name, description, func, *args, kind='default', on_done=None, **kwargs):
+        """Igual que start_command, para funciones bloqueantes sin salida por líneas."""
+        job = self._new(name, description)
+
+        def run():
+            job.status = 'running'
+            self._publish(job, force=True)
+            return func(*args, **kwargs)
+
+        def finished(result):
+            failed = isinstance(result, Exception) or (isinstance(result, dict) and 'error' in result)
+            self._finish(job, result, not failed, False)
+            if on_done:
+                on_done(job)
+
+        get_executor(self.core).call(run, kind=kind, on_done=finished)
+        return job
+
+    def _finish(self, job, result, ok, cancelled):
+        job.result = result
+        job.finished = time.time()
+        job.status = 'cancelled' if cancelled else 'done' if ok else 'failed'
+        if ok:
+            job.progress = 100
+        self._publish(job, force=True)
+
+    def _publish(self, job, force=False):
+        now = time.monotonic()
+        if not force and now - job.last_event < PROGRESS_EVENT_INTERVAL:
+            return
+        job.last_event = now
+        self.core.event_queue.put({'type': 'job_progress', **job.as_dict()})
+
+    def get(self, job_id):
+        for job in self.history:
+            if job.id == job_id:
+                return job
+        return None
+
+    def status(self, name):
+        """Último trabajo con ese nombre, o None."""
+        return self.latest.get(name)
+
+    def cancel(self, name):
+        job = self.latest.get(name)
+        if job and job.active and job.handle:
+            job.handle.cancel()
+            return True
+        return False
+
+
+def describe(job):
+    """Frase para responder "¿cómo va ...?"."""
+    if job is None:
+        return None
+    if job.status == 'queued':
+        return f"La {job.description} está en cola."
+    if job.status == 'running':
+        elapsed = int((time.time() - job.started) / 60)
+        text = f"La {job.description} sigue en marcha"
+        if job.progress is not None:
+            text += f", va por el {job.progress:.0f}%"
+        if job.stage:
+            text += f": {job.stage}"
+        return text + (f". Lleva {elapsed} minutos." if elapsed else ".")
+    if job.status == 'done':
+        return f"La {job.description} terminó a las {time.strftime('%H:%M', time.localtime(job.finished))}."
+    if job.status == 'cancelled':
+        return f"La {job.description} se canceló."
+    return f"La {job.description} falló."
+
+
+APT_UPGRADE_COUNT = re.compile(r'^(\d+) (?:upgraded|actualizados)')
+APT_FETCH = re.compile(r'^(?:Get|Des):\d+')
+APT_UNPACK = re.compile(r'^(?:Unpacking|Desempaquetando) (\S+)')
+APT_SETUP = re.compile(r'^(?:Setting up|Configurando) (\S+)')
+
+
+class AptProgress:
+    """
+    Estima el progreso de `apt-get update && apt-get upgrade` a partir de su
+    salida: 0-20% lista de paquetes y descarga, 20-100% desempaquetar y
+    configurar (cada paquete pasa por ambas).
+    """
+
+    def __init__(self):
+        self.total = None
+        self.steps = 0
+
+    def __call__(self, job, line):
+        previous = (job.progress, job.stage)
+        match = APT_UPGRADE_COUNT.match(line)
+        if match:
+            self.total = int(match.group(1))
+            job.stage = f"{self.total} paquetes por actualizar"
+            if not self.total:
+                job.progress = 100
+        elif APT_FETCH.match(line):
+            job.stage = "descargando paquetes"
+            job.progress = job.progress or 5
+        else:
+            match = APT_UNPACK.match(line) or APT_SETUP.match(line)
+            if match and self.total:
+                self.steps += 1
+                job.progress = min(99, 20 + 80 * self.steps / (2 * self.total))
+                job.stage = f"instalando {match.group(1).split(':')[0]}"
+        return (job.progress, job.stage) != previous
@@ -0,0 +1,114 @@
+"""
+Búsqueda de palabras clave de configuración en el texto dictado.
+
+Las claves (logs del sistema, manuales...) se compilan una vez en una sola
+expresión regular con forma de trie: en cada posición del texto el motor
+solo sigue la rama de los caracteres que coinciden, así que el coste no
+crece con el número de claves como el bucle `key in text` de antes.
+
+Las rutas candidatas de cada clave se comprueban de antemano y se guardan
+en una caché de stat con caducidad, de modo que la consulta normal no toca
+el disco.
+"""
+import os
+import re
+import time
+import threading
+
+DEFAULT_STAT_TTL = 60
+
+
+def trie_pattern(words):
+    """Regex equivalente a `w1|w2|...` pero agrupada por prefijos comunes."""
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[''] = True
+
+    def build(node):
+        end = node.get('') is True
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        if end:
+            # Clave completa aquí: lo que sigue es opcional (gana la más larga)
+            return '(?:' + body + ')?'
+        return body
+
+    return build(trie)
+
+
+class KeywordMatcher:
+    """
+    Claves -> valores. `aliases(key)` da otras formas de decir la clave
+    (p.ej. 'manual_red' -> 'manual red'); todas llevan al mismo valor.
+    """
+
+    def __init__(self, mapping, aliases=None):
+        self.values = {}
+        self.keys = {}
+        for key, value in mapping.items():
+            for form in [key] + list(aliases(key) if aliases else []):
+                form = form.lower()
+                if form and form not in self.keys:
+                    self.keys[form] = key
+                    self.values[key] = value
+        self.pattern = re.compile(trie_pattern(self.keys)) if self.keys else None
+
+    def find_all(self, text):
+        """(clave, valor) de cada clave presente en `text`, por orden de aparición."""
+        if self.pattern is None:
+            return []
+        found = []
+        seen = set()
+        for match in self.pattern.finditer(text.lower()):
+            key = self.keys[match.group(0)]
+            if key not in seen:
+                seen.add(key)
+                found.append((key, self.values[key]))
+        return found
+
+    def find(self, text):
+        """Primera clave presente en `text` como (clave, valor), o None."""
+        if self.pattern is None:
+            return None
+        match = self.pattern.search(text.lower())
+        if not match:
+            return None
+        key = self.keys[match.group(0)]
+        return key, self.values[key]
+
+
+class PathCache:
+    """Existencia de rutas, con caducidad; se recalcula solo al caducar."""
+
+    def __init__(self, ttl=DEFAULT_STAT_TTL):
+        self.ttl = ttl
+        self.entries = {}  # ruta -> (existe, comprobado)
+        self.lock = threading.Lock()
+
+    def exists(self, path):
+        now = time.monotonic()
+        with self.lock:
+            entry = self.entries.get(path)
+        if entry and now - entry[1] < self.ttl:
+            return entry[0]
+        exists = os.path.exists(path)
+        with self.lock:
+            self.entries[path] = (exists, now)
+        return exists
+
+    def first_existing(self, paths):
+        """Primera ruta de `paths` que existe, o None."""
+        for path in paths:
+            if self.exists(path):
+                return path
+        return None
+
+    def warm(self, paths):
+        """Comprueba `paths` de antemano (se llama en segundo plano al cargar)."""
+        for path in paths:
+            self.exists(path)
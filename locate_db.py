@@ -0,0 +1,285 @@
+"""
+Base de datos tipo `locate` propia de FinderSkill.
+
+Se construye a partir del estado del índice de archivos (sin otro recorrido
+del disco) o con un ParallelWalker, y se consulta dentro del proceso, sin
+depender de `updatedb` ni lanzar `locate`.
+
+Formato (little-endian), pensado para abrirse con mmap:
+
+    cabecera    MAGIC, versión, nº dirs, nº archivos, fecha, offsets
+    names       por cada directorio (en orden), sus archivos como
+                b'\\n' + clase + nombre; una sola región contigua
+    folded      copia de `names` con ASCII en minúsculas (mismos offsets)
+    name_index  Q por directorio: dónde empiezan sus nombres en `names`
+    dirs        rutas de directorio ordenadas con front-coding: varint de
+                bytes compartidos con la anterior, varint de longitud y el
+                resto; cada RESTART directorios se guarda la ruta entera
+    restarts    Q por bloque de RESTART directorios: offset en `dirs`
+
+La búsqueda corre sobre `folded` una expresión regular en minúsculas (en C,
+con búsqueda literal rápida en vez de clases [aA]) y solo por cada
+coincidencia mira la clase, comprueba el glob completo sobre el nombre
+decodificado (así '?' es un carácter y no un byte) y decodifica el
+directorio; el nombre con sus mayúsculas sale de `names`, en el mismo
+offset. La clase de extensión va delante del nombre, así filtrar por tipo
+no necesita tocar la extensión; una coincidencia que empiece en ese byte no
+cuenta (en `folded` la clase 'A' es una 'a' más).
+"""
+import os
+import re
+import mmap
+import fnmatch
+import time
+import struct
+from bisect import bisect_right
+
+MAGIC = b'BBLC'
+VERSION = 2
+HEADER = struct.Struct('<4sIQQdQQQQQQ')  # magic, version, n_dirs, n_files, built, names_off, names_len, index_off, dirs_off, dirs_len, restarts_off
+RESTART = 32
+
+# Clases de extensión (un byte delante de cada nombre)
+CLASSES = {
+    b'A': ('mp3', 'wav', 'ogg', 'flac', 'm4a', 'opus'),
+    b'I': ('jpg', 'jpeg', 'png', 'gif', 'webp', 'bmp', 'svg'),
+    b'D': ('pdf', 'md', 'txt', 'odt', 'doc', 'docx', 'rtf', 'epub'),
+    b'L': ('log', 'json', 'csv', 'xml', 'yaml', 'yml'),
+}
+OTHER = b'O'
+EXTENSION_CLASS = {ext: cls for cls, exts in CLASSES.items() for ext in exts}
+
+
+def extension_class(name):
+    ext = name.rsplit('.', 1)[-1].lower() if '.' in name else ''
+    return EXTENSION_CLASS.get(ext, OTHER)
+
+
+def _varint(value):
+    out = bytearray()
+    while True:
+        byte = value & 0x7f
+        value >>= 7
+        if value:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return out
+
+
+def _read_varint(buf, pos):
+    value = shift = 0
+    while True:
+        byte = buf[pos]
+        pos += 1
+        value |= (byte & 0x7f) << shift
+        if not byte & 0x80:
+            return value, pos
+        shift += 7
+
+
+def build_locate_db(path, walker, roots):
+    """Recorre `roots` con `walker` y escribe la base de datos de forma atómica."""
+    return write_locate_db(path, (
+        (entry.path, [name for name, _ in entry.files]) for entry in walker.walk(roots, with_stats=False)
+    ))
+
+
+def write_locate_db(path, listing):
+    """Escribe de forma atómica la base de datos de `listing`, pares (directorio, nombres)."""
+    listing = {
+        os.fsencode(folder): [os.fsencode(name) for name in names if '\n' not in name]
+        for folder, names in listing
+    }
+
+    names = bytearray()
+    name_index = bytearray()
+    dirs = bytearray()
+    restarts = bytearray()
+    previous = b''
+    n_files = 0
+    ordered = sorted(listing)
+    for i, folder in enumerate(ordered):
+        name_index += struct.pack('<Q', len(names))
+        for name in sorted(listing[folder]):
+            names += b'\n' + extension_class(os.fsdecode(name)) + name
+        n_files += len(listing[folder])
+
+        if i % RESTART == 0:
+            restarts += struct.pack('<Q', len(dirs))
+            shared = 0
+        else:
+            shared = 0
+            limit = min(len(previous), len(folder))
+            while shared < limit and previous[shared] == folder[shared]:
+                shared += 1
+        dirs += _varint(shared) + _varint(len(folder) - shared) + folder[shared:]
+        previous = folder
+    names += b'\n'
+
+    names_off = HEADER.size
+    index_off = names_off + 2 * len(names)
+    dirs_off = index_off + len(name_index)
+    restarts_off = dirs_off + len(dirs)
+    folder = os.path.dirname(path)
+    if folder and not os.path.exists(folder):
+        os.makedirs(folder)
+    tmp = path + ".tmp"
+    with open(tmp, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, len(ordered), n_files, time.time(),
+                            names_off, len(names), index_off, dirs_off, len(dirs), restarts_off))
+        f.write(names)
+        f.write(bytes(names).lower())
+        f.write(name_index)
+        f.write(dirs)
+        f.write(restarts)
+    os.replace(tmp, path)
+    return n_files
+
+
+def _literal(text):
+    """Patrón de `text` para la región en minúsculas (ñ/Ñ, á/Á no los pliega bytes.lower)."""
+    out = []
+    for char in text.lower():
+        upper = char.upper()
+        if char.isascii() or upper == char or len(upper) != 1:
+            out.append(re.escape(char.encode()))
+        else:
+            out.append(b'(?:' + re.escape(char.encode()) + b'|' + re.escape(upper.encode()) + b')')
+    return b''.join(out)
+
+
+# Un carácter en UTF-8 (o un byte suelto si el nombre no es UTF-8 válido)
+CHAR = b'(?:[\xc0-\xdf][\x80-\xbf]|[\xe0-\xef][\x80-\xbf]{2}|[\xf0-\xf7][\x80-\xbf]{3}|[^\n])'
+
+
+def _class_end(query, i):
+    """Posición del ']' que cierra la clase que abre query[i], o -1 (como fnmatch)."""
+    j = i + 1
+    if query[j:j + 1] == '!':
+        j += 1
+    if query[j:j + 1] == ']':
+        j += 1
+    return query.find(']', j)
+
+
+def _translate(query):
+    """
+    Glob -> regex de bytes sobre nombres en minúsculas que acepta al menos
+    lo mismo que el glob: '?' y cualquier clase [..] valen un carácter.
+    """
+    out = []
+    i = 0
+    while i < len(query):
+        char = query[i]
+        if char == '*':
+            out.append(b'[^\n]*')
+        elif char == '?':
+            out.append(CHAR)
+        elif char == '[' and _class_end(query, i) > 0:
+            out.append(CHAR)
+            i = _class_end(query, i)
+        else:
+            out.append(_literal(char))
+        i += 1
+    return b''.join(out)
+
+
+def compile_query(query):
+    """
+    Devuelve (núcleo, glob). `núcleo` se busca en la región en minúsculas y
+    marca los registros candidatos: la subcadena, o el glob sin sus '*' de
+    los extremos. `glob` comprueba el nombre entero, ya decodificado, con
+    '?', clases y mayúsculas de Unicode; si es None basta con el núcleo.
+    """
+    if not any(c in query for c in '*?['):
+        return re.compile(_literal(query)), None
+    glob = re.compile(fnmatch.translate(query), re.IGNORECASE)
+    core = query.strip('*')
+    if not core:
+        return None, glob
+    return re.compile(_translate(core)), glob
+
+
+class LocateDB:
+    """Base de datos abierta con mmap; `search` no lee el disco salvo páginas tocadas."""
+
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            self.mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, version, self.n_dirs, self.n_files, self.built, self.names_off, self.names_len,
+         index_off, self.dirs_off, dirs_len, restarts_off) = HEADER.unpack_from(self.mm, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"Unsupported locate database: {path}")
+        view = memoryview(self.mm)
+        self.names = view[self.names_off:self.names_off + self.names_len]
+        self.folded_off = self.names_off + self.names_len
+        self.name_index = view[index_off:index_off + 8 * self.n_dirs].cast('Q')
+        n_restarts = (self.n_dirs + RESTART - 1) // RESTART
+        self.restarts = view[restarts_off:restarts_off + 8 * n_restarts].cast('Q')
+
+    def close(self):
+        self.names.release()
+        self.name_index.release()
+        self.restarts.release()
+        self.mm.close()
+
+    def _dir(self, i):
+        block = i // RESTART
+        pos = self.dirs_off + self.restarts[block]
+        path = b''
+        for _ in range(block * RESTART, i + 1):
+            shared, pos = _read_varint(self.mm, pos)
+            length, pos = _read_varint(self.mm, pos)
+            path = path[:shared] + self.mm[pos:pos + length]
+            pos += length
+        return path
+
+    def search(self, query, limit=20, classes=None, accept=None):
+        """
+        Rutas cuyo nombre casa con `query` (glob o subcadena, sin distinguir
+        mayúsculas), en orden de ruta. `classes` limita por clase de
+        extensión, p.ej. [b'A', b'D'], y `accept(nombre)` descarta nombres
+        antes de que cuenten para `limit`.
+        """
+        core, glob = compile_query(query)
+        allowed = set(b''.join(classes)) if classes else None
+        mm = self.mm
+        # Offsets relativos a `names`; en `folded` son los mismos desplazados
+        shift = self.folded_off - self.names_off
+        base = self.folded_off
+        last = base + self.names_len
+        results = []
+        cache = {}
+        pos = base
+        while len(results) < limit:
+            if core is not None:
+                match = core.search(mm, pos, last)
+                if not match:
+                    break
+                # Registro (b'\n' + clase + nombre) que contiene la coincidencia
+                start = mm.rfind(b'\n', base, match.start())
+                if match.start() == start + 1:
+                    # Empieza en el byte de clase ('a' + 'udio.mp3'): no cuenta
+                    pos = match.start() + 1
+                    continue
+            else:
+                # Glob sin ningún literal ("*"): se recorren todos los registros
+                start = pos if pos < last - 1 else -1
+            if start < 0:
+                break
+            end = mm.find(b'\n', start + 1, last)
+            pos = end
+            if allowed is not None and mm[start + 1 - shift] not in allowed:
+                continue
+            name = mm[start + 2 - shift:end - shift]
+            if glob is not None and not glob.match(os.fsdecode(name)):
+                continue
+            if accept is not None and not accept(os.fsdecode(name)):
+                continue
+            i = bisect_right(self.name_index, start - base) - 1
+            folder = cache.get(i)
+            if folder is None:
+                folder = cache[i] = self._dir(i)
+            results.append(os.fsdecode(folder.rstrip(b'/') + b'/' + name))
+        return results
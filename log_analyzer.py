@@ -0,0 +1,314 @@
+"""
+Analizador de logs en streaming para el diagnóstico.
+
+Lee de varias fuentes a la vez (logs/app.log, las rutas de config/sys_logs.json
+y un volcado de journald en formato export) usando un LogCursor por archivo,
+así que cada pasada solo procesa lo añadido desde la anterior.
+
+Todas las palabras clave van en una sola expresión regular compilada que se
+aplica al bloque entero (no línea a línea). Las trazas de Python de varias
+líneas se agrupan en un único evento, y los eventos se agregan por firma
+normalizada (sin fechas, PIDs, direcciones, rutas ni números) con su cuenta y
+la primera y última vez que se vieron.
+"""
+import os
+import re
+import time
+import threading
+from .log_tail import LogCursor
+
+ERROR_PATTERNS = [
+    r'CRITICAL', r'FATAL', r'ERROR', r'Traceback \(most recent call last\)', r'Exception',
+    r'\bpanic\b', r'[Ss]egmentation fault', r'segfault', r'[Oo]ut of memory', r'oom-kill',
+    r'\b[Ff]ailed\b',
+]
+CRITICAL_WORDS = (b'CRITICAL', b'FATAL', b'panic', b'egmentation', b'segfault', b'ut of memory', b'oom-kill')
+
+# Líneas que continúan el evento anterior (frames de una traza, causas encadenadas)
+CONTINUATION = re.compile(rb'[ \t]|Traceback \(most recent call last\)|During handling|The above exception')
+# Inicio de la siguiente traza de una cadena (va detrás de una línea en blanco)
+CHAINED = re.compile(rb'\n*(?:Traceback \(most recent call last\)|During handling|The above exception)')
+
+# Orden importante: fechas antes que rutas y números
+SIGNATURE_MASKS = [
+    ('<TS>', r'\d{4}-\d{2}-\d{2}[ T]\d{2}:\d{2}:\d{2}(?:[.,]\d+)?(?:Z|[+-]\d{2}:?\d{2})?'),
+    ('<TS>', r'\b(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec) +\d{1,2} \d{2}:\d{2}:\d{2}'),
+    ('<TS>', r'\b\d{2}:\d{2}:\d{2}(?:[.,]\d+)?'),
+    ('<UUID>', r'\b[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}\b'),
+    ('<ADDR>', r'\b0x[0-9a-fA-F]+\b'),
+    ('<PID>', r'\[\d+\]|\bpid[=: ]\s*\d+'),
+    ('<HEX>', r'\b(?=[0-9a-f]*\d)[0-9a-f]{6,}\b'),
+    ('<PATH>', r'(?:[A-Za-z]:)?(?:/[\w.@+-]+){2,}/?'),
+    ('<N>', r'\d+'),
+]
+SIGNATURE_PATTERN = re.compile('|'.join(f'(?P<m{i}>{pattern})' for i, (_, pattern) in enumerate(SIGNATURE_MASKS)))
+SIGNATURE_MAX = 200
+
+# Cursores propios: los de DiagnosisSkill siguen la cola de app.log por separado
+CURSOR_FILE = "data/log_analyzer_cursors.json"
+
+DEFAULT_MAX_SIGNATURES = 1000
+
+_shared_lock = threading.Lock()
+
+
+def get_log_analyzer(core, logger):
+    """LogAnalyzer compartido (diagnóstico y monitor de salud leen las mismas fuentes)."""
+    with _shared_lock:
+        analyzer = getattr(core, 'log_analyzer', None)
+        if analyzer is None:
+            try:
+                from modules.utils import load_json_data
+                sys_logs = load_json_data("config/sys_logs.json") or {}
+            except Exception:
+                sys_logs = {}
+            analyzer = LogAnalyzer.from_config(core, logger, sys_logs=sys_logs)
+            core.log_analyzer = analyzer
+        return analyzer
+
+
+def error_signature(text):
+    """
+    Firma estable de un error: se enmascaran fechas, PIDs, direcciones, rutas
+    y números para que el mismo fallo repetido dé siempre la misma firma.
+    En una traza se usa la primera y la última línea (el tipo de excepción).
+    """
+    lines = [line for line in text.strip().splitlines() if line.strip()]
+    if not lines:
+        return ''
+    text = lines[0] if len(lines) == 1 else f"{lines[0]} | {lines[-1]}"
+    masked = SIGNATURE_PATTERN.sub(lambda m: SIGNATURE_MASKS[int(m.lastgroup[1:])][0], text)
+    return ' '.join(masked.split())[:SIGNATURE_MAX]
+
+
+def _first_chars(pattern):
+    """Caracteres con los que puede empezar `pattern`, o None si no es obvio."""
+    if pattern.startswith(r'\b'):
+        pattern = pattern[2:]
+    if pattern.startswith('['):
+        end = pattern.find(']')
+        chars = pattern[1:end]
+        return chars if end > 0 and chars.isalnum() else None
+    if pattern[:1].isalnum():
+        return pattern[0]
+    return None
+
+
+def compile_patterns(extra=None):
+    """
+    Une todos los patrones en una sola expresión. Si se sabe con qué letra
+    empieza cada uno, se antepone una clase de caracteres como prefiltro: el
+    motor descarta casi todas las posiciones sin probar cada alternativa.
+    """
+    patterns = ERROR_PATTERNS + list(extra or [])
+    combined = '|'.join(patterns)
+    firsts = [_first_chars(pattern) for pattern in patterns]
+    if all(firsts):
+        combined = f"(?=[{''.join(sorted(set(''.join(firsts))))}])(?:{combined})"
+    return re.compile(combined.encode())
+
+
+def split_events(data, pattern):
+    """
+    Recorre `data` (bytes con líneas completas) y devuelve los eventos que
+    casan con `pattern` como [(texto, nivel)], agrupando las trazas.
+    """
+    events = []
+    pos = 0
+    end = len(data)
+    while True:
+        match = pattern.search(data, pos)
+        if not match:
+            break
+        start = data.rfind(b'\n', 0, match.start()) + 1
+        stop = data.find(b'\n', match.end())
+        stop = end if stop < 0 else stop + 1
+
+        # Extender por las líneas de continuación y la línea final de la traza;
+        # "During handling of the above exception..." encadena la siguiente
+        in_trace = b'Traceback' in data[start:stop]
+        while stop < end:
+            nxt = data.find(b'\n', stop)
+            nxt = end if nxt < 0 else nxt + 1
+            line = data[stop:nxt]
+            if CONTINUATION.match(line):
+                in_trace = in_trace or line.startswith(b'Traceback')
+                stop = nxt
+                continue
+            if in_trace and line.strip():
+                stop = nxt  # "ValueError: ..." cierra la traza
+            if not in_trace:
+                break
+            chained = CHAINED.match(data, stop)
+            if not chained:
+                break
+            stop = data.rfind(b'\n', stop, chained.end()) + 1 or stop
+
+        text = data[start:stop]
+        level = 'critical' if any(word in text for word in CRITICAL_WORDS) else 'error'
+        events.append((text.decode('utf-8', 'replace').rstrip('\n'), level))
+        pos = stop
+    return events
+
+
+def parse_journal_export(data, pattern):
+    """
+    Eventos de un volcado `journalctl -o export`: registros de campos
+    KEY=valor separados por una línea vacía (los campos binarios llevan
+    la longitud en 64 bits). Cuenta los de prioridad <= 3 (err) o cuyo
+    mensaje casa con `pattern`.
+    """
+    events = []
+    record = {}
+    pos = 0
+    end = len(data)
+    while pos < end:
+        nxt = data.find(b'\n', pos)
+        if nxt < 0:
+            break
+        line = data[pos:nxt]
+        pos = nxt + 1
+        if not line:
+            if record:
+                event = _journal_event(record, pattern)
+                if event:
+                    events.append(event)
+                record = {}
+            continue
+        key, sep, value = line.partition(b'=')
+        if not sep:
+            # Campo binario: KEY\n<longitud LE64><datos>\n
+            size = int.from_bytes(data[pos:pos + 8], 'little')
+            value = data[pos + 8:pos + 8 + size]
+            pos += 8 + size + 1
+        record[key] = value
+    if record:
+        event = _journal_event(record, pattern)
+        if event:
+            events.append(event)
+    return events
+
+
+def _journal_event(record, pattern):
+    message = record.get(b'MESSAGE', b'')
+    try:
+        priority = int(record.get(b'PRIORITY', b'6'))
+    except ValueError:
+        priority = 6
+    if priority > 3 and not pattern.search(message):
+        return None
+    unit = record.get(b'_SYSTEMD_UNIT') or record.get(b'SYSLOG_IDENTIFIER') or b'journal'
+    text = f"{unit.decode('utf-8', 'replace')}: {message.decode('utf-8', 'replace')}"
+    level = 'critical' if priority <= 2 else 'error'
+    try:
+        when = int(record.get(b'__REALTIME_TIMESTAMP', b'0')) / 1e6 or None
+    except ValueError:
+        when = None
+    return text, level, when
+
+
+class LogAnalyzer:
+    """
+    Agrega errores de varias fuentes por firma.
+
+    `sources` = [(ruta, tipo)] con tipo 'text' o 'journal'. `signatures`
+    guarda por firma: count, first_seen, last_seen, level, source y sample
+    (el último texto completo). Se limita a `max_signatures`, descartando
+    las que hace más tiempo que no aparecen.
+    """
+
+    def __init__(self, sources, logger, cursor=None, extra_patterns=None,
+                 max_signatures=DEFAULT_MAX_SIGNATURES, max_bytes=4 * 1024 * 1024):
+        self.sources = list(sources)
+        self.logger = logger
+        self.cursor = cursor or LogCursor(CURSOR_FILE, logger)
+        self.pattern = compile_patterns(extra_patterns)
+        self.max_signatures = max_signatures
+        self.max_bytes = max_bytes
+        self.signatures = {}
+        self.lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, core, logger, app_log="logs/app.log", sys_logs=None):
+        """Fuentes: app.log, las rutas de sys_logs.json y el volcado de journald."""
+        config = core.skills_config.get('diagnosis', {}).get('config', {})
+        sources = [(app_log, 'text')]
+        seen = {app_log}
+        for paths in (sys_logs or {}).values():
+            for path in paths if isinstance(paths, list) else [paths]:
+                if path not in seen:
+                    seen.add(path)
+                    sources.append((path, 'text'))
+        journal = config.get('journal_export')
+        if journal:
+            sources.append((journal, 'journal'))
+        return cls(
+            sources, logger,
+            extra_patterns=config.get('log_patterns'),
+            max_signatures=config.get('max_signatures', DEFAULT_MAX_SIGNATURES)
+        )
+
+    def poll(self):
+        """Procesa lo añadido en todas las fuentes. Devuelve los eventos nuevos."""
+        events = []
+        for path, kind in self.sources:
+            try:
+                if not os.path.exists(path):
+                    continue
+                delimiter = b'\n\n' if kind == 'journal' else b'\n'
+                data, _ = self.cursor.read_new_bytes(path, self.max_bytes, delimiter)
+                if data:
+                    events.extend(self.feed(data, path, kind))
+            except PermissionError:
+                continue
+            except Exception as e:
+                self.logger.error(f"Error reading log {path}: {e}")
+        self.cursor.save()
+        return events
+
+    def feed(self, data, source, kind='text', now=None):
+        """Analiza un bloque de bytes y actualiza el agregado."""
+        now = now or time.time()
+        if kind == 'journal':
+            parsed = parse_journal_export(data, self.pattern)
+        else:
+            parsed = [(text, level, None) for text, level in split_events(data, self.pattern)]
+
+        events = []
+        with self.lock:
+            for text, level, when in parsed:
+                when = when or now
+                signature = error_signature(text)
+                entry = self.signatures.get(signature)
+                if entry is None:
+                    entry = self.signatures[signature] = {
+                        'count': 0, 'first_seen': when, 'level': level, 'source': source
+                    }
+                entry['count'] += 1
+                entry['last_seen'] = when
+                entry['sample'] = text
+                if level == 'critical':
+                    entry['level'] = level
+                events.append({'signature': signature, 'text': text, 'level': level, 'source': source, 'time': when})
+            if len(self.signatures) > self.max_signatures:
+                self._evict()
+        return events
+
+    def _evict(self):
+        keep = sorted(self.signatures.items(), key=lambda item: item[1]['last_seen'], reverse=True)
+        self.signatures = dict(keep[:self.max_signatures])
+
+    def top(self, limit=3, since=None, exclude_sources=None):
+        """
+        Firmas más repetidas (opcionalmente vistas desde `since`). Las de
+        `exclude_sources` se quitan antes de cortar a `limit`.
+        """
+        excluded = set(exclude_sources or ())
+        with self.lock:
+            items = [
+                dict(entry, signature=signature)
+                for signature, entry in self.signatures.items()
+                if (since is None or entry['last_seen'] >= since) and entry['source'] not in excluded
+            ]
+        items.sort(key=lambda entry: (entry['level'] == 'critical', entry['count']), reverse=True)
+        return items[:limit]
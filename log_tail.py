@@ -0,0 +1,119 @@
+"""
+Lectura acotada de logs: últimas líneas leyendo bloques desde el final y un
+cursor persistente (inodo, offset) para leer solo lo añadido desde la última
+vez. El coste depende de lo que se lee, no del tamaño del archivo.
+"""
+import os
+import json
+import threading
+
+CURSOR_FILE = "data/log_cursors.json"
+BLOCK = 64 * 1024
+# Si se ha añadido más que esto desde la última lectura, solo se lee el final
+DEFAULT_MAX_BYTES = 4 * 1024 * 1024
+
+
+def tail_lines(path, n, block=BLOCK):
+    """
+    Últimas `n` líneas de `path` leyendo bloques hacia atrás desde el final.
+    Devuelve (líneas, offset de fin) para poder continuar con un cursor.
+    """
+    with open(path, 'rb') as f:
+        end = f.seek(0, os.SEEK_END)
+        position = end
+        data = b''
+        while position > 0 and data.count(b'\n') <= n:
+            step = min(block, position)
+            position -= step
+            f.seek(position)
+            data = f.read(step) + data
+    # Una última línea sin terminar se deja para el cursor
+    partial = len(data) - data.rfind(b'\n') - 1
+    if partial and partial < len(data):
+        data = data[:-partial]
+        end -= partial
+    lines = data.splitlines()
+    if position > 0:
+        lines = lines[1:]  # La primera puede estar cortada
+    return [line.decode('utf-8', 'replace') for line in lines[-n:]], end
+
+
+class LogCursor:
+    """
+    Posición de lectura por archivo de log, guardada en disco.
+
+    Detecta rotación (cambia el inodo o el archivo encoge) y en ese caso, o
+    si no hay cursor previo, indica que hay que volver a partir de la cola.
+    Con `state_file=None` el cursor vive solo en memoria.
+    """
+
+    def __init__(self, state_file=CURSOR_FILE, logger=None):
+        self.state_file = state_file
+        self.logger = logger
+        self.lock = threading.Lock()
+        self.cursors = {}
+        if state_file and os.path.exists(state_file):
+            try:
+                with open(state_file, 'r') as f:
+                    self.cursors = json.load(f)
+            except Exception as e:
+                if logger:
+                    logger.error(f"Error loading log cursors: {e}")
+
+    def read_new(self, path, max_bytes=DEFAULT_MAX_BYTES):
+        """
+        Devuelve (líneas nuevas, continuo). `continuo` es False si no había
+        cursor, el log ha rotado o se ha saltado parte de lo añadido por
+        superar `max_bytes`; en ese caso las líneas no enlazan con la lectura
+        anterior.
+        """
+        data, continuous = self.read_new_bytes(path, max_bytes)
+        return [line.decode('utf-8', 'replace') for line in data.splitlines()], continuous
+
+    def read_new_bytes(self, path, max_bytes=DEFAULT_MAX_BYTES, delimiter=b'\n'):
+        """
+        Como read_new, pero devuelve los bytes en bruto hasta el último
+        `delimiter` completo (lo que va detrás se lee la próxima vez).
+        """
+        with self.lock:
+            st = os.stat(path)
+            cursor = self.cursors.get(path)
+            continuous = bool(cursor) and cursor[0] == st.st_ino and cursor[1] <= st.st_size
+            offset = cursor[1] if continuous else 0
+            if st.st_size - offset > max_bytes:
+                offset = st.st_size - max_bytes
+                continuous = False
+
+            with open(path, 'rb') as f:
+                f.seek(offset)
+                data = f.read(st.st_size - offset)
+            # Un registro a medio escribir se deja para la próxima lectura
+            cut = data.rfind(delimiter) + len(delimiter) if delimiter in data else 0
+            data = data[:cut]
+            if not continuous and offset:
+                first = data.find(delimiter) + len(delimiter)
+                data = data[first:]
+            self.cursors[path] = [st.st_ino, offset + cut]
+            return data, continuous
+
+    def seek_end(self, path, offset=None):
+        with self.lock:
+            st = os.stat(path)
+            self.cursors[path] = [st.st_ino, st.st_size if offset is None else offset]
+
+    def save(self):
+        if not self.state_file:
+            return
+        with self.lock:
+            cursors = dict(self.cursors)
+        try:
+            folder = os.path.dirname(self.state_file)
+            if folder and not os.path.exists(folder):
+                os.makedirs(folder)
+            tmp = self.state_file + ".tmp"
+            with open(tmp, 'w') as f:
+                json.dump(cursors, f)
+            os.replace(tmp, self.state_file)
+        except Exception as e:
+            if self.logger:
+                self.logger.error(f"Error saving log cursors: {e}")
@@ -20,7 +20,7 @@ class MediaSkill(BaseSkill):
                 media = self.core.vlc_instance.media_new(emisora_encontrada['url'])
                 self.core.player.set_media(media)
                 self.core.player.play()
-                self.core.event_queue.put({'type': 'speaker_status', 'status': 'busy'}) # Evitar que Neo se escuche a sí mismo
+                self.set_speaker_status('busy') # Evitar que Neo se escuche a sí mismo
             except Exception as e:
                 self.speak("Hubo un error al sintonizar la radio.")
                 self.core.app_logger.error(f"Error VLC: {e}")
@@ -28,14 +28,14 @@ class MediaSkill(BaseSkill):
             nombres = ", ".join([e['nombre'] for e in self.core.radios])
             self.speak(f"No encuentro esa emisora. Tengo: {nombres}.")
 
-            self.core.event_queue.put({'type': 'speaker_status', 'status': 'idle'})
+            self.set_speaker_status('idle')
             self.speak(response)
 
     def detener_radio(self, command, response, **kwargs):
         """Detiene la reproducción de la radio."""
         if self.core.player:
             self.core.player.stop()
-            self.core.event_queue.put({'type': 'speaker_status', 'status': 'idle'})
+            self.set_speaker_status('idle')
             self.speak(response)
         else:
             self.speak("No hay radio reproduciéndose.")
@@ -0,0 +1,195 @@
+"""
+Muestreo de métricas del sistema en segundo plano.
+
+Lee /proc directamente (sin procesos ni psutil) cada `metrics_interval`
+segundos y guarda cada serie en un anillo de tamaño fijo sobre array('d'),
+con capacidad para 15 minutos. Así el valor actual, las tasas (bytes/s) y
+las medias de 1/5/15 minutos se responden al momento, sin esperar a
+muestrear. El propio hilo mide su coste de CPU (`overhead()`).
+"""
+import os
+import time
+import threading
+from array import array
+
+DEFAULT_INTERVAL = 2.0
+WINDOW = 15 * 60
+DISK_EVERY = 15  # El disco cambia despacio: una lectura cada N muestras
+SERIES = ('cpu', 'ram', 'disk', 'net_rx', 'net_tx', 'load')
+
+_shared_lock = threading.Lock()
+
+
+def get_metrics_sampler(core):
+    """MetricsSampler compartido; arranca con la primera consulta."""
+    with _shared_lock:
+        sampler = getattr(core, 'metrics_sampler', None)
+        if sampler is None:
+            config = core.skills_config.get('system', {}).get('config', {})
+            sampler = MetricsSampler(interval=config.get('metrics_interval', DEFAULT_INTERVAL))
+            sampler.start()
+            core.metrics_sampler = sampler
+        return sampler
+
+
+class Ring:
+    """Anillo de floats de tamaño fijo."""
+
+    __slots__ = ('data', 'size', 'count', 'pos')
+
+    def __init__(self, size):
+        self.data = array('d', bytes(8 * size))
+        self.size = size
+        self.count = 0
+        self.pos = 0
+
+    def append(self, value):
+        self.data[self.pos] = value
+        self.pos = (self.pos + 1) % self.size
+        if self.count < self.size:
+            self.count += 1
+
+    def last(self, n=1):
+        """Los `n` valores más recientes, del más antiguo al más nuevo."""
+        n = min(n, self.count)
+        start = (self.pos - n) % self.size
+        if start + n <= self.size:
+            return self.data[start:start + n]
+        return self.data[start:] + self.data[:self.pos]
+
+    def latest(self):
+        return self.data[(self.pos - 1) % self.size] if self.count else None
+
+
+class ProcReader:
+    """Fichero de /proc abierto una vez y releído desde el principio."""
+
+    def __init__(self, path):
+        self.fd = os.open(path, os.O_RDONLY)
+
+    def read(self):
+        os.lseek(self.fd, 0, os.SEEK_SET)
+        return os.read(self.fd, 65536)
+
+
+class MetricsSampler:
+    def __init__(self, interval=DEFAULT_INTERVAL, disk_path='/'):
+        self.interval = interval
+        self.disk_path = disk_path
+        size = int(WINDOW / interval) + 1
+        self.series = {name: Ring(size) for name in SERIES}
+        self.stat = ProcReader('/proc/stat')
+        self.meminfo = ProcReader('/proc/meminfo')
+        self.netdev = ProcReader('/proc/net/dev')
+        self.loadavg = ProcReader('/proc/loadavg')
+        self.previous_cpu = None
+        self.previous_net = None
+        self.samples = 0
+        self.cpu_time = 0.0
+        self.started = None
+        self.running = False
+
+    def start(self):
+        if self.running:
+            return
+        self.running = True
+        self.started = time.monotonic()
+        threading.Thread(target=self._loop, daemon=True).start()
+
+    def _loop(self):
+        while self.running:
+            begin = time.thread_time()
+            try:
+                self.sample()
+            except Exception:
+                pass
+            self.cpu_time += time.thread_time() - begin
+            time.sleep(self.interval)
+
+    def sample(self, now=None):
+        now = now or time.monotonic()
+        # CPU y red son diferencias: la primera lectura solo sirve de referencia
+        cpu = self._cpu()
+        if cpu is not None:
+            self.series['cpu'].append(cpu)
+        self.series['ram'].append(self._ram())
+        net = self._net(now)
+        if net is not None:
+            self.series['net_rx'].append(net[0])
+            self.series['net_tx'].append(net[1])
+        self.series['load'].append(float(self.loadavg.read().split()[0]))
+        if self.samples % DISK_EVERY == 0:
+            st = os.statvfs(self.disk_path)
+            used = (st.f_blocks - st.f_bfree) * st.f_frsize
+            total = used + st.f_bavail * st.f_frsize
+            disk = 100.0 * used / total if total else 0.0
+        else:
+            disk = self.series['disk'].latest()
+        self.series['disk'].append(disk)
+        self.samples += 1
+
+    def _cpu(self):
+        line = self.stat.read().split(b'\n', 1)[0]
+        fields = [int(x) for x in line.split()[1:9]]
+        idle = fields[3] + fields[4]
+        total = sum(fields)
+        previous, self.previous_cpu = self.previous_cpu, (idle, total)
+        if previous is None or total == previous[1]:
+            return None
+        return 100.0 * (1 - (idle - previous[0]) / (total - previous[1]))
+
+    def _ram(self):
+        values = {}
+        for line in self.meminfo.read().split(b'\n'):
+            key, _, rest = line.partition(b':')
+            if key in (b'MemTotal', b'MemAvailable'):
+                values[key] = int(rest.split()[0])
+                if len(values) == 2:
+                    break
+        total = values.get(b'MemTotal')
+        return 100.0 * (1 - values.get(b'MemAvailable', 0) / total) if total else 0.0
+
+    def _net(self, now):
+        rx = tx = 0
+        for line in self.netdev.read().split(b'\n')[2:]:
+            name, _, rest = line.partition(b':')
+            if not rest or name.strip() == b'lo':
+                continue
+            fields = rest.split()
+            rx += int(fields[0])
+            tx += int(fields[8])
+        previous, self.previous_net = self.previous_net, (now, rx, tx)
+        if previous is None or now <= previous[0]:
+            return None
+        elapsed = now - previous[0]
+        return max(0, rx - previous[1]) / elapsed, max(0, tx - previous[2]) / elapsed
+
+    def current(self, name):
+        """Último valor (%, bytes/s o carga), o None si aún no hay muestras."""
+        return self.series[name].latest()
+
+    def average(self, name, minutes=1):
+        values = self.series[name].last(max(1, int(minutes * 60 / self.interval)))
+        return sum(values) / len(values) if values else None
+
+    def averages(self, name):
+        """Medias de 1, 5 y 15 minutos (como loadavg)."""
+        return tuple(self.average(name, minutes) for minutes in (1, 5, 15))
+
+    def trend(self, name, threshold=10.0):
+        """'subiendo', 'bajando' o 'estable': último minuto frente a los últimos 15."""
+        short, _, long = self.averages(name)
+        if short is None or self.series[name].count < 60 / self.interval:
+            return 'estable'
+        if short - long > threshold:
+            return 'subiendo'
+        if long - short > threshold:
+            return 'bajando'
+        return 'estable'
+
+    def overhead(self):
+        """Fracción de una CPU usada por el propio muestreo desde que arrancó."""
+        if not self.started:
+            return 0.0
+        elapsed = time.monotonic() - self.started
+        return self.cpu_time / elapsed if elapsed else 0.0
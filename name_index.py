@@ -0,0 +1,204 @@
+"""
+Índice de nombres de archivo en memoria basado en trigramas.
+
+Cada nombre (en minúsculas) se parte en trigramas y cada trigrama apunta a una
+lista de ids en un array('I'). Una búsqueda por subcadena intersecta las listas
+de sus trigramas empezando por la más corta y verifica los candidatos, así que
+no depende del tamaño total del índice. El nombre se rellena con PAD por la
+izquierda para que los prefijos de 1 y 2 letras también tengan trigrama.
+"""
+import os
+import time
+import heapq
+import threading
+from array import array
+from .fuzzy import phonetic_grams
+
+PAD = '\x01\x01'
+
+# Calidad de la coincidencia (pesa más que la antigüedad y la profundidad)
+EXACT, STEM, PREFIX, WORD, SUBSTRING = 8.0, 7.0, 6.0, 4.0, 2.0
+WORD_SEPARATORS = ' _-.()[]'
+
+# Cota de trabajo por consulta (ver NameIndex._candidates)
+MAX_MATCHES = 500
+MAX_EXAMINED = 20000
+
+
+def trigrams(text):
+    padded = PAD + text
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class NameIndex:
+    """
+    Índice de trigramas sobre los basenames.
+
+    Los borrados solo marcan el id como libre; las listas se compactan en
+    segundo plano cuando los huecos superan una cuarta parte del total. Con
+    `phonetic` también se indexan los trigramas de las claves fonéticas (ver
+    fuzzy.py).
+    """
+
+    def __init__(self, phonetic=True):
+        self.phonetic = phonetic
+        self.lock = threading.Lock()
+        self.paths = []
+        self.names = []
+        self.mtimes = array('d')
+        self.ids = {}
+        self.postings = {}
+        self.exact = {}  # nombre y nombre sin extensión -> {ids}
+        self.dead = 0
+        self.changes = None  # altas y bajas mientras se compacta, o None
+
+    def __len__(self):
+        return len(self.ids)
+
+    def add(self, path, mtime):
+        with self.lock:
+            self._insert(path, mtime)
+
+    def _insert(self, path, mtime):
+        if self.changes is not None:
+            self.changes.append((path, mtime))
+        doc = self.ids.get(path)
+        if doc is not None:
+            self.mtimes[doc] = mtime
+            return
+        doc = len(self.paths)
+        name = os.path.basename(path).lower()
+        self.paths.append(path)
+        self.names.append(name)
+        self.mtimes.append(mtime)
+        self.ids[path] = doc
+        for key in {name, os.path.splitext(name)[0]}:
+            self.exact.setdefault(key, set()).add(doc)
+        grams = trigrams(name)
+        if self.phonetic:
+            # Para FuzzyMatcher (consultas habladas mal reconocidas)
+            grams |= phonetic_grams(name)
+        for gram in grams:
+            posting = self.postings.get(gram)
+            if posting is None:
+                posting = self.postings[gram] = array('I')
+            posting.append(doc)
+
+    def remove(self, path):
+        with self.lock:
+            self._remove(path)
+            if self.changes is None and self.dead > 1000 and self.dead * 4 > len(self.paths):
+                self.changes = []
+                threading.Thread(target=self._compact, daemon=True).start()
+
+    def _remove(self, path):
+        if self.changes is not None:
+            self.changes.append((path, None))
+        doc = self.ids.pop(path, None)
+        if doc is None:
+            return
+        self.paths[doc] = None
+        name = self.names[doc]
+        for key in {name, os.path.splitext(name)[0]}:
+            docs = self.exact.get(key)
+            if docs is not None:
+                docs.discard(doc)
+                if not docs:
+                    del self.exact[key]
+        self.dead += 1
+
+    def _compact(self):
+        """
+        Rehace las listas sin huecos fuera del lock (las búsquedas siguen con
+        las actuales) y al sustituirlas aplica lo que haya cambiado entretanto.
+        """
+        with self.lock:
+            entries = [(p, self.mtimes[i]) for i, p in enumerate(self.paths) if p is not None]
+        fresh = NameIndex(self.phonetic)
+        for path, mtime in entries:
+            fresh._insert(path, mtime)
+        with self.lock:
+            for path, mtime in self.changes:
+                if mtime is None:
+                    fresh._remove(path)
+                else:
+                    fresh._insert(path, mtime)
+            self.paths, self.names, self.mtimes = fresh.paths, fresh.names, fresh.mtimes
+            self.ids, self.postings, self.exact, self.dead = fresh.ids, fresh.postings, fresh.exact, fresh.dead
+            self.changes = None
+
+    def _candidates(self, query):
+        """
+        Ids cuyo nombre contiene `query`.
+
+        Primero salen los nombres iguales a `query` (con o sin extensión),
+        que se buscan directamente y no cuentan para las cotas. Después se
+        recorre la lista de trigramas más corta, de los últimos ids añadidos
+        a los primeros, verificando cada candidato, y se para al reunir
+        MAX_MATCHES coincidencias o tras examinar MAX_EXAMINED ids: así el
+        coste queda acotado aunque la consulta sea muy poco selectiva.
+        """
+        exact = self.exact.get(query, ())
+        for doc in exact:
+            yield doc, 0
+
+        if len(query) >= 3:
+            grams = {query[i:i + 3] for i in range(len(query) - 2)}
+        else:
+            grams = {(PAD + query)[-3:]}
+
+        shortest = None
+        for gram in grams:
+            posting = self.postings.get(gram)
+            if posting is None:
+                return
+            if shortest is None or len(posting) < len(shortest):
+                shortest = posting
+
+        matches = 0
+        for examined, doc in enumerate(reversed(shortest)):
+            if matches >= MAX_MATCHES or examined >= MAX_EXAMINED:
+                break
+            if self.paths[doc] is None or doc in exact:
+                continue
+            pos = self.names[doc].find(query)
+            if pos < 0 or (len(query) < 3 and pos != 0):
+                continue
+            matches += 1
+            yield doc, pos
+
+    def search(self, query, limit=10):
+        """
+        Busca `query` como subcadena del nombre (o prefijo si tiene menos de
+        3 caracteres). Devuelve [{'path', 'score'}] ordenado por relevancia:
+        calidad de la coincidencia, recencia y profundidad de la ruta.
+        """
+        query = query.strip().lower()
+        if not query:
+            return []
+        now = time.time()
+        with self.lock:
+            scored = [
+                (self._score(self.names[doc], query, pos, self.paths[doc], self.mtimes[doc], now), self.paths[doc])
+                for doc, pos in self._candidates(query)
+            ]
+
+        best = heapq.nlargest(limit, scored)
+        return [{'path': path, 'score': round(score, 3)} for score, path in best]
+
+    def _score(self, name, query, pos, path, mtime, now):
+        if name == query:
+            quality = EXACT
+        elif os.path.splitext(name)[0] == query:
+            quality = STEM
+        elif pos == 0:
+            quality = PREFIX
+        elif name[pos - 1] in WORD_SEPARATORS:
+            quality = WORD
+        else:
+            quality = SUBSTRING
+        age_days = max(0.0, now - mtime) / 86400
+        recency = 1.0 / (1.0 + age_days / 30)
+        depth = path.count(os.sep)
+        return quality + recency - 0.05 * depth
+
@@ -1,11 +1,30 @@
+from concurrent.futures import CancelledError
+
 from . import BaseSkill
+from .jobs import get_job_manager, describe
+from .executor import get_executor
+from .instrumentation import span
 
 class NetworkSkill(BaseSkill):
+    def _in_background(self, func, *args, kind='query', template="{}"):
+        """Ejecuta una llamada bloqueante de network_manager en el executor y dice el resultado."""
+        def finished(res):
+            if isinstance(res, CancelledError):
+                return
+            if isinstance(res, Exception):
+                self.core.app_logger.error(f"Network error in {getattr(func, '__name__', func)}: {res}")
+                self.speak(f"Hubo un error: {res}")
+            else:
+                self.speak(template.format(res))
+
+        get_executor(self.core).call(func, *args, kind=kind, on_done=finished)
+
     def scan(self, command, response, **kwargs):
         if self.core.network_manager:
-            # self.speak("Iniciando escaneo de red, dame unos segundos...")
-            res = self.core.network_manager.scan_network()
-            return f"Escaneo completado: {res}"
+            # Un escaneo de red tarda: va a la cola 'network', como el speedtest
+            self.speak("Iniciando escaneo de red, dame unos segundos...", progress=True)
+            self._in_background(self.core.network_manager.scan_network, kind='network',
+                                template="Escaneo completado: {}")
         else:
             return "Error: Módulo de red no disponible."
 
@@ -33,16 +52,14 @@ class NetworkSkill(BaseSkill):
             self.core.app_logger.error(f"Error checking aliases: {e}")
             
         if self.core.network_manager:
-            res = self.core.network_manager.ping_host(target)
-            return res
+            self._in_background(self.core.network_manager.ping_host, target)
         else:
             return "Error: Módulo de red no disponible."
 
     def whois(self, command, response, **kwargs):
         target = command.replace("whois a", "").replace("haz un whois a", "").strip()
         if self.core.network_manager:
-            res = self.core.network_manager.whois_lookup(target)
-            return res
+            self._in_background(self.core.network_manager.whois_lookup, target)
         else:
             return "Error: Módulo de red no disponible."
             
@@ -51,7 +68,8 @@ class NetworkSkill(BaseSkill):
         import requests
         try:
             self.speak(response)
-            ip = requests.get('https://api.ipify.org').text
+            with span('network'):
+                ip = requests.get('https://api.ipify.org').text
             self.speak(f"Tu IP pública es {ip}")
         except Exception as e:
             self.speak("No pude obtener la IP pública. Verifica tu conexión.")
@@ -63,11 +81,32 @@ class NetworkSkill(BaseSkill):
     def speedtest(self, command, response, **kwargs):
         """Ejecuta un test de velocidad."""
         if self.core.sysadmin_manager:
+            jobs = get_job_manager(self.core)
+            current = jobs.status('speedtest')
+            if current and current.active:
+                self.speak(describe(current))
+                return
             self.speak(response)
-            res = self.core.sysadmin_manager.run_speedtest()
-            if "error" in res:
-                self.speak(f"Hubo un error: {res['error']}")
-            else:
-                self.speak(f"Test completado. Bajada: {res['download']}. Subida: {res['upload']}. Ping: {res['ping']}.")
+            # Tarda su rato: trabajo en la cola 'network' que avisa al terminar
+            jobs.start_call(
+                'speedtest', "prueba de velocidad", self.core.sysadmin_manager.run_speedtest,
+                kind='network', on_done=self._speedtest_finished
+            )
         else:
             self.speak("No tengo acceso al módulo de administración.")
+
+    def _speedtest_finished(self, job):
+        res = job.result
+        if isinstance(res, Exception):
+            self.speak(f"Hubo un error: {res}")
+        elif not isinstance(res, dict):
+            self.speak("El test de velocidad no devolvió resultados.")
+        elif "error" in res:
+            self.speak(f"Hubo un error: {res['error']}")
+        else:
+            self.speak(f"Test completado. Bajada: {res['download']}. Subida: {res['upload']}. Ping: {res['ping']}.")
+
+    def speedtest_status(self, command, response, **kwargs):
+        """Comando de voz: "¿cómo va el test de velocidad?"."""
+        status = describe(get_job_manager(self.core).status('speedtest'))
+        self.speak(status or "No hay ningún test de velocidad en marcha.")
@@ -0,0 +1,153 @@
+"""
+Últimos archivos encontrados, compartidos entre skills.
+
+FinderSkill, FilesSkill y VisualSkill guardan aquí cada hallazgo y
+"muéstramelo" lee el más reciente de memoria, sin tocar el disco. La
+historia está acotada (`recent_max`) y las entradas caducan (`recent_ttl`).
+Se guarda en disco en otro hilo, como mucho una vez cada `save_interval`
+segundos y de forma atómica, solo para recordarla tras un reinicio.
+"""
+import os
+import json
+import time
+import threading
+from collections import deque
+
+RECENT_FILE = "data/recent_results.json"
+LEGACY_FILE = "data/finder_history.json"
+DEFAULT_MAX_ENTRIES = 20
+DEFAULT_TTL = 24 * 3600
+SAVE_INTERVAL = 5.0
+
+AUDIO = ('.mp3', '.wav', '.ogg', '.flac', '.m4a', '.opus')
+IMAGES = ('.jpg', '.jpeg', '.png', '.gif', '.webp', '.bmp', '.svg')
+LOGS = ('.log',)
+
+_shared_lock = threading.Lock()
+
+
+def get_recent_results(core):
+    """RecentResults compartido; también lo usan Files y Visual."""
+    with _shared_lock:
+        recent = getattr(core, 'recent_results', None)
+        if recent is None:
+            config = core.skills_config.get('finder', {}).get('config', {})
+            recent = RecentResults(
+                max_entries=config.get('recent_max', DEFAULT_MAX_ENTRIES),
+                ttl=config.get('recent_ttl', DEFAULT_TTL),
+                logger=core.app_logger,
+                context=getattr(core, 'context', None)
+            )
+            core.recent_results = recent
+        return recent
+
+
+def file_type(path):
+    """'audio', 'image', 'log' o 'doc' según la extensión."""
+    ext = os.path.splitext(path)[1].lower()
+    if ext in AUDIO:
+        return 'audio'
+    if ext in IMAGES:
+        return 'image'
+    if ext in LOGS:
+        return 'log'
+    return 'doc'
+
+
+class RecentResults:
+    """Historia acotada con TTL; lo más reciente primero."""
+
+    def __init__(self, path=RECENT_FILE, max_entries=DEFAULT_MAX_ENTRIES, ttl=DEFAULT_TTL,
+                 save_interval=SAVE_INTERVAL, logger=None, context=None):
+        self.path = path
+        self.ttl = ttl
+        self.save_interval = save_interval
+        self.logger = logger
+        # core.context['last_found_file'] se mantiene para quien aún lo lea
+        self.context = context
+        self.lock = threading.Lock()
+        self.save_lock = threading.Lock()
+        self.entries = deque(maxlen=max_entries)
+        self.saved_at = 0.0
+        self.save_pending = False
+        self._load()
+
+    def _load(self):
+        path = self.path if os.path.exists(self.path) else LEGACY_FILE
+        if not os.path.exists(path):
+            return
+        try:
+            with open(path, 'r') as f:
+                data = json.load(f)
+            # El archivo antiguo de FinderSkill guardaba un único resultado
+            entries = [data] if isinstance(data, dict) else data
+            now = time.time()
+            self.entries.extend(e for e in entries if now - e['timestamp'] < self.ttl)
+        except Exception as e:
+            if self.logger:
+                self.logger.error(f"Error loading recent results: {e}")
+
+    def add(self, path, ftype=None, source=None):
+        """Registra un hallazgo; el guardado en disco queda programado."""
+        entry = {
+            'path': path,
+            'type': ftype or file_type(path),
+            'source': source,
+            'timestamp': time.time()
+        }
+        with self.lock:
+            self.entries.appendleft(entry)
+            if self.context is not None:
+                self.context['last_found_file'] = path
+            self._schedule_save()
+        return entry
+
+    def last(self):
+        """Resultado más reciente sin caducar, o None."""
+        with self.lock:
+            if not self.entries:
+                return None
+            entry = self.entries[0]
+            if time.time() - entry['timestamp'] >= self.ttl:
+                # Lo más reciente va delante: si esta ha caducado, todas
+                self.entries.clear()
+                return None
+            return entry
+
+    def last_path(self):
+        entry = self.last()
+        return entry['path'] if entry else None
+
+    def history(self, limit=None):
+        now = time.time()
+        with self.lock:
+            entries = [e for e in self.entries if now - e['timestamp'] < self.ttl]
+        return entries[:limit] if limit else entries
+
+    def _schedule_save(self):
+        if self.save_pending:
+            return
+        self.save_pending = True
+        delay = max(0.0, self.save_interval - (time.monotonic() - self.saved_at))
+        timer = threading.Timer(delay, self.flush)
+        timer.daemon = True
+        timer.start()
+
+    def flush(self):
+        """Escribe la historia ya (write + rename)."""
+        with self.lock:
+            entries = list(self.entries)
+            self.save_pending = False
+            self.saved_at = time.monotonic()
+        try:
+            folder = os.path.dirname(self.path)
+            if folder and not os.path.exists(folder):
+                os.makedirs(folder)
+            tmp = self.path + ".tmp"
+            with self.save_lock:
+                with open(tmp, 'w') as f:
+                    json.dump(entries, f)
+                os.replace(tmp, self.path)
+        except Exception as e:
+            if self.logger:
+                self.logger.error(f"Error saving recent results: {e}")
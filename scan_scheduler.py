@@ -0,0 +1,177 @@
+"""
+Planificador de escaneos del índice de archivos.
+
+Los escaneos periódicos se lanzan dentro de una ventana tranquila
+(`scan_window`, p.ej. "02:00-06:00") con prioridad mínima de CPU y de disco,
+y se pausan mientras el asistente está ocupado (hablando, reproduciendo o con
+la CPU ocupada por otros procesos). Si la ventana se cierra a mitad, el escaneo se
+detiene guardando un checkpoint y el siguiente continúa desde ahí.
+"""
+import os
+import time
+import ctypes
+import ctypes.util
+import platform
+import threading
+from datetime import datetime
+
+IOPRIO_WHO_PROCESS = 1
+IOPRIO_CLASS_IDLE = 3
+IOPRIO_CLASS_SHIFT = 13
+SYS_IOPRIO_SET = {'x86_64': 251, 'aarch64': 30, 'armv7l': 314, 'armv6l': 314, 'i686': 289}
+
+
+class ScanAborted(Exception):
+    """El escaneo se detiene (ventana cerrada); el progreso queda guardado."""
+
+
+def lower_priority(logger=None):
+    """
+    Baja la prioridad del hilo actual: nice 19 y clase de E/S 'idle'
+    (equivalente a `nice -n 19 ionice -c3`). Solo afecta al hilo que la
+    llama, así que el resto del asistente no se ve afectado.
+    """
+    tid = threading.get_native_id()
+    try:
+        os.setpriority(os.PRIO_PROCESS, tid, 19)
+    except (AttributeError, OSError) as e:
+        if logger:
+            logger.debug(f"Could not lower scan thread CPU priority: {e}")
+
+    number = SYS_IOPRIO_SET.get(platform.machine())
+    if number is None:
+        return
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        if libc.syscall(number, IOPRIO_WHO_PROCESS, tid, IOPRIO_CLASS_IDLE << IOPRIO_CLASS_SHIFT) != 0:
+            raise OSError(ctypes.get_errno(), os.strerror(ctypes.get_errno()))
+    except OSError as e:
+        if logger:
+            logger.debug(f"Could not lower scan thread IO priority: {e}")
+
+
+def parse_window(text):
+    """'02:00-06:00' -> ((2, 0), (6, 0)); None si no hay ventana."""
+    if not text:
+        return None
+    start, end = text.split('-')
+    return tuple(tuple(int(x) for x in part.strip().split(':')) for part in (start, end))
+
+
+def in_window(window, now=None):
+    if window is None:
+        return True
+    now = now or datetime.now()
+    current = (now.hour, now.minute)
+    start, end = window
+    if start <= end:
+        return start <= current < end
+    return current >= start or current < end  # Cruza la medianoche
+
+
+class ScanScheduler:
+    """
+    Lanza `run(throttle)` cada `scan_interval` horas dentro de la ventana.
+    `run` devuelve True si el escaneo se ha completado; si no (otro escaneo
+    en marcha, error), se reintenta en la siguiente comprobación.
+
+    `throttle` se llama desde el escaneo entre directorio y directorio:
+    bloquea mientras el asistente está ocupado y lanza ScanAborted si la
+    ventana se cierra.
+    """
+
+    def __init__(self, core, config, run, last_scan=None):
+        self.core = core
+        self.run = run
+        self.interval = config.get('scan_interval', 24) * 3600
+        self.window = parse_window(config.get('scan_window'))
+        self.max_load = config.get('scan_max_load', 0.7)
+        self.quiet_after_speech = config.get('scan_quiet_after_speech', 15)
+        self.last_scan = last_scan.timestamp() if last_scan else 0
+        self.paused = False
+        self.next_check = 0
+        self.cpu_sample = None
+
+    def start(self):
+        threading.Thread(target=self._loop, daemon=True).start()
+
+    def _loop(self):
+        lower_priority(self.core.app_logger)
+        while True:
+            time.sleep(60)
+            self.tick()
+
+    def tick(self):
+        """Una comprobación del bucle: lanza el escaneo si toca y se puede."""
+        if time.time() - self.last_scan < self.interval or not in_window(self.window):
+            return
+        if self.busy():
+            return
+        try:
+            if self.run(self.throttle):
+                self.last_scan = time.time()
+        except ScanAborted:
+            self.core.app_logger.info("Scan window closed; progress saved, resuming in the next window.")
+        except Exception as e:
+            self.core.app_logger.error(f"Scheduled scan failed: {e}")
+
+    def busy(self):
+        """True si el asistente está activo o la CPU ocupada por otros procesos."""
+        if getattr(self.core, 'speaker_status', 'idle') == 'busy':
+            return True
+        last_speak = getattr(self.core, 'last_speak_time', 0)
+        if time.time() - last_speak < self.quiet_after_speech:
+            return True
+        return self._cpu_busy() > self.max_load
+
+    def _cpu_busy(self):
+        """
+        Fracción de CPU ocupada desde la última consulta según /proc/stat.
+        No cuenta 'nice' ni 'iowait', que es justo lo que genera el propio
+        escaneo, para que no se pause a sí mismo.
+        """
+        try:
+            with open('/proc/stat') as f:
+                fields = [int(x) for x in f.readline().split()[1:]]
+        except (OSError, ValueError):
+            return 0.0
+        user, nice, system, idle, iowait, irq, softirq = fields[:7]
+        steal = fields[7] if len(fields) > 7 else 0
+        busy = user + system + irq + softirq + steal
+        total = sum(fields[:8])
+        previous, self.cpu_sample = self.cpu_sample, (busy, total)
+        if previous is None or total == previous[1]:
+            return 0.0
+        return (busy - previous[0]) / (total - previous[1])
+
+    def throttle(self):
+        """Para escaneos programados: respeta la ventana y pausa si hay actividad."""
+        if self._due_check():
+            if not in_window(self.window):
+                raise ScanAborted()
+            self._wait(abort_outside_window=True)
+
+    def wait_idle(self):
+        """Para escaneos fuera de ventana: solo pausa si hay actividad."""
+        if self._due_check():
+            self._wait()
+
+    def _due_check(self):
+        # Se llama por cada directorio; basta con mirar 2 veces por segundo
+        now = time.monotonic()
+        if now < self.next_check:
+            return False
+        self.next_check = now + 0.5
+        return True
+
+    def _wait(self, abort_outside_window=False):
+        while self.busy():
+            if not self.paused:
+                self.paused = True
+                self.core.app_logger.info("Scan paused while the assistant is busy.")
+            time.sleep(2)
+            if abort_outside_window and not in_window(self.window):
+                raise ScanAborted()
+        if self.paused:
+            self.paused = False
+            self.core.app_logger.info("Scan resumed.")
@@ -0,0 +1,135 @@
+"""
+Estado de los servicios systemd en caché.
+
+Una sola llamada `systemctl show` trae el estado de todas las unidades
+.service cargadas; se repite como mucho cada `service_cache_ttl` segundos.
+Tras reiniciar un servicio solo se vuelve a consultar esa unidad.
+
+Los nombres dictados rara vez coinciden con el de la unidad ("apache" ->
+apache2.service, "docker" -> docker.service), así que se buscan por
+nombre exacto, prefijo, subcadena, descripción y por último aproximado.
+"""
+import time
+import threading
+from .executor import get_executor
+from .fuzzy import similarity, strip_accents
+
+DEFAULT_TTL = 10
+PROPERTIES = "Id,LoadState,ActiveState,SubState,Description"
+MIN_SIMILARITY = 0.7
+
+_shared_lock = threading.Lock()
+
+
+def get_service_cache(core):
+    """ServiceCache compartida (SystemSkill y quien necesite estado de servicios)."""
+    with _shared_lock:
+        cache = getattr(core, 'service_cache', None)
+        if cache is None:
+            config = core.skills_config.get('system', {}).get('config', {})
+            cache = ServiceCache(core, ttl=config.get('service_cache_ttl', DEFAULT_TTL))
+            core.service_cache = cache
+        return cache
+
+
+def parse_show(output):
+    """Bloques KEY=valor separados por línea en blanco -> {unidad: {...}}."""
+    units = {}
+    for block in output.split('\n\n'):
+        entry = {}
+        for line in block.splitlines():
+            key, sep, value = line.partition('=')
+            if sep:
+                entry[key] = value
+        if entry.get('Id') and entry.get('LoadState') != 'not-found':
+            units[entry['Id']] = {
+                'name': entry['Id'],
+                'active': entry.get('ActiveState'),
+                'sub': entry.get('SubState'),
+                'description': entry.get('Description', '')
+            }
+    return units
+
+
+def _spoken(text):
+    return strip_accents(text.lower()).replace('.service', '').replace('-', ' ').replace('_', ' ').strip()
+
+
+class ServiceCache:
+    def __init__(self, core, ttl=DEFAULT_TTL):
+        self.core = core
+        self.ttl = ttl
+        self.units = {}
+        self.updated = 0.0
+        self.lock = threading.Lock()
+
+    def _show(self, *units):
+        args = ["systemctl", "show", "--no-pager", f"--property={PROPERTIES}"] + list(units or ["*.service"])
+        result = get_executor(self.core).run_sync(args, kind='query', timeout=10)
+        return parse_show(result.stdout) if result.ok else None
+
+    def refresh(self, force=False):
+        """Recarga todas las unidades si la caché ha caducado. Devuelve False si falla."""
+        with self.lock:
+            if not force and time.monotonic() - self.updated < self.ttl:
+                return True
+            units = self._show()
+            if units is None:
+                return False
+            self.units = units
+            self.updated = time.monotonic()
+            return True
+
+    def invalidate(self, name):
+        """Vuelve a consultar solo `name` (p.ej. después de reiniciarlo)."""
+        unit = name if name.endswith('.service') else f"{name}.service"
+        units = self._show(unit)
+        with self.lock:
+            if units:
+                self.units.update(units)
+            else:
+                self.units.pop(unit, None)
+
+    def running(self):
+        self.refresh()
+        with self.lock:
+            return [u for u in self.units.values() if u['active'] == 'active' and u['sub'] == 'running']
+
+    def lookup(self, spoken):
+        """Unidad que mejor encaja con el nombre dictado, o None."""
+        return self.resolve(spoken)[0]
+
+    def resolve(self, spoken):
+        """
+        Como `lookup`, pero devuelve (unidad, segura). `segura` solo es True
+        si el nombre coincide exactamente o es prefijo de una única unidad;
+        el resto de coincidencias conviene confirmarlas antes de actuar.
+        """
+        self.refresh()
+        query = _spoken(spoken)
+        if not query:
+            return None, False
+        with self.lock:
+            units = list(self.units.values())
+
+        exact = [u for u in units if _spoken(u['name']) == query]
+        if exact:
+            return exact[0], True
+        prefix = [u for u in units if _spoken(u['name']).startswith(query)]
+        if prefix:
+            # Lo más corto primero: "apache" -> apache2 antes que apache-htcacheclean
+            return min(prefix, key=lambda u: len(u['name'])), len(prefix) == 1
+        for matches in (
+            [u for u in units if query in _spoken(u['name'])],
+            [u for u in units if query in _spoken(u['description'])],
+        ):
+            if matches:
+                return min(matches, key=lambda u: len(u['name'])), False
+
+        compact = query.replace(' ', '')
+        best, score = None, 0.0
+        for unit in units:
+            current = similarity(compact, _spoken(unit['name']).replace(' ', ''))
+            if current > score:
+                best, score = unit, current
+        return (best if score >= MIN_SIMILARITY else None), False
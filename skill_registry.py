@@ -0,0 +1,170 @@
+"""
+Carga diferida de skills.
+
+Las skills se registran por nombre ("modulo:Clase") y el core recibe un
+LazySkill en su lugar. El módulo no se importa ni la skill se construye
+hasta que se usa por primera vez (al disparar una de sus intenciones) o
+hasta que el precalentamiento las carga con el asistente en reposo. Así la
+palabra de activación responde antes de que FilesSkill, FinderSkill y el
+resto terminen su arranque.
+
+Cada carga queda medida (importación e inicialización por separado) en
+`timings`, junto con qué la provocó.
+"""
+import time
+import threading
+import importlib
+
+SKILLS = {
+    'system': 'system:SystemSkill',
+    'files': 'files:FilesSkill',
+    'finder': 'finder:FinderSkill',
+    'visual': 'visual:VisualSkill',
+    'diagnosis': 'diagnosis:DiagnosisSkill',
+    'docker': 'docker:DockerSkill',
+    'network': 'network:NetworkSkill',
+    'media': 'media:MediaSkill',
+    'content': 'content:ContentSkill',
+    'organizer': 'organizer:OrganizerSkill',
+    'ssh': 'ssh:SSHSkill',
+    'time_date': 'time_date:TimeDateSkill',
+}
+DEFAULT_WARMUP_DELAY = 30
+DEFAULT_QUIET_AFTER_SPEECH = 10
+
+_shared_lock = threading.Lock()
+
+
+def get_skill_registry(core):
+    """SkillRegistry compartido, con las skills del paquete ya registradas."""
+    with _shared_lock:
+        registry = getattr(core, 'skill_registry', None)
+        if registry is None:
+            registry = SkillRegistry(core)
+            for name, target in SKILLS.items():
+                registry.register(name, target)
+            core.skill_registry = registry
+        return registry
+
+
+class LazySkill:
+    """Ocupa el lugar de la skill; la primera consulta de un atributo la carga."""
+
+    def __init__(self, registry, name):
+        self._registry = registry
+        self._name = name
+
+    def __getattr__(self, attr):
+        return getattr(self._registry.get(self._name, trigger='intent'), attr)
+
+    def __repr__(self):
+        state = 'cargada' if self._registry.loaded(self._name) else 'sin cargar'
+        return f"<LazySkill {self._name} ({state})>"
+
+
+class SkillRegistry:
+    def __init__(self, core):
+        self.core = core
+        self.targets = {}
+        self.instances = {}
+        self.locks = {}
+        self.timings = {}
+        self.warming = False
+        self.lock = threading.Lock()
+
+    @property
+    def config(self):
+        return self.core.skills_config.get('loader', {}).get('config', {})
+
+    def register(self, name, target):
+        """`target`: "modulo:Clase" dentro del paquete, o la propia clase."""
+        with self.lock:
+            self.targets[name] = target
+            self.locks.setdefault(name, threading.Lock())
+
+    def proxy(self, name):
+        if name not in self.targets:
+            raise KeyError(f"Unknown skill: {name}")
+        return LazySkill(self, name)
+
+    def proxies(self):
+        """{nombre: LazySkill} para todas las skills registradas (lo que guarda el core)."""
+        return {name: LazySkill(self, name) for name in self.targets}
+
+    def loaded(self, name):
+        return name in self.instances
+
+    def get(self, name, trigger='intent'):
+        """Instancia de la skill, cargándola si hace falta (una sola vez)."""
+        skill = self.instances.get(name)
+        if skill is not None:
+            return skill
+        with self.locks[name]:
+            skill = self.instances.get(name)
+            if skill is None:
+                skill = self._load(name, trigger)
+            return skill
+
+    def _load(self, name, trigger):
+        target = self.targets[name]
+        start = time.perf_counter()
+        if isinstance(target, str):
+            module, _, cls = target.partition(':')
+            target = getattr(importlib.import_module(f".{module}", __package__), cls)
+        imported = time.perf_counter()
+        skill = target(self.core)
+        done = time.perf_counter()
+        self.instances[name] = skill
+        self.timings[name] = {
+            'import': imported - start,
+            'init': done - imported,
+            'trigger': trigger
+        }
+        self.core.app_logger.info(
+            f"Skill '{name}' loaded on {trigger}: import {1000 * (imported - start):.0f} ms, "
+            f"init {1000 * (done - imported):.0f} ms"
+        )
+        return skill
+
+    def report(self):
+        """Skills cargadas, de la más lenta a la más rápida: [(nombre, segundos, trigger)]."""
+        rows = [(name, t['import'] + t['init'], t['trigger']) for name, t in self.timings.items()]
+        return sorted(rows, key=lambda row: row[1], reverse=True)
+
+    def load_eager(self):
+        """Carga ya las skills de `eager` (p.ej. las que arrancan servicios en segundo plano)."""
+        for name in self.config.get('eager', []):
+            if name in self.targets:
+                self._safe_get(name, 'startup')
+
+    def warm_up(self):
+        """Precalienta en otro hilo el resto de skills cuando el asistente está en reposo."""
+        with self.lock:
+            if self.warming:
+                return
+            self.warming = True
+        threading.Thread(target=self._warm_up_loop, daemon=True).start()
+
+    def _warm_up_loop(self):
+        config = self.config
+        time.sleep(config.get('warmup_delay', DEFAULT_WARMUP_DELAY))
+        order = config.get('warmup_order') or list(self.targets)
+        for name in order:
+            if name not in self.targets or self.loaded(name):
+                continue
+            self._wait_idle(config.get('warmup_quiet_after_speech', DEFAULT_QUIET_AFTER_SPEECH))
+            self._safe_get(name, 'warmup')
+
+    def _wait_idle(self, quiet):
+        while True:
+            busy = getattr(self.core, 'speaker_status', 'idle') == 'busy'
+            if not busy and time.time() - getattr(self.core, 'last_speak_time', 0) >= quiet:
+                return
+            time.sleep(1)
+
+    def _safe_get(self, name, trigger):
+        try:
+            return self.get(name, trigger=trigger)
+        except Exception as e:
+            self.core.app_logger.error(f"Error loading skill '{name}': {e}")
+            return None
@@ -0,0 +1,115 @@
+"""
+Salida de voz de las skills: agrupada y por frases.
+
+Las frases que una skill dice seguidas dentro de `coalesce_window` segundos
+se juntan en un solo evento 'speak', así el TTS arranca una vez en lugar de
+una por frase. Los avisos de progreso ("Buscando...") se marcan como tales:
+si la respuesta de la misma skill llega dentro de la ventana, el aviso ya
+no se dice, y un aviso nuevo suyo sustituye al anterior aún pendiente. Lo
+que digan otras skills no toca sus avisos.
+
+Los textos largos (más de `stream_min_chars`) salen troceados por frases:
+la primera va sola, para que empiece a sonar cuanto antes, y el resto en
+bloques de hasta `stream_chunk_chars`.
+"""
+import re
+import threading
+
+DEFAULT_WINDOW = 0.15
+DEFAULT_STREAM_MIN_CHARS = 200
+DEFAULT_STREAM_CHUNK_CHARS = 300
+SENTENCE_END = re.compile(r'(?<=[.!?…:])\s+')
+
+_shared_lock = threading.Lock()
+
+
+def get_speech_pipeline(core):
+    """SpeechPipeline compartido por todas las skills (una sola cola de voz)."""
+    pipeline = getattr(core, 'speech_pipeline', None)
+    if pipeline is not None:
+        return pipeline
+    with _shared_lock:
+        pipeline = getattr(core, 'speech_pipeline', None)
+        if pipeline is None:
+            config = core.skills_config.get('speech', {}).get('config', {})
+            pipeline = SpeechPipeline(
+                core.event_queue,
+                window=config.get('coalesce_window', DEFAULT_WINDOW),
+                stream_min_chars=config.get('stream_min_chars', DEFAULT_STREAM_MIN_CHARS),
+                stream_chunk_chars=config.get('stream_chunk_chars', DEFAULT_STREAM_CHUNK_CHARS)
+            )
+            core.speech_pipeline = pipeline
+        return pipeline
+
+
+def split_sentences(text, min_chars=DEFAULT_STREAM_MIN_CHARS, chunk_chars=DEFAULT_STREAM_CHUNK_CHARS):
+    """Trozos a sintetizar por separado: la primera frase y luego bloques de frases."""
+    if len(text) <= min_chars:
+        return [text]
+    sentences = [s for s in SENTENCE_END.split(text) if s]
+    chunks = [sentences[0]]
+    current = ""
+    for sentence in sentences[1:]:
+        if current and len(current) + len(sentence) + 1 > chunk_chars:
+            chunks.append(current)
+            current = sentence
+        else:
+            current = f"{current} {sentence}" if current else sentence
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+class SpeechPipeline:
+    def __init__(self, event_queue, window=DEFAULT_WINDOW, stream_min_chars=DEFAULT_STREAM_MIN_CHARS,
+                 stream_chunk_chars=DEFAULT_STREAM_CHUNK_CHARS):
+        self.event_queue = event_queue
+        self.window = window
+        self.stream_min_chars = stream_min_chars
+        self.stream_chunk_chars = stream_chunk_chars
+        self.lock = threading.Lock()
+        self.pending = []  # [(texto, es_progreso, origen)]
+        self.timer = None
+        self.dropped = 0
+        self.merged = 0
+
+    def say(self, text, progress=False, source=None):
+        """Encola `text`; `source` (la skill) liga sus avisos de progreso a ella."""
+        if not text:
+            return
+        with self.lock:
+            for i, (_, pending_progress, pending_source) in enumerate(self.pending):
+                if pending_progress and pending_source == source:
+                    # Lo nuevo de la misma skill deja obsoleto su aviso anterior
+                    del self.pending[i]
+                    self.dropped += 1
+                    break
+            self.pending.append((text, progress, source))
+            if self.window > 0:
+                if self.timer is None:
+                    self.timer = threading.Timer(self.window, self.flush)
+                    self.timer.daemon = True
+                    self.timer.start()
+                return
+            # Se emite con el lock tomado: dos vaciados simultáneos no se adelantan
+            self._emit(self._take())
+
+    def flush(self):
+        """Emite ya lo pendiente (lo llama el temporizador de la ventana)."""
+        with self.lock:
+            self._emit(self._take())
+
+    def _take(self):
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+        texts = [text for text, _, _ in self.pending]
+        self.pending = []
+        return texts
+
+    def _emit(self, texts):
+        if not texts:
+            return
+        self.merged += len(texts) - 1
+        for chunk in split_sentences(" ".join(texts), self.stream_min_chars, self.stream_chunk_chars):
+            self.event_queue.put({'type': 'speak', 'text': chunk})
@@ -1,4 +1,5 @@
 from modules.BlueberrySkills import BaseSkill
+from .instrumentation import span
 
 class SSHSkill(BaseSkill):
     def connect(self, command, response, **kwargs):
@@ -34,12 +35,13 @@ class SSHSkill(BaseSkill):
             return
 
         # Use Mango to generate the command
-        self.speak(f"Pensando comando para '{instruction}' en {alias}...")
+        self.speak(f"Pensando comando para '{instruction}' en {alias}...", progress=True)
         
         # Context Injection: None mostly, or maybe "remote server" hint
         mango_prompt = f"Contexto: Remote Linux Server | Instrucción: {instruction}"
         
-        generated_cmd, confidence = self.core.mango_manager.infer(mango_prompt)
+        with span('ai'):
+            generated_cmd, confidence = self.core.mango_manager.infer(mango_prompt)
         
         if not generated_cmd or confidence < 0.6:
             self.speak("No estoy seguro de cómo traducir esa orden a un comando.")
@@ -57,7 +59,7 @@ class SSHSkill(BaseSkill):
         # User requested: "La skill recoge la salida y la ejecuta"
         # Let's execute directly but announce it carefully.
         
-        self.speak(f"Ejecutando...")
+        self.speak(f"Ejecutando...", progress=True)
         success, output = self.core.ssh_manager.execute(alias, generated_cmd)
         
         if success:
@@ -1,9 +1,57 @@
+import os
 from datetime import datetime
 from . import BaseSkill
+from .file_index import find_files
+from .jobs import get_job_manager, describe, AptProgress
+from .services import get_service_cache
+from .metrics import get_metrics_sampler
+from .dedup import human_size
+
+TREND_NAMES = {'cpu': 'La CPU', 'ram': 'La RAM'}
+HOME_NAMES = ("mi carpeta personal", "carpeta personal", "mi home", "home", "casa")
+
+
+def spoken_path(text):
+    """Ruta dictada: "mi carpeta personal/Documentos" o "~/Documentos" -> /home/<usuario>/Documentos."""
+    path = text.strip()
+    lowered = path.lower()
+    for name in HOME_NAMES:
+        if lowered == name or lowered.startswith(name + "/"):
+            path = "~" + path[len(name):]
+            break
+    return os.path.expanduser(path)
+
 
 class SystemSkill(BaseSkill):
+    def __init__(self, core):
+        super().__init__(core)
+        # El muestreo empieza ya, así las medias están listas cuando se pregunten
+        self.metrics = get_metrics_sampler(core)
+
+    def _trends(self):
+        """Frase con las series que suben o bajan en el último cuarto de hora."""
+        parts = []
+        for name, label in TREND_NAMES.items():
+            trend = self.metrics.trend(name)
+            if trend != 'estable':
+                parts.append(f"{label} va {trend}.")
+        return " ".join(parts)
+
     def check_status(self, command, response, **kwargs):
-        if self.core.sysadmin_manager:
+        cpu = self.metrics.current('cpu')
+        ram = self.metrics.current('ram')
+        disk = self.metrics.current('disk')
+        if cpu is not None and ram is not None and disk is not None:
+            status = (
+                f"CPU al {cpu:.0f}% (media de 5 minutos {self.metrics.average('cpu', 5):.0f}%), "
+                f"RAM al {ram:.0f}% y disco al {disk:.0f}%. "
+            ) + self._trends()
+            if self.core.sysadmin_manager:
+                battery = self.core.sysadmin_manager.get_battery_status()
+                if battery != "No detectada":
+                    status += f" Batería al {battery}."
+            self.speak(f"{response} {status}")
+        elif self.core.sysadmin_manager:
             status = self.core.sysadmin_manager.get_full_status()
             
             # Add Battery if applicable
@@ -22,23 +70,14 @@ class SystemSkill(BaseSkill):
             return
 
         self.speak(response)
-        cmd = "systemctl list-units --type=service --state=running --no-pager --plain --no-legend"
-        success, output = self.core.sysadmin_manager.run_command(cmd)
-        
-        if success:
-            lines = output.strip().split('\n')
-            count = len(lines)
+        cache = get_service_cache(self.core)
+        if cache.refresh():
+            running = cache.running()
+            count = len(running)
             if count > 0:
                 self.speak(f"Hay {count} servicios corriendo en este momento.")
                 # Optional: Read first few? "Como ssh, docker..."
-                # Extract names: 'service.name.service   loaded active running   Description'
-                examples = []
-                for line in lines[:3]:
-                    parts = line.split()
-                    if parts:
-                        name = parts[0].replace('.service', '')
-                        examples.append(name)
-                
+                examples = [unit['name'].replace('.service', '') for unit in running[:3]]
                 if examples:
                     self.speak(f"Por ejemplo: {', '.join(examples)}.")
             else:
@@ -62,6 +101,13 @@ class SystemSkill(BaseSkill):
         self.core.on_closing()
 
     def diagnostico(self, command, response, **kwargs):
+        # Estado precalculado por el monitor de salud, si está en marcha
+        monitor = getattr(self.core, 'health_monitor', None)
+        summary = monitor.summary() if monitor else None
+        if summary:
+            self.speak(f"{response} {summary}")
+            return
+
         if self.core.sherlock:
             report = self.core.sherlock.run_diagnosis()
             if report:
@@ -86,8 +132,22 @@ class SystemSkill(BaseSkill):
             self.speak("¿Qué servicio quieres que reinicie?")
             return
 
+        # Nombre dictado -> unidad real ("apache" -> apache2)
+        cache = get_service_cache(self.core)
+        unit, certain = cache.resolve(service_name)
+        if unit and not certain:
+            # Coincidencia dudosa: reiniciar otra unidad no se deshace, se confirma antes
+            resolved = unit['name'].replace('.service', '')
+            self.core.pending_mango_command = f"sudo systemctl restart {resolved}"
+            self.speak(f"No encuentro el servicio {service_name}, pero sí {resolved}. ¿Quieres que lo reinicie?")
+            return
+        if unit:
+            service_name = unit['name'].replace('.service', '')
+
         self.speak(f"{response} {service_name}")
         success, msg = self.core.sysadmin_manager.control_service(service_name, "restart")
+        # Solo cambia el estado de este servicio
+        cache.invalidate(service_name)
         if success:
             self.speak(f"Servicio {service_name} reiniciado correctamente.")
         else:
@@ -104,41 +164,53 @@ class SystemSkill(BaseSkill):
         # Por ahora asumimos Debian/Ubuntu based en el roadmap
         cmd = "sudo apt-get update && sudo apt-get upgrade -y"
         
-        # Ejecutar en background o esperar? Update tarda mucho.
-        # Mejor lanzar y avisar.
-        success, output = self.core.sysadmin_manager.run_command(cmd)
-        if success:
+        # Update tarda mucho: trabajo en segundo plano en la cola 'heavy', sin
+        # bloquear el resto de intenciones; el progreso sale por event_queue
+        jobs = get_job_manager(self.core)
+        current = jobs.status('update_system')
+        if current and current.active:
+            self.speak(describe(current))
+            return
+        jobs.start_command(
+            'update_system', "actualización del sistema", cmd,
+            parser=AptProgress(), on_done=self._update_finished,
+            kind='heavy', shell=True, timeout=3600
+        )
+
+    def _update_finished(self, job):
+        result = job.result
+        if result.ok:
             self.speak("Sistema actualizado. Revisa los logs si quieres detalles.")
-        else:
+        elif result.timed_out:
+            self.speak("La actualización ha tardado demasiado y la he detenido.")
+        elif not result.cancelled:
             self.speak("Hubo un error en la actualización.")
 
-    def find_file(self, command, response, **kwargs):
-        """Busca un archivo usando 'find'."""
-        if not self.core.sysadmin_manager:
-            self.speak("No tengo acceso al sistema.")
-            return
+    def update_status(self, command, response, **kwargs):
+        """Comando de voz: "¿cómo va la actualización?"."""
+        status = describe(get_job_manager(self.core).status('update_system'))
+        self.speak(status or "No hay ninguna actualización en marcha.")
 
+    def find_file(self, command, response, **kwargs):
+        """Busca un archivo: índice de archivos y, si no está, recorrido acotado del disco."""
         # Heurística: "busca el archivo X en Y"
-        parts = command.split(" en ")
-        if len(parts) < 2:
-            # Intenta buscar en todo el sistema si no se especifica ruta (peligroso/lento)
-            # Mejor pedir ruta o asumir /home
-            filename = command.replace("busca el archivo", "").replace("encuentra el archivo", "").strip()
-            path = "/home"
-        else:
-            filename = parts[0].replace("busca el archivo", "").replace("encuentra el archivo", "").strip()
-            path = parts[1].strip()
+        parts = command.split(" en ", 1)
+        filename = parts[0].replace("busca el archivo", "").replace("encuentra el archivo", "").strip()
+        # Sin ruta se busca en lo que cubre el índice (scan_paths, o la carpeta personal)
+        path = spoken_path(parts[1]) if len(parts) == 2 else None
 
-        self.speak(f"Buscando {filename} en {path}...")
+        self.speak(f"Buscando {filename} en {path}..." if path else f"Buscando {filename}...", progress=True)
         
-        # Usar find
-        cmd = f"find {path} -name '{filename}' 2>/dev/null | head -n 5"
-        success, output = self.core.sysadmin_manager.run_command(cmd)
+        # Sin procesos ni shell: el nombre dictado no puede inyectar nada
+        config = self.core.skills_config.get('system', {}).get('config', {})
+        try:
+            paths, _ = find_files(self.core, filename, path, limit=5, timeout=config.get('find_timeout', 10))
+        except Exception as e:
+            self.core.app_logger.error(f"Error finding file: {e}")
+            paths = []
         
-        if success and output.strip():
-            lines = output.strip().split('\n')
-            count = len(lines)
-            self.speak(f"He encontrado {count} coincidencias. La primera es: {lines[0]}")
+        if paths:
+            self.speak(f"He encontrado {len(paths)} coincidencias. La primera es: {paths[0]}")
         else:
             self.speak("No he encontrado el archivo.")
 
@@ -150,7 +222,13 @@ class SystemSkill(BaseSkill):
         summary = f"Buenos días. Hoy es {fecha_str}. "
 
         # 2. Estado del Sistema
-        if self.core.sysadmin_manager:
+        cpu, ram = self.metrics.current('cpu'), self.metrics.current('ram')
+        if cpu is not None and ram is not None:
+            summary += f"El sistema está al {cpu:.0f}% de CPU y {ram:.0f}% de RAM. "
+            trends = self._trends()
+            if trends:
+                summary += trends + " "
+        elif self.core.sysadmin_manager:
             cpu = self.core.sysadmin_manager.get_cpu_usage()
             ram = self.core.sysadmin_manager.get_ram_usage()
             summary += f"El sistema está al {cpu}% de CPU y {ram}% de RAM. "
@@ -173,19 +251,34 @@ class SystemSkill(BaseSkill):
             self.speak("¿Qué servicio quieres comprobar?")
             return
 
-        if self.core.sysadmin_manager:
+        cache = get_service_cache(self.core)
+        refreshed = cache.refresh()
+        unit = cache.lookup(service) if refreshed else None
+        if unit:
+            self.speak(response)
+            status = "activo" if unit['active'] == 'active' else "inactivo"
+            self.speak(f"El servicio {unit['name'].replace('.service', '')} está {status}.")
+        elif self.core.sysadmin_manager:
+            # La caché solo trae las unidades cargadas: una parada puede no estar
             self.speak(response)
             active = self.core.sysadmin_manager.is_service_active(service)
             status = "activo" if active else "inactivo o no existe"
             self.speak(f"El servicio {service} está {status}.")
+        elif refreshed:
+            self.speak(response)
+            self.speak(f"El servicio {service} no existe.")
         else:
             self.speak("No tengo acceso al gestor de servicios.")
 
     def disk_usage(self, command, response, **kwargs):
         """Verifica el espacio en disco."""
-        if self.core.sysadmin_manager:
+        usage = self.metrics.current('disk')
+        if usage is not None:
+            self.speak(f"El uso del disco principal es del {usage:.0f} por ciento.")
+        elif self.core.sysadmin_manager:
             usage = self.core.sysadmin_manager.get_disk_usage() 
             self.speak(f"El uso del disco principal es del {usage} por ciento.")
+        else:
             self.speak("No puedo leer el disco.")
 
     def system_info(self, command, response, **kwargs):
@@ -203,7 +296,15 @@ class SystemSkill(BaseSkill):
 
     def network_status(self, command, response, **kwargs):
         """Estado del tráfico de red."""
-        if self.core.sysadmin_manager:
+        rx = self.metrics.current('net_rx')
+        if rx is not None:
+            tx = self.metrics.current('net_tx')
+            rx5, tx5 = self.metrics.average('net_rx', 5), self.metrics.average('net_tx', 5)
+            self.speak(
+                f"Tráfico de red: recibiendo {human_size(rx)} por segundo y enviando {human_size(tx)} por segundo. "
+                f"En los últimos 5 minutos, {human_size(rx5)} y {human_size(tx5)} por segundo de media."
+            )
+        elif self.core.sysadmin_manager:
             sent, recv = self.core.sysadmin_manager.get_network_bytes()
             self.speak(f"Tráfico de red: {sent} enviados y {recv} recibidos.")
         else:
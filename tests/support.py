@@ -0,0 +1,56 @@
+"""
+Utilidades comunes de los tests: carga del paquete (igual que los
+benchmarks) y un core mínimo con una base de datos en memoria.
+"""
+import os
+import sys
+import queue
+import logging
+import importlib
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(ROOT))
+PACKAGE = os.path.basename(ROOT)
+
+
+def load(module):
+    return importlib.import_module(f"{PACKAGE}.{module}")
+
+
+class FakeDB:
+    """Lo que FileIndex y DuplicateFinder usan de core.db."""
+
+    def __init__(self):
+        self.rows = {}
+        self.generations = {}
+        self.clears = 0
+
+    def index_files_many(self, rows, generation=None):
+        for row in rows:
+            self.rows[row[0]] = row
+            self.generations[row[0]] = generation
+
+    def prune_file_index(self, generation):
+        for path in [p for p in self.rows if self.generations.get(p) != generation]:
+            self.rows.pop(path)
+
+    def remove_files_from_index(self, paths):
+        for path in paths:
+            self.rows.pop(path, None)
+
+    def clear_file_index(self):
+        self.rows.clear()
+        self.clears += 1
+
+    def search_files_index(self, query):
+        return [{'path': path} for path in self.rows if query in os.path.basename(path)]
+
+
+class FakeCore:
+    def __init__(self, skills_config=None):
+        self.skills_config = skills_config or {}
+        self.db = FakeDB()
+        self.app_logger = logging.getLogger("tests")
+        self.event_queue = queue.Queue()
+        self.context = {}
+        self.sysadmin_manager = None
@@ -0,0 +1,40 @@
+from support import load, FakeCore
+
+file_index = load("file_index")
+dedup = load("dedup")
+
+
+def make_tree(tmp_path):
+    root = tmp_path / "docs"
+    root.mkdir()
+    data = b"x" * 10000
+    (root / "a.txt").write_bytes(data)
+    (root / "b.txt").write_bytes(data)
+    (root / "grande.txt").write_bytes(b"y" * 50000)
+    core = FakeCore({'files': {'config': {'scan_paths': [str(root)], 'scan_types': ['txt']}}})
+    index = file_index.FileIndex(core, snapshot_file=str(tmp_path / "index.snap"))
+    index.update()
+    return root, core, index
+
+
+def test_groups_survive_reload(tmp_path):
+    root, core, index = make_tree(tmp_path)
+    hash_file = str(tmp_path / "hashes.json")
+    finder = dedup.DuplicateFinder(index, core.app_logger, hash_file=hash_file)
+    finder.update()
+    assert finder.groups == [[str(root / "a.txt"), str(root / "b.txt")]]
+
+    reloaded = dedup.DuplicateFinder(index, core.app_logger, hash_file=hash_file)
+    assert reloaded.groups == finder.groups
+    assert reloaded.wasted_space() == 10000
+
+
+def test_largest_files_does_not_wait_for_the_index_lock(tmp_path):
+    root, core, index = make_tree(tmp_path)
+    finder = dedup.DuplicateFinder(index, core.app_logger, hash_file=str(tmp_path / "hashes.json"))
+    with index.lock:  # como durante un escaneo
+        largest = finder.largest_files(limit=1)
+    assert largest == [(50000, str(root / "grande.txt"))]
+
+    reloaded = file_index.FileIndex(core, snapshot_file=str(tmp_path / "index.snap"))
+    assert reloaded.largest_files(limit=1) == largest
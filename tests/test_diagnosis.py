@@ -0,0 +1,68 @@
+import logging
+import threading
+import importlib
+
+import pytest
+
+from support import load, FakeCore, PACKAGE
+
+skills = importlib.import_module(PACKAGE)
+diagnosis = load("diagnosis")
+diagnosis_cache = load("diagnosis_cache")
+
+SAMPLE = "Traceback (most recent call last):\nValueError: disco lleno"
+
+
+class SlowAI:
+    def __init__(self):
+        self.release = threading.Event()
+        self.prompts = []
+
+    def generate(self, prompt, max_length=150):
+        self.prompts.append(prompt)
+        self.release.wait(5)
+        return "Falta espacio: borra los logs viejos."
+
+
+class Monitor:
+    running = True
+    state = {'top_errors': [{'count': 3, 'sample': SAMPLE, 'signature': 'sig-disco'}]}
+
+    def summary(self):
+        return "Todo estable."
+
+
+@pytest.fixture
+def skill(tmp_path, monkeypatch):
+    # BaseSkill toma el logger de NeoCore, que no forma parte del paquete
+    def init(self, core):
+        self.core, self.logger = core, logging.getLogger("tests")
+    monkeypatch.setattr(skills.BaseSkill, '__init__', init)
+    core = FakeCore()
+    core.ai_engine = SlowAI()
+    skill = diagnosis.DiagnosisSkill(core)
+    skill.monitor = Monitor()
+    skill.cache = diagnosis_cache.DiagnosisCache(str(tmp_path / "cache.json"))
+    skill.said = []
+    skill.speak = lambda text, progress=False: skill.said.append(text)
+    return skill
+
+
+def test_monitor_report_does_not_wait_for_the_model(skill):
+    skill.realizar_diagnostico("diagnóstico", None)
+    assert skill.said[-1].startswith("Estoy analizando")
+    # Pedirlo otra vez mientras tanto no lanza un segundo análisis
+    skill.realizar_diagnostico("diagnóstico", None)
+    assert not skill.said[-1].startswith("Estoy analizando")
+
+    skill.core.ai_engine.release.set()
+    for _ in range(100):
+        if skill.said[-1].startswith("Falta espacio"):
+            break
+        threading.Event().wait(0.05)
+    assert skill.said[-1] == "Falta espacio: borra los logs viejos."
+    assert len(skill.core.ai_engine.prompts) == 1
+
+    skill.realizar_diagnostico("diagnóstico", None)
+    assert skill.said[-1] == "Falta espacio: borra los logs viejos."
+    assert skill.cache.stats()['hits'] == 1
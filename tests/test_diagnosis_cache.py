@@ -0,0 +1,47 @@
+import os
+
+from support import load
+
+diagnosis_cache = load("diagnosis_cache")
+
+
+def test_lru_and_ttl_eviction(tmp_path, monkeypatch):
+    cache = diagnosis_cache.DiagnosisCache(str(tmp_path / "c.json"), max_entries=2, ttl=100)
+    cache.put('a', "uno")
+    cache.put('b', "dos")
+    assert cache.get('a') == "uno"  # 'b' pasa a ser la menos reciente
+    cache.put('c', "tres")
+    assert 'b' not in cache and 'a' in cache and 'c' in cache
+
+    now = diagnosis_cache.time.time()
+    monkeypatch.setattr(diagnosis_cache.time, 'time', lambda: now + 101)
+    assert cache.get('a') is None
+    assert cache.stats() == {'entries': 1, 'hits': 1, 'misses': 1, 'hit_rate': 0.5, 'evictions': 2}
+
+
+def test_peek_is_not_a_hit_or_a_miss(tmp_path):
+    cache = diagnosis_cache.DiagnosisCache(str(tmp_path / "c.json"))
+    cache.put('a', "uno")
+    assert cache.peek('a') == "uno" and cache.peek('x') is None
+    assert cache.stats()['hits'] == cache.stats()['misses'] == 0
+
+
+def test_puts_are_saved_together(tmp_path, monkeypatch):
+    path = str(tmp_path / "c.json")
+    cache = diagnosis_cache.DiagnosisCache(path, save_interval=60)
+    timers = []
+    monkeypatch.setattr(diagnosis_cache.threading, 'Timer', lambda delay, func: timers.append(func) or Timer())
+    for i in range(50):
+        cache.put(f"firma{i}", f"diagnóstico {i}")
+    assert len(timers) == 1 and not os.path.exists(path)
+
+    timers[0]()
+    reloaded = diagnosis_cache.DiagnosisCache(path)
+    assert reloaded.peek('firma49') == "diagnóstico 49" and len(reloaded.entries) == 50
+
+
+class Timer:
+    daemon = False
+
+    def start(self):
+        pass
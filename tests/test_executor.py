@@ -0,0 +1,60 @@
+import time
+import subprocess
+from concurrent.futures import Future
+
+import pytest
+
+from support import load
+
+executor = load("executor")
+
+
+def test_on_line_error_kills_the_child():
+    def on_line(line):
+        raise ValueError(line)
+
+    handle = executor.CommandExecutor().run(['sh', '-c', 'echo hola; sleep 30'], on_line=on_line)
+    start = time.monotonic()
+    with pytest.raises(ValueError):
+        handle.result(timeout=10)
+    assert time.monotonic() - start < 5
+    assert handle.process.poll() is not None
+
+
+def test_cancel_before_process_is_set_kills_the_child(monkeypatch):
+    handle = executor.CommandHandle(['sleep', '30'])
+    handle.future = Future()
+    handle.future.set_running_or_notify_cancel()
+    real_popen = subprocess.Popen
+
+    def popen(*args, **kwargs):
+        process = real_popen(*args, **kwargs)
+        # cancel() llega cuando el proceso existe pero aún no está en el handle
+        handle.cancel()
+        return process
+
+    monkeypatch.setattr(executor.subprocess, 'Popen', popen)
+    start = time.monotonic()
+    result = executor.CommandExecutor()._execute(handle, handle.args, 30, 1024, False, None, None, None, None)
+    assert time.monotonic() - start < 5
+    assert result.cancelled
+
+
+def test_max_lines_keeps_the_real_returncode():
+    commands = executor.CommandExecutor()
+    cut = commands.run(['sh', '-c', 'while true; do echo y; done'], max_lines=3).result(timeout=10)
+    assert cut.cut and cut.ok
+    assert cut.returncode != 0 and cut.stdout == 'y\ny\ny\n'
+
+    failed = commands.run(['sh', '-c', 'echo a; exit 2'], max_lines=5).result(timeout=10)
+    assert not failed.cut and failed.returncode == 2 and not failed.ok
+
+
+def test_call_reports_cancellation_to_on_done():
+    commands = executor.CommandExecutor({'default': 1})
+    outcomes = []
+    blocker = commands.call(time.sleep, 0.3)
+    queued = commands.call(lambda: 'hecho', on_done=outcomes.append)
+    assert queued.cancel()
+    blocker.result(timeout=5)
+    assert len(outcomes) == 1 and isinstance(outcomes[0], executor.CancelledError)
@@ -0,0 +1,151 @@
+import os
+
+import pytest
+
+from support import load, FakeCore
+
+file_index = load("file_index")
+
+
+def make_index(tmp_path, root):
+    core = FakeCore({'files': {'config': {'scan_paths': [str(root)], 'scan_types': ['txt']}}})
+    return core, file_index.FileIndex(core, snapshot_file=str(tmp_path / "index.snap"))
+
+
+def test_in_place_edit_is_reindexed(tmp_path):
+    root = tmp_path / "docs"
+    root.mkdir()
+    target = root / "notas.txt"
+    target.write_text("hola")
+    core, index = make_index(tmp_path, root)
+    index.update()
+    assert core.db.rows[str(target)][3] == 4
+
+    # Editar en sitio no cambia el mtime del directorio
+    dir_mtime = os.stat(root).st_mtime
+    target.write_text("un texto bastante más largo")
+    os.utime(target, (1, 1_000_000))
+    os.utime(root, (dir_mtime, dir_mtime))
+    index.update()
+    size = os.path.getsize(target)
+    assert core.db.rows[str(target)][3] == size
+
+    # El snapshot guardado también lleva la firma nueva
+    _, reloaded = make_index(tmp_path, root)
+    assert reloaded.dirs[str(root)]['files']['notas.txt'][0] == size
+
+
+def test_deleted_file_in_unchanged_dir_is_removed(tmp_path):
+    root = tmp_path / "docs"
+    root.mkdir()
+    target = root / "borrar.txt"
+    target.write_text("x")
+    core, index = make_index(tmp_path, root)
+    index.update()
+    dir_mtime = os.stat(root).st_mtime
+    target.unlink()
+    os.utime(root, (dir_mtime, dir_mtime))
+    index.update()
+    assert str(target) not in core.db.rows
+
+
+def test_rebuild_streams_rows_and_prunes_old_ones_at_the_end(tmp_path):
+    root = tmp_path / "docs"
+    for name in ("a", "b", "c"):
+        (root / name).mkdir(parents=True)
+        (root / name / f"{name}.txt").write_text("x")
+    core, index = make_index(tmp_path, root)
+    core.skills_config['files']['config']['index_batch_size'] = 1
+    core.skills_config['files']['config']['index_max_pending'] = 1
+    core.db.rows['/antiguo/viejo.txt'] = ('/antiguo/viejo.txt', 'viejo.txt', 'txt', 1, None)
+
+    seen = []
+
+    def throttle():
+        # A mitad de recorrido el índice anterior sigue entero y el nuevo va llegando
+        seen.append(dict(core.db.rows))
+
+    index.update(throttle=throttle)
+    assert seen and all('/antiguo/viejo.txt' in rows for rows in seen)
+    assert any(len(rows) > 1 for rows in seen[:-1])
+    assert sorted(core.db.rows) == sorted(str(root / n / f"{n}.txt") for n in ("a", "b", "c"))
+    assert core.db.clears == 0
+
+
+def test_lock_is_free_during_the_walk(tmp_path):
+    root = tmp_path / "docs"
+    root.mkdir()
+    (root / "a.txt").write_text("x")
+    core, index = make_index(tmp_path, root)
+    free = []
+
+    def throttle():
+        acquired = index.lock.acquire(blocking=False)
+        free.append(acquired)
+        if acquired:
+            index.lock.release()
+
+    index.update(throttle=throttle)
+    assert free and all(free)
+
+
+def test_scan_types_change_does_not_clear(tmp_path):
+    root = tmp_path / "docs"
+    root.mkdir()
+    (root / "a.txt").write_text("x")
+    (root / "b.md").write_text("y")
+    core, index = make_index(tmp_path, root)
+    index.update()
+    core.skills_config['files']['config']['scan_types'] = ['md']
+    index.update()
+    assert core.db.clears == 0
+    assert list(core.db.rows) == [str(root / "b.md")]
+
+
+def test_aborted_scan_after_types_change_rereads_unvisited_dirs(tmp_path):
+    root = tmp_path / "docs"
+    for name in ("a", "b"):
+        (root / name).mkdir(parents=True)
+        (root / name / f"{name}.txt").write_text("x")
+        (root / name / f"{name}.md").write_text("y")
+    core, index = make_index(tmp_path, root)
+    index.update()
+    core.skills_config['files']['config']['scan_types'] = ['md']
+
+    def abort():
+        raise file_index.ScanAborted()
+
+    with pytest.raises(file_index.ScanAborted):
+        index.update(throttle=abort)
+    index.update()
+    assert sorted(core.db.rows) == [str(root / "a" / "a.md"), str(root / "b" / "b.md")]
+
+
+@pytest.mark.parametrize('built', [False, True])
+def test_find_files_plain_name_is_the_whole_name(tmp_path, built):
+    root = tmp_path / "docs"
+    (root / "viejo").mkdir(parents=True)
+    for name in ["notas.txt", "notas.txt.bak.txt", "mis_notas.txt"]:
+        (root / name).write_text("x")
+    (root / "viejo" / "Notas.txt").write_text("x")
+    core, index = make_index(tmp_path, root)
+    index.update()
+    core.file_index = index
+    if built:
+        index._build_names()
+
+    paths, source = file_index.find_files(core, "notas.txt", limit=10)
+    assert source == ('index' if built else 'walk')
+    assert sorted(paths) == [str(root / "notas.txt"), str(root / "viejo" / "Notas.txt")]
+    paths, _ = file_index.find_files(core, "*notas.txt", limit=10)
+    assert len(paths) == 3
+
+
+def test_find_files_expands_home(tmp_path, monkeypatch):
+    root = tmp_path / "docs"
+    root.mkdir()
+    (root / "informe.txt").write_text("x")
+    monkeypatch.setenv('HOME', str(tmp_path))
+    core, index = make_index(tmp_path, tmp_path / "otro")
+    core.file_index = index
+    assert file_index.find_files(core, "informe.txt", root="~/docs") == ([str(root / "informe.txt")], 'walk')
@@ -0,0 +1,59 @@
+import random
+
+from support import load
+
+fuzzy = load("fuzzy")
+name_index = load("name_index")
+
+
+def edit_distance(a, b):
+    row = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        prev, row[0] = row[0], i
+        for j, cb in enumerate(b, 1):
+            prev, row[j] = row[j], min(row[j] + 1, row[j - 1] + 1, prev + (ca != cb))
+    return row[-1]
+
+
+def test_bit_parallel_levenshtein_matches_the_table():
+    rng = random.Random(3)
+    for _ in range(300):
+        a = ''.join(rng.choice('abcñ') for _ in range(rng.randint(0, 12)))
+        b = ''.join(rng.choice('abcñ') for _ in range(rng.randint(0, 12)))
+        assert fuzzy.levenshtein(a, b) == edit_distance(a, b), (a, b)
+
+
+def test_spoken_confusions_share_a_phonetic_key():
+    for a, b in [("vaca", "baca"), ("llave", "yabe"), ("hipoteca", "ipoteka"), ("cielo", "sielo"),
+                 ("genealogia", "jenealogia"), ("queso", "keso")]:
+        assert fuzzy.phonetic_key(a) == fuzzy.phonetic_key(b), (a, b)
+    assert fuzzy.phonetic_key("casa") != fuzzy.phonetic_key("gasa")
+
+
+def test_spoken_extension_and_name_split():
+    assert fuzzy.normalize_spoken("foto punto png") == "foto.png"
+    assert fuzzy.split_name("Informe_Final-2023.PDF") == (['informe', 'final', '2023'], 'pdf')
+    assert fuzzy.split_name(".bashrc") == (['bashrc'], '')
+
+
+def test_target_made_of_common_words_is_found():
+    names = name_index.NameIndex()
+    words = ["foto", "playa", "boda", "notas", "acta"]
+    rng = random.Random(5)
+    for i in range(6000):
+        a, b = rng.sample(words, 2)
+        names.add(f"/h/{a}_{b}_{i}.jpg", 0)
+    names.add("/h/docs/foto_playa_boda.jpg", 0)
+    # Cada palabra está en miles de nombres: sus trigramas son todos comunes
+    assert len(names.postings['\x02BOD']) > fuzzy.MAX_SEED
+    results = fuzzy.FuzzyMatcher(names).search("foto playa voda")
+    assert results[0]['path'] == "/h/docs/foto_playa_boda.jpg"
+
+
+def test_rare_misheard_name_is_ranked_first():
+    names = name_index.NameIndex()
+    for i in range(500):
+        names.add(f"/h/informe_{i}.pdf", 0)
+    names.add("/h/vacaciones_ibiza.jpg", 0)
+    results = fuzzy.FuzzyMatcher(names).search("bacasiones ibisa jota pe ge")
+    assert results[0]['path'] == "/h/vacaciones_ibiza.jpg"
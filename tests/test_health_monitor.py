@@ -0,0 +1,83 @@
+import logging
+
+from support import load, FakeCore
+
+health_monitor = load("health_monitor")
+
+
+class ScriptedLogs:
+    """Devuelve en cada poll() los errores que el test haya dejado en `next`."""
+
+    def __init__(self):
+        self.next = 0
+
+    def poll(self):
+        events = [{'signature': 'sig-disco'}] * self.next
+        self.next = 0
+        return events
+
+    def top(self, limit, since=None):
+        return []
+
+
+class Manager:
+    cpu = "20%"
+
+    def get_cpu_usage(self):
+        return self.cpu
+
+    def get_ram_usage(self):
+        return "40%"
+
+    def get_disk_usage(self):
+        return "50%"
+
+
+def make_monitor():
+    core = FakeCore({'diagnosis': {'config': {'health_alert_interval': 900}}})
+    core.log_analyzer = ScriptedLogs()
+    core.sysadmin_manager = Manager()
+    return core, health_monitor.HealthMonitor(core, logging.getLogger("tests"))
+
+
+def alerts(core):
+    return [core.event_queue.get_nowait() for _ in range(core.event_queue.qsize())]
+
+
+def test_ewma_waits_for_enough_samples():
+    ewma = health_monitor.Ewma()
+    assert [ewma.update(0) for _ in range(health_monitor.MIN_SAMPLES)] == [0.0] * health_monitor.MIN_SAMPLES
+    # Tras una serie plana manda MIN_STD: el salto se mide en unidades, no se divide por cero
+    assert ewma.update(5) == 5.0
+    assert ewma.update(0) < 0
+
+
+def test_error_spike_is_flagged_and_alerted_once():
+    core, monitor = make_monitor()
+    for _ in range(health_monitor.MIN_SAMPLES + 1):
+        monitor.sample()
+    assert monitor.state['anomalies'] == []
+
+    core.log_analyzer.next = 2  # Por debajo de 3 errores no es un pico
+    monitor.sample()
+    assert monitor.state['anomalies'] == []
+
+    core.log_analyzer.next = 8
+    monitor.sample()
+    # La firma es nueva (aún sin MIN_SAMPLES intervalos): salta solo el total
+    assert [anomaly['kind'] for anomaly in monitor.state['anomalies']] == ['errors']
+    assert [alert['kind'] for alert in alerts(core)] == ['errors']
+
+    # Un segundo pico dentro de health_alert_interval queda en el estado pero no se avisa
+    core.log_analyzer.next = 30
+    monitor.sample()
+    assert monitor.state['anomalies']
+    assert alerts(core) == []
+
+
+def test_metric_over_the_absolute_limit_needs_no_history():
+    core, monitor = make_monitor()
+    core.sysadmin_manager.cpu = "97%"
+    monitor.sample()
+    assert [anomaly['kind'] for anomaly in monitor.state['anomalies']] == ['cpu']
+    assert monitor.summary().startswith("Uso de CPU alto: 97%.")
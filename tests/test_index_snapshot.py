@@ -0,0 +1,37 @@
+import pytest
+
+from support import load
+
+index_snapshot = load("index_snapshot")
+
+DIRS = {
+    "/home/ana": {'mtime': 10.5, 'files': {"notas.txt": [120, 9.0, 11]}, 'subdirs': ["Música", "vacía"]},
+    "/home/ana/Música": {'mtime': 11.0, 'files': {"canción.mp3": [4096, 8.0, 12], "b.ogg": [1, 7.5, 13]},
+                         'subdirs': []},
+    "/home/ana/vacía": {'mtime': 12.0, 'files': {}, 'subdirs': []},
+}
+
+
+def test_round_trip_and_lookup(tmp_path):
+    path = str(tmp_path / "index.snap")
+    index_snapshot.save_snapshot(path, DIRS, {'last_scan': 42})
+    snapshot = index_snapshot.SnapshotDirs(path)
+    assert snapshot.meta == {'last_scan': 42}
+    assert len(snapshot) == 3 and snapshot.file_count() == 3
+    assert dict(snapshot.items()) == DIRS
+    assert snapshot["/home/ana/Música"] == DIRS["/home/ana/Música"]
+    assert "/home/ana/vacía" in snapshot
+    assert "/home/an" not in snapshot and "/home/ana/Música/x" not in snapshot
+    with pytest.raises(KeyError):
+        snapshot["/tmp"]
+
+
+def test_empty_and_foreign_files(tmp_path):
+    path = str(tmp_path / "index.snap")
+    index_snapshot.save_snapshot(path, {}, {})
+    snapshot = index_snapshot.SnapshotDirs(path)
+    assert len(snapshot) == 0 and snapshot.file_count() == 0 and "/" not in snapshot
+
+    (tmp_path / "otro.snap").write_bytes(b"NOPE" + bytes(32))
+    with pytest.raises(ValueError):
+        index_snapshot.SnapshotDirs(str(tmp_path / "otro.snap"))
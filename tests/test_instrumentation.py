@@ -0,0 +1,64 @@
+import types
+
+from support import load
+
+instrumentation = load("instrumentation")
+
+
+class Skill:
+    def __init__(self, recorder):
+        self.core = types.SimpleNamespace(instrumentation=recorder)
+
+    @instrumentation.instrumented
+    def buscar(self, command, response):
+        with instrumentation.span('db'):
+            pass
+        instrumentation.mark_speak()
+        return self.leer(command, response)
+
+    @instrumentation.instrumented
+    def leer(self, command, response):
+        return self.contar()
+
+    @instrumentation.spanned('index')
+    def contar(self):
+        return 3
+
+
+def test_histogram_quantiles_use_bucket_bounds():
+    histogram = instrumentation.Histogram()
+    for seconds in (0.001, 0.002, 0.03, 0.04, 7.0):
+        histogram.observe(seconds)
+    assert histogram.quantile(0.4) == 0.005
+    assert histogram.quantile(0.8) == 0.05
+    assert histogram.quantile(1.0) == 10.0
+    assert instrumentation.Histogram().quantile(0.5) is None
+
+
+def test_handler_records_wall_cpu_first_speak_and_spans():
+    recorder = instrumentation.Instrumentation()
+    assert Skill(recorder).buscar("busca", None) == 3
+    data = recorder.snapshot()
+    for metric in ('wall', 'cpu', 'first_speak'):
+        assert [(e['skill'], e['handler'], e['count']) for e in data[metric]] == [('Skill', 'buscar', 1)]
+    # El handler anidado cuenta como tramo del de fuera, no como llamada propia
+    assert sorted(e['kind'] for e in data['span']) == ['call:leer', 'db', 'index']
+    # Fuera de un handler los tramos no se anotan
+    Skill(recorder).contar()
+    assert len(recorder.snapshot()['span']) == 3
+
+
+def test_disabled_instrumentation_records_nothing():
+    recorder = instrumentation.Instrumentation(enabled=False)
+    Skill(recorder).buscar("busca", None)
+    assert recorder.histograms == {}
+
+
+def test_prometheus_buckets_are_cumulative():
+    recorder = instrumentation.Instrumentation()
+    recorder.observe('wall', ('Skill', 'buscar'), 0.001)
+    recorder.observe('wall', ('Skill', 'buscar'), 0.3)
+    lines = recorder.to_prometheus().splitlines()
+    assert 'skill_wall_seconds_bucket{skill="Skill",handler="buscar",le="0.25"} 1' in lines
+    assert 'skill_wall_seconds_bucket{skill="Skill",handler="buscar",le="+Inf"} 2' in lines
+    assert 'skill_wall_seconds_count{skill="Skill",handler="buscar"} 2' in lines
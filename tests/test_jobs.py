@@ -0,0 +1,67 @@
+import threading
+
+from support import load, FakeCore
+
+jobs = load("jobs")
+
+APT_OUTPUT = """2 upgraded, 0 newly installed, 0 to remove
+Get:1 http://deb.debian.org bookworm/main curl
+Unpacking curl (7.88)
+Setting up curl (7.88)
+Unpacking vim:amd64 (9.0)
+Setting up vim:amd64 (9.0)
+"""
+
+
+def wait_for(start, *args, **kwargs):
+    done = threading.Event()
+    job = start(*args, on_done=lambda job: done.set(), **kwargs)
+    assert done.wait(10)
+    return job
+
+
+def test_apt_progress_by_stage():
+    parser = jobs.AptProgress()
+    job = jobs.Job(1, 'update', 'actualización')
+    steps = []
+    for line in APT_OUTPUT.splitlines():
+        parser(job, line)
+        steps.append(job.progress)
+    assert steps == [None, 5, 40.0, 60.0, 80.0, 99]
+    assert job.stage == "instalando vim"
+
+
+def test_command_job_lifecycle():
+    core = FakeCore()
+    manager = jobs.JobManager(core)
+    job = wait_for(manager.start_command, 'update', 'actualización',
+                   ['printf', APT_OUTPUT], parser=jobs.AptProgress())
+    assert manager.status('update') is job and manager.get(job.id) is job
+    assert job.status == 'done' and job.progress == 100
+    assert jobs.describe(job).startswith("La actualización terminó")
+
+    events = [core.event_queue.get_nowait() for _ in range(core.event_queue.qsize())]
+    assert all(event['type'] == 'job_progress' and event['id'] == job.id for event in events)
+    assert events[0]['status'] == 'queued' and events[-1]['status'] == 'done'
+
+
+def test_cancel_running_command():
+    manager = jobs.JobManager(FakeCore())
+    done = threading.Event()
+    job = manager.start_command('update', 'actualización', ['sleep', '30'], on_done=lambda job: done.set())
+    assert manager.cancel('update')
+    assert done.wait(10)
+    assert job.status == 'cancelled' and not job.active
+    assert not manager.cancel('update')
+    assert jobs.describe(job) == "La actualización se canceló."
+
+
+def test_call_errors_fail_the_job_and_history_is_bounded():
+    manager = jobs.JobManager(FakeCore(), history=2)
+    failed = wait_for(manager.start_call, 'speedtest', 'prueba de velocidad',
+                      lambda: {'error': 'sin conexión'})
+    assert failed.status == 'failed' and failed.progress is None
+    for _ in range(2):
+        wait_for(manager.start_call, 'speedtest', 'prueba de velocidad', lambda: {'down': 90})
+    assert manager.get(failed.id) is None
+    assert manager.status('speedtest').status == 'done'
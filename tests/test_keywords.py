@@ -0,0 +1,33 @@
+import re
+
+from support import load
+
+keywords = load("keywords")
+
+
+def test_trie_prefers_the_longest_key():
+    words = ["red", "redes", "registro", "apache", "apache2"]
+    pattern = re.compile(keywords.trie_pattern(words))
+    assert pattern.fullmatch("redes") and pattern.fullmatch("apache2")
+    assert [m.group(0) for m in pattern.finditer("los registros de apache2 y la red")] == ["registro", "apache2", "red"]
+
+
+def test_matcher_aliases_and_order():
+    matcher = keywords.KeywordMatcher(
+        {'manual_red': "/docs/red.md", 'Nginx': ["/var/log/nginx/error.log"]},
+        aliases=lambda key: [key.replace("_", " ")])
+    assert matcher.find("abre el manual red") == ('manual_red', "/docs/red.md")
+    assert matcher.find_all("NGINX falla, mira el manual_red y nginx otra vez") == [
+        ('Nginx', ["/var/log/nginx/error.log"]), ('manual_red', "/docs/red.md")]
+    assert matcher.find("nada que ver") is None
+    assert keywords.KeywordMatcher({}).find_all("red") == []
+
+
+def test_path_cache_rechecks_after_ttl(tmp_path):
+    path = tmp_path / "syslog"
+    cache = keywords.PathCache(ttl=60)
+    assert cache.first_existing([str(path)]) is None
+    path.write_text("x")
+    assert not cache.exists(str(path))  # Aún vale lo comprobado
+    cache.ttl = 0
+    assert cache.first_existing([str(tmp_path / "otro"), str(path)]) == str(path)
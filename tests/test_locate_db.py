@@ -0,0 +1,49 @@
+from support import load
+
+locate_db = load("locate_db")
+walker = load("walker")
+
+
+class ListWalker:
+    def __init__(self, dirs):
+        self.dirs = dirs
+
+    def walk(self, roots, with_stats=False):
+        for path, names in self.dirs.items():
+            yield walker.DirListing(path, 0, [(name, None) for name in names], [])
+
+
+def make_db(tmp_path, dirs):
+    path = str(tmp_path / "locate.db")
+    locate_db.build_locate_db(path, ListWalker(dirs), ['/'])
+    return locate_db.LocateDB(path)
+
+
+def test_class_byte_is_not_part_of_the_name(tmp_path):
+    db = make_db(tmp_path, {'/m': ['udio.mp3', 'Audio.mp3', 'mi_audio.wav']})
+    assert db.search('audio') == ['/m/Audio.mp3', '/m/mi_audio.wav']
+    assert db.search('*[!x]udio*') == ['/m/Audio.mp3', '/m/mi_audio.wav']
+    db.close()
+
+
+def test_accept_filters_before_the_limit(tmp_path):
+    db = make_db(tmp_path, {'/d': [f'informe_{i}.docx' for i in range(10)] + ['informe.pdf']})
+    results = db.search('informe', limit=2, classes=[b'D'], accept=lambda name: name.endswith('.pdf'))
+    assert results == ['/d/informe.pdf']
+    db.close()
+
+
+def test_glob_wildcards_match_characters_not_bytes(tmp_path):
+    db = make_db(tmp_path, {'/f': ['año.txt', 'ano.txt', 'AÑO.md', 'anno.txt']})
+    assert db.search('a?o.*') == ['/f/AÑO.md', '/f/ano.txt', '/f/año.txt']
+    assert db.search('a[ñ]o*') == ['/f/AÑO.md', '/f/año.txt']
+    assert db.search('a[!ñ]o*') == ['/f/ano.txt']
+    db.close()
+
+
+def test_written_from_an_existing_listing(tmp_path):
+    path = str(tmp_path / "locate.db")
+    assert locate_db.write_locate_db(path, [('/a', ['uno.pdf', 'dos.pdf']), ('/b', ['tres.mp3'])]) == 3
+    db = locate_db.LocateDB(path)
+    assert db.search('*.pdf', classes=[b'D']) == ['/a/dos.pdf', '/a/uno.pdf']
+    db.close()
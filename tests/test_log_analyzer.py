@@ -0,0 +1,64 @@
+import re
+import logging
+
+from support import load
+
+log_analyzer = load("log_analyzer")
+log_tail = load("log_tail")
+
+LOGGER = logging.getLogger("tests")
+
+CHAINED = b"""2024-05-01 10:00:00,123 - ERROR - job failed
+Traceback (most recent call last):
+  File "/srv/app/job.py", line 10, in run
+    data[key]
+KeyError: 'user'
+
+During handling of the above exception, another exception occurred:
+
+Traceback (most recent call last):
+  File "/srv/app/job.py", line 12, in run
+    raise ValueError("sin usuario")
+ValueError: sin usuario
+2024-05-01 10:00:01,000 - INFO - next job
+"""
+
+
+def test_combined_pattern_matches_like_the_separate_ones():
+    pattern = log_analyzer.compile_patterns([r'\bdenied\b'])
+    for line in [b"kernel: Out of memory: Killed process", b"sshd: permission denied", b"all good",
+                 b"nginx: connect() failed", b"INFO: unfailed retries"]:
+        expected = any(re.search(p.encode(), line) for p in log_analyzer.ERROR_PATTERNS + [r'\bdenied\b'])
+        assert bool(pattern.search(line)) == expected, line
+
+
+def test_chained_traceback_is_one_event():
+    events = log_analyzer.split_events(CHAINED, log_analyzer.compile_patterns())
+    assert len(events) == 1
+    text, level = events[0]
+    assert text.startswith("2024-05-01") and text.endswith("ValueError: sin usuario")
+    assert level == 'error'
+
+
+def test_signature_ignores_timestamps_pids_and_paths():
+    a = log_analyzer.error_signature("2024-05-01 10:00:00 sshd[123]: Failed for /home/ana/x at 0x7f00")
+    b = log_analyzer.error_signature("2024-06-02 11:30:59 sshd[999]: Failed for /home/luis/y at 0x7f99")
+    assert a == b
+
+
+def test_sources_are_read_incrementally_and_filtered_before_the_limit(tmp_path):
+    app, syslog = tmp_path / "app.log", tmp_path / "syslog"
+    app.write_bytes(b"".join(b"ERROR app failure %d\n" % (i % 3) for i in range(30)))
+    syslog.write_bytes(b"kernel: disk sda failed\n")
+    cursor = log_tail.LogCursor(str(tmp_path / "cursors.json"), LOGGER)
+    analyzer = log_analyzer.LogAnalyzer([(str(app), 'text'), (str(syslog), 'text')], LOGGER, cursor=cursor)
+
+    assert len(analyzer.poll()) == 31
+    assert analyzer.poll() == []
+    with open(syslog, 'ab') as f:
+        f.write(b"kernel: disk sda failed\n")
+    assert len(analyzer.poll()) == 1
+
+    # Las tres firmas de app.log son las más repetidas, pero no tapan al resto
+    top = analyzer.top(1, exclude_sources=[str(app)])
+    assert top[0]['source'] == str(syslog) and top[0]['count'] == 2
@@ -0,0 +1,74 @@
+import os
+
+from support import load
+
+log_tail = load("log_tail")
+
+
+def write(path, text, mode='w'):
+    with open(path, mode) as f:
+        f.write(text)
+
+
+def test_tail_reads_only_the_end(tmp_path, monkeypatch):
+    path = tmp_path / "app.log"
+    write(path, "".join(f"línea {i}\n" for i in range(10000)) + "a medias")
+    reads = []
+    real_open = open
+
+    class Counting:
+        def __init__(self, f):
+            self.f = f
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            self.f.close()
+
+        def seek(self, *args):
+            return self.f.seek(*args)
+
+        def read(self, size):
+            reads.append(size)
+            return self.f.read(size)
+
+    monkeypatch.setattr(log_tail, 'open', lambda *a: Counting(real_open(*a)), raising=False)
+    lines, end = log_tail.tail_lines(str(path), 3, block=64)
+    assert lines == ["línea 9997", "línea 9998", "línea 9999"]
+    # La línea sin terminar queda fuera del offset para el cursor
+    assert end == os.path.getsize(path) - len("a medias")
+    assert sum(reads) < 256
+
+
+def test_cursor_follows_appends_and_detects_rotation(tmp_path):
+    path, state = str(tmp_path / "app.log"), str(tmp_path / "cursors.json")
+    write(path, "uno\ndos\n")
+    cursor = log_tail.LogCursor(state)
+    assert cursor.read_new(path) == (["uno", "dos"], False)
+    write(path, "tres\ncuat", 'a')
+    assert cursor.read_new(path) == (["tres"], True)
+
+    # Truncado en sitio: vuelve a empezar y lo avisa
+    write(path, "nuevo\n")
+    assert cursor.read_new(path) == (["nuevo"], False)
+
+    # Rotación: otro archivo con el mismo nombre (otro inodo)
+    os.rename(path, path + ".1")
+    write(path, "rotado\n")
+    assert cursor.read_new(path) == (["rotado"], False)
+
+
+def test_cursor_round_trip(tmp_path):
+    path, state = str(tmp_path / "app.log"), str(tmp_path / "cursors.json")
+    write(path, "viejo\n")
+    cursor = log_tail.LogCursor(state)
+    cursor.read_new(path)
+    cursor.save()
+    write(path, "nuevo\n", 'a')
+    assert log_tail.LogCursor(state).read_new(path) == (["nuevo"], True)
+
+    memory = log_tail.LogCursor(None)
+    memory.read_new(path)
+    memory.save()
+    assert log_tail.LogCursor(None).read_new(path) == (["viejo", "nuevo"], False)
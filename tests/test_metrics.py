@@ -0,0 +1,15 @@
+from support import load
+
+metrics = load("metrics")
+
+
+def test_first_sample_has_no_cpu_or_net_rate():
+    sampler = metrics.MetricsSampler(interval=1.0)
+    sampler.sample(now=100.0)
+    assert sampler.current('cpu') is None
+    assert sampler.current('net_rx') is None
+    assert sampler.current('ram') is not None
+
+    sampler.sample(now=101.0)
+    assert sampler.series['net_rx'].count == 1
+    assert sampler.average('net_rx', 1) == sampler.current('net_rx')
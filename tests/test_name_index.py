@@ -0,0 +1,40 @@
+from support import load
+
+name_index = load("name_index")
+
+
+def test_exact_name_found_beyond_the_cap():
+    index = name_index.NameIndex(phonetic=False)
+    index.add('/home/u/docs/report.pdf', 0)
+    for i in range(30000):
+        index.add(f'/home/u/old/old_report_{i}.pdf', 0)
+    assert index.search('report', limit=1)[0]['path'] == '/home/u/docs/report.pdf'
+
+
+def test_removed_exact_name_is_not_returned():
+    index = name_index.NameIndex(phonetic=False)
+    index.add('/a/report.pdf', 0)
+    index.add('/b/report.txt', 0)
+    index.remove('/a/report.pdf')
+    assert [r['path'] for r in index.search('report')] == ['/b/report.txt']
+
+
+def test_compaction_runs_off_the_remove_call_and_keeps_concurrent_changes(monkeypatch):
+    index = name_index.NameIndex(phonetic=False)
+    for i in range(4000):
+        index.add(f'/d/file_{i}.txt', 0)
+    started = []
+    monkeypatch.setattr(name_index.threading, 'Thread',
+                        lambda target, daemon: type('T', (), {'start': lambda self: started.append(target)})())
+    for i in range(1500):
+        index.remove(f'/d/file_{i}.txt')
+    # remove() solo la programa; lo que pase mientras se aplica al terminar
+    assert len(started) == 1 and len(index.paths) == 4000
+    index.add('/d/nuevo.txt', 0)
+    index.remove('/d/file_3999.txt')
+    started[0]()
+
+    assert len(index.paths) == len(index) == 2500
+    assert index.search('nuevo.txt')[0]['path'] == '/d/nuevo.txt'
+    assert index.search('file_3999') == []
+    assert index.search('file_2000')[0]['path'] == '/d/file_2000.txt'
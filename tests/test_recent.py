@@ -0,0 +1,41 @@
+import json
+import time
+
+from support import load
+
+recent = load("recent")
+
+
+def test_history_is_bounded_and_newest_first(tmp_path):
+    context = {}
+    results = recent.RecentResults(str(tmp_path / "recent.json"), max_entries=2, save_interval=60, context=context)
+    for name in ("a.mp3", "b.png", "c.log"):
+        results.add(f"/tmp/{name}")
+    assert [e['path'] for e in results.history()] == ["/tmp/c.log", "/tmp/b.png"]
+    assert [e['type'] for e in results.history()] == ['log', 'image']
+    assert context['last_found_file'] == "/tmp/c.log"
+
+
+def test_expired_entries_are_dropped(tmp_path):
+    results = recent.RecentResults(str(tmp_path / "recent.json"), ttl=60, save_interval=60)
+    entry = results.add("/tmp/informe.pdf")
+    assert results.last_path() == "/tmp/informe.pdf"
+    entry['timestamp'] -= 61
+    assert results.last() is None and results.history() == []
+
+
+def test_reload_after_flush_and_legacy_file(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "data").mkdir()
+    # El formato antiguo de FinderSkill: un solo resultado
+    with open(recent.LEGACY_FILE, 'w') as f:
+        json.dump({'path': "/tmp/viejo.txt", 'type': 'doc', 'source': None, 'timestamp': time.time()}, f)
+    path = str(tmp_path / recent.RECENT_FILE)
+    results = recent.RecentResults(path, save_interval=60)
+    assert results.last_path() == "/tmp/viejo.txt"
+
+    results.add("/tmp/nuevo.txt", source='finder')
+    results.flush()
+    reloaded = recent.RecentResults(path, save_interval=60)
+    assert [e['path'] for e in reloaded.history()] == ["/tmp/nuevo.txt", "/tmp/viejo.txt"]
+    assert reloaded.last()['source'] == 'finder'
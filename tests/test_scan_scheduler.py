@@ -0,0 +1,63 @@
+from datetime import datetime
+
+import pytest
+
+from support import load, FakeCore
+
+scan_scheduler = load("scan_scheduler")
+
+
+def test_window_crossing_midnight():
+    window = scan_scheduler.parse_window("23:00-02:30")
+    assert window == ((23, 0), (2, 30))
+    assert scan_scheduler.in_window(window, datetime(2024, 1, 1, 23, 30))
+    assert scan_scheduler.in_window(window, datetime(2024, 1, 1, 1, 0))
+    assert not scan_scheduler.in_window(window, datetime(2024, 1, 1, 2, 30))
+    assert scan_scheduler.in_window(None)
+
+
+class Scheduler(scan_scheduler.ScanScheduler):
+    """Sin /proc ni reloj de pared: ocupado solo si se dice."""
+
+    def __init__(self, run, **config):
+        super().__init__(FakeCore(), config, run)
+        self.is_busy = False
+
+    def busy(self):
+        return self.is_busy
+
+
+def test_last_scan_only_moves_when_the_scan_completed():
+    results = [False, True]
+    scheduler = Scheduler(lambda throttle: results.pop(0))
+    scheduler.tick()
+    assert scheduler.last_scan == 0
+    scheduler.tick()
+    assert scheduler.last_scan > 0
+    scheduler.tick()  # Ya no toca hasta dentro de scan_interval
+    assert results == []
+
+
+def test_busy_or_aborted_scans_are_retried():
+    calls = []
+
+    def run(throttle):
+        calls.append(throttle)
+        raise scan_scheduler.ScanAborted()
+
+    scheduler = Scheduler(run)
+    scheduler.is_busy = True
+    scheduler.tick()
+    assert calls == []
+    scheduler.is_busy = False
+    scheduler.tick()
+    assert len(calls) == 1 and scheduler.last_scan == 0
+
+
+def test_throttle_aborts_outside_the_window(monkeypatch):
+    scheduler = Scheduler(None, scan_window="02:00-06:00")
+    monkeypatch.setattr(scan_scheduler, 'in_window', lambda window, now=None: False)
+    with pytest.raises(scan_scheduler.ScanAborted):
+        scheduler.throttle()
+    # Entre comprobaciones (cada 0.5 s) no se vuelve a mirar
+    scheduler.throttle()
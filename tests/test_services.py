@@ -0,0 +1,26 @@
+import time
+
+from support import load, FakeCore
+
+services = load("services")
+
+
+def make_cache(*names):
+    cache = services.ServiceCache(FakeCore())
+    cache.units = {name: {'name': name, 'active': 'active', 'sub': 'running', 'description': ''} for name in names}
+    cache.updated = time.monotonic()
+    return cache
+
+
+def test_exact_and_unique_prefix_are_certain():
+    cache = make_cache('ssh.service', 'apache2.service', 'sshd-keygen.service')
+    assert cache.resolve('ssh') == (cache.units['ssh.service'], True)
+    assert cache.resolve('apache') == (cache.units['apache2.service'], True)
+
+
+def test_ambiguous_or_loose_matches_need_confirmation():
+    cache = make_cache('apache2.service', 'apache-htcacheclean.service', 'docker.service')
+    unit, certain = cache.resolve('apache')
+    assert unit['name'] == 'apache2.service' and not certain
+    unit, certain = cache.resolve('ocker')
+    assert unit['name'] == 'docker.service' and not certain
@@ -0,0 +1,25 @@
+import sys
+import importlib
+
+from support import FakeCore, PACKAGE
+
+skills = importlib.import_module(PACKAGE)
+
+
+def test_skill_module_is_imported_on_first_use(monkeypatch):
+    name = f"{PACKAGE}.time_date"
+    monkeypatch.delitem(sys.modules, name, raising=False)
+    # BaseSkill toma el logger de NeoCore, que no forma parte del paquete
+    monkeypatch.setattr(skills.BaseSkill, '__init__', lambda self, core: setattr(self, 'core', core))
+    core = FakeCore({'loader': {'config': {'warmup_delay': 3600}}})
+
+    proxies = skills.load_skills(core)
+    assert name not in sys.modules
+    assert 'time_date' in proxies and not core.skill_registry.loaded('time_date')
+
+    assert callable(proxies['time_date'].decir_dia_semana)
+    assert name in sys.modules
+    assert core.skill_registry.timings['time_date']['trigger'] == 'intent'
+    # Otra llamada no vuelve a lanzar el precalentamiento ni recarga nada
+    skills.load_skills(core)
+    assert core.skill_registry.report()[0][0] == 'time_date'
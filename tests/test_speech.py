@@ -0,0 +1,46 @@
+import queue
+import threading
+
+from support import load
+
+speech = load("speech")
+
+
+class SlowQueue(queue.Queue):
+    """La primera frase tarda en encolarse, como un put con el consumidor ocupado."""
+
+    def __init__(self):
+        super().__init__()
+        self.entered = threading.Event()
+
+    def put(self, item, *args, **kwargs):
+        if not self.entered.is_set():
+            self.entered.set()
+            threading.Event().wait(0.2)
+        super().put(item, *args, **kwargs)
+
+
+def spoken(events):
+    return [events.get_nowait()['text'] for _ in range(events.qsize())]
+
+
+def test_progress_is_replaced_only_by_its_own_skill():
+    events = queue.Queue()
+    pipeline = speech.SpeechPipeline(events, window=10)
+    pipeline.say("Buscando informe...", progress=True, source="FilesSkill")
+    pipeline.say("Consultando Docker...", progress=True, source="DockerSkill")
+    pipeline.say("Tres contenedores activos.", source="DockerSkill")
+    pipeline.flush()
+    assert spoken(events) == ["Buscando informe... Tres contenedores activos."]
+    assert pipeline.dropped == 1
+
+
+def test_concurrent_flushes_keep_order():
+    events = SlowQueue()
+    pipeline = speech.SpeechPipeline(events, window=0)
+    first = threading.Thread(target=pipeline.say, args=("Uno.",))
+    first.start()
+    events.entered.wait(1)
+    pipeline.say("Dos.")
+    first.join()
+    assert spoken(events) == ["Uno.", "Dos."]
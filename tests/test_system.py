@@ -0,0 +1,12 @@
+from support import load
+
+system = load("system")
+
+
+def test_spoken_home_folder_is_expanded(monkeypatch):
+    monkeypatch.setenv('HOME', '/home/ana')
+    assert system.spoken_path("mi carpeta personal") == '/home/ana'
+    assert system.spoken_path("Mi carpeta personal/Documentos") == '/home/ana/Documentos'
+    assert system.spoken_path("~/fotos") == '/home/ana/fotos'
+    assert system.spoken_path("/var/log") == '/var/log'
+    assert system.spoken_path("casas") == 'casas'
@@ -0,0 +1,69 @@
+import time
+import threading
+
+from support import load
+
+walker = load("walker")
+
+
+class HangingWalker(walker.ParallelWalker):
+    """Un directorio que no termina de listarse, como un montaje NFS caído."""
+
+    def __init__(self, hung):
+        super().__init__(workers=2)
+        self.hung = hung
+        self.release = threading.Event()
+
+    def list_dir(self, path, *args, **kwargs):
+        if path == self.hung:
+            self.release.wait(10)
+        return super().list_dir(path, *args, **kwargs)
+
+
+def make_tree(tmp_path):
+    (tmp_path / "ok").mkdir()
+    (tmp_path / "ok" / "nota.txt").write_text("x")
+    (tmp_path / "nfs").mkdir()
+    return HangingWalker(str(tmp_path / "nfs"))
+
+
+def test_timeout_with_hung_listing(tmp_path):
+    w = make_tree(tmp_path)
+    search = walker.LiveSearch(w, [str(tmp_path)], "nota", timeout=0.3)
+    start = time.monotonic()
+    found = list(search)
+    w.release.set()
+    assert time.monotonic() - start < 2
+    assert search.timed_out
+    assert found == [str(tmp_path / "ok" / "nota.txt")]
+
+
+def test_cancel_with_hung_listing(tmp_path):
+    w = make_tree(tmp_path)
+    search = walker.LiveSearch(w, [str(tmp_path)], "nota")
+    threading.Timer(0.3, search.cancel).start()
+    start = time.monotonic()
+    list(search)
+    w.release.set()
+    assert time.monotonic() - start < 2
+    assert search.finished_early
+
+
+def test_path_globs_match_the_whole_path():
+    assert walker.path_glob("/home/*/.cache").match("/home/ana/.cache")
+    assert not walker.path_glob("/home/*/.cache").match("/home/ana/x/.cache")
+    assert walker.path_glob("/home/**/.cache").match("/home/ana/x/.cache")
+    assert walker.path_glob("build/tmp").match("/src/build/tmp")
+    assert not walker.path_glob("build/tmp").match("/src/rebuild/tmp")
+    assert not walker.path_glob("/data/[!a]*").match("/data/abc")
+
+
+def test_excluded_root_is_not_walked(tmp_path):
+    root = tmp_path / "node_modules"
+    root.mkdir()
+    (root / "paquete.js").write_text("x")
+    (tmp_path / "src").mkdir()
+    (tmp_path / "src" / "app.js").write_text("x")
+    w = walker.ParallelWalker(exclude=["node_modules", str(tmp_path / "src")])
+    assert list(w.walk([str(root)])) == []
+    assert list(w.walk([str(tmp_path / "src")])) == []
@@ -0,0 +1,90 @@
+import os
+import time
+import errno
+import ctypes
+import logging
+import threading
+
+import pytest
+
+from support import load, FakeCore
+
+file_index = load("file_index")
+watcher = load("watcher")
+
+
+def test_stop_closes_inotify_fd(tmp_path):
+    core = FakeCore({'files': {'config': {'scan_paths': [str(tmp_path)]}}})
+    index = file_index.FileIndex(core, snapshot_file=str(tmp_path / "index.snap"))
+    index.update()
+    try:
+        w = watcher.IndexWatcher(index, core.app_logger, coalesce=0.1)
+    except watcher.InotifyUnavailable:
+        pytest.skip("inotify no disponible")
+    fd = w.fd
+    w.start()
+    w.stop()
+    assert w.fd == -1
+    with pytest.raises(OSError):
+        os.fstat(fd)
+
+
+class LimitedLibc:
+    """libc con solo `limit` watches libres."""
+
+    def __init__(self, limit):
+        self.limit = limit
+        self.calls = 0
+
+    def inotify_add_watch(self, fd, path, mask):
+        self.calls += 1
+        if self.calls > self.limit:
+            ctypes.set_errno(errno.ENOSPC)
+            return -1
+        return self.calls
+
+
+class RecordingIndex:
+    def __init__(self):
+        self.dirs = {}
+        self.updates = []
+
+    def update(self, roots=None):
+        self.updates.append((roots, threading.current_thread()))
+
+
+def make_watcher(index):
+    try:
+        return watcher.IndexWatcher(index, logging.getLogger("tests"), coalesce=0.1)
+    except watcher.InotifyUnavailable:
+        pytest.skip("inotify no disponible")
+
+
+def test_watch_limit_polls_nearest_watched_ancestor_once():
+    w = make_watcher(RecordingIndex())
+    w.libc = LimitedLibc(2)
+    for folder in ['/r', '/r/a', '/r/a/x', '/r/b', '/r/b/y', '/r/c']:
+        w.add_watch(folder)
+    assert w.exhausted
+    assert w.polled == {'/r'}
+    # Tras el primer ENOSPC no se vuelve a pedir ningún watch
+    assert w.libc.calls == 3
+    w.stop()
+
+
+def test_queue_overflow_rescans_outside_the_reader():
+    index = RecordingIndex()
+    w = make_watcher(index)
+    w.running = True
+    w._parse(watcher.EVENT_HEADER.pack(-1, watcher.IN_Q_OVERFLOW, 0, 0))
+    w._flush()
+    assert w.rescan.is_set() and not index.updates
+
+    rescans = threading.Thread(target=w._rescan_loop)
+    rescans.start()
+    deadline = time.time() + 5
+    while not index.updates and time.time() < deadline:
+        time.sleep(0.01)
+    w.stop()
+    rescans.join(5)
+    assert index.updates[0] == (None, rescans)
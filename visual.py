@@ -1,12 +1,13 @@
 from modules.BlueberrySkills import BaseSkill
 import os
+from .recent import get_recent_results
 
 class VisualSkill(BaseSkill):
     def show_last_file(self, command, response, **kwargs):
         """Muestra el último archivo encontrado en la pantalla."""
         
         # 1. Recuperar contexto
-        last_file = self.core.context.get('last_found_file')
+        last_file = get_recent_results(self.core).last_path()
         
         if not last_file:
             self.speak("No tengo ningún archivo en memoria para mostrar.")
@@ -0,0 +1,283 @@
+"""
+Recorrido paralelo de directorios basado en os.scandir.
+
+Cada directorio es una tarea de un ThreadPoolExecutor, de forma que varias
+raíces (y varios subárboles de una misma raíz) se listan a la vez. Esto importa
+sobre todo en discos de red (NFS), donde cada llamada espera latencia.
+"""
+import os
+import re
+import time
+import queue
+import threading
+import fnmatch
+from collections import deque, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+DEFAULT_EXCLUDES = ['node_modules', '.git', '__pycache__', '/proc', '/sys', '/dev', '/run']
+# Cada cuánto se mira `deadline`/`cancelled` mientras se espera un listado
+POLL_INTERVAL = 0.1
+
+# files: lista de (nombre, os.stat_result), o None si el listado se reutilizó
+DirListing = namedtuple('DirListing', 'path mtime files subdirs')
+
+
+def path_glob(pattern):
+    """
+    Glob de ruta -> regex sobre la ruta completa. '*' y '?' no cruzan '/'
+    ('**' sí); sin '/' inicial casa con los últimos componentes de la ruta
+    ('build/tmp' excluye cualquier '.../build/tmp').
+    """
+    out = ['^' if pattern.startswith('/') else '^(?:.*/)?']
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        if pattern.startswith('**', i):
+            out.append('.*')
+            i += 1
+        elif char == '*':
+            out.append('[^/]*')
+        elif char == '?':
+            out.append('[^/]')
+        elif char == '[':
+            # Como fnmatch: un ']' justo tras '[' o '[!' es parte de la clase
+            start = i + 2 if pattern[i + 1:i + 2] == '!' else i + 1
+            end = pattern.find(']', start + 1 if pattern[start:start + 1] == ']' else start)
+            if end < 0:
+                out.append(re.escape(char))
+            else:
+                body = pattern[i + 1:end].replace('\\', '\\\\').replace(']', '\\]').replace('[', '\\[')
+                out.append('[^/' + body[1:] + ']' if body.startswith('!') else '[' + body + ']')
+                i = end
+        else:
+            out.append(re.escape(char))
+        i += 1
+    return re.compile(''.join(out) + r'\Z')
+
+
+class ParallelWalker:
+    """
+    Lista árboles de directorios en paralelo.
+
+    - `workers`: hilos totales del pool.
+    - `per_root`: máximo de directorios de una misma raíz en vuelo a la vez.
+    - `exclude`: globs; si contienen '/' se comparan con la ruta completa
+      (ver path_glob), si no, con el nombre (p.ej. 'node_modules', '.git',
+      '/proc'). También valen para las raíces.
+    - `one_file_system`: no cruzar puntos de montaje (como `find -xdev`).
+    """
+
+    def __init__(self, workers=8, per_root=4, exclude=None, one_file_system=False):
+        self.workers = max(1, workers)
+        self.per_root = max(1, per_root)
+        self.exclude = DEFAULT_EXCLUDES if exclude is None else exclude
+        self.one_file_system = one_file_system
+        self._path_globs = [path_glob(g) for g in self.exclude if '/' in g]
+        self._name_globs = [g for g in self.exclude if '/' not in g]
+
+    @classmethod
+    def from_config(cls, config):
+        """Crea un walker a partir de `files.config`."""
+        return cls(
+            workers=config.get('scan_workers', 8),
+            per_root=config.get('scan_per_root', 4),
+            exclude=config.get('scan_exclude'),
+            one_file_system=config.get('one_file_system', False)
+        )
+
+    def is_excluded(self, path, name):
+        for pattern in self._name_globs:
+            if fnmatch.fnmatch(name, pattern):
+                return True
+        for pattern in self._path_globs:
+            if pattern.match(path):
+                return True
+        return False
+
+    def walk(self, roots, match=None, reuse=None, with_stats=True, deadline=None, cancelled=None):
+        """
+        Genera un DirListing por cada directorio (en orden de finalización).
+
+        - `match(name)`: filtro de archivos; los que no pasan no se stat-ean.
+        - `reuse(path, mtime)`: si devuelve un listado previo
+          (lista de subdirectorios), el directorio no se vuelve a leer.
+        - `with_stats`: si es False, `files` lleva None en vez del stat.
+        - `deadline` (time.monotonic) y `cancelled` (threading.Event): el
+          recorrido termina aunque un listado se haya quedado colgado
+          (p.ej. un montaje NFS caído); ese hilo se abandona.
+        """
+        results = queue.Queue()
+        pending = {}
+        inflight = {}
+        devices = {}
+
+        for raw in roots:
+            root = os.path.expanduser(raw)
+            if root in pending or self.is_excluded(root, os.path.basename(root.rstrip(os.sep))):
+                continue
+            try:
+                devices[root] = os.stat(root).st_dev
+            except OSError:
+                continue
+            pending[root] = deque([root])
+            inflight[root] = 0
+
+        pool = ThreadPoolExecutor(max_workers=self.workers)
+        total = 0
+        try:
+            while True:
+                # Reparto round-robin entre raíces respetando los límites
+                progress = True
+                while progress and total < self.workers:
+                    progress = False
+                    for root, dirs in pending.items():
+                        if dirs and inflight[root] < self.per_root and total < self.workers:
+                            path = dirs.popleft()
+                            pool.submit(self._task, results, root, path, devices[root], match, reuse, with_stats)
+                            inflight[root] += 1
+                            total += 1
+                            progress = True
+
+                if not total:
+                    break
+
+                try:
+                    root, listing = results.get(timeout=POLL_INTERVAL)
+                except queue.Empty:
+                    if cancelled is not None and cancelled.is_set():
+                        return
+                    if deadline is not None and time.monotonic() >= deadline:
+                        return
+                    continue
+                inflight[root] -= 1
+                total -= 1
+                if listing is None:
+                    continue
+                pending[root].extend(os.path.join(listing.path, name) for name in listing.subdirs)
+                yield listing
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def _task(self, results, root, path, device, match, reuse, with_stats):
+        try:
+            listing = self.list_dir(path, match, reuse, with_stats, device)
+        except Exception:
+            listing = None
+        results.put((root, listing))
+
+    def list_dir(self, path, match=None, reuse=None, with_stats=True, device=None):
+        """Lista un único directorio (sin recursión). None si no se puede leer."""
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        if self.one_file_system and device is not None and st.st_dev != device:
+            return None
+
+        if reuse:
+            subdirs = reuse(path, st.st_mtime)
+            if subdirs is not None:
+                subdirs = [n for n in subdirs if not self.is_excluded(os.path.join(path, n), n)]
+                return DirListing(path, st.st_mtime, None, subdirs)
+
+        files = []
+        subdirs = []
+        try:
+            with os.scandir(path) as it:
+                for entry in it:
+                    name = entry.name
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            if not self.is_excluded(entry.path, name):
+                                subdirs.append(name)
+                            continue
+                        if not entry.is_file():
+                            continue
+                        if match and not match(name):
+                            continue
+                        if self.is_excluded(entry.path, name):
+                            continue
+                        # En Linux es un stat() por archivo (el DirEntry solo trae el
+                        # tipo); por eso los directorios sin cambios se reutilizan
+                        files.append((name, entry.stat() if with_stats else None))
+                    except OSError:
+                        continue  # Permission error etc
+        except OSError:
+            return None
+        return DirListing(path, st.st_mtime, files, subdirs)
+
+    def search(self, roots, target, max_results=50):
+        """Búsqueda en vivo por nombre (sin índice); devuelve la lista completa."""
+        return list(LiveSearch(self, roots, target, max_results=max_results))
+
+
+def name_matcher(target):
+    """Coincidencia sin distinguir mayúsculas: glob si `target` lleva
+    comodines, subcadena en otro caso."""
+    needle = target.lower()
+    if any(c in needle for c in '*?['):
+        return lambda name: fnmatch.fnmatch(name.lower(), needle)
+    return lambda name: needle in name.lower()
+
+
+class LiveSearch:
+    """
+    Búsqueda en vivo por nombre que entrega resultados según aparecen.
+
+    Se itera para obtener rutas. Para al llegar a `max_results`, al pasar
+    `timeout` segundos o al llamar a `cancel()` desde otro hilo. Cada
+    `progress_every` segundos llama a `on_progress(self)`. `match(nombre)`
+    sustituye al criterio por defecto (ver name_matcher).
+    """
+
+    def __init__(self, walker, roots, target, max_results=50, timeout=None,
+                 on_progress=None, progress_every=1.0, match=None):
+        self.walker = walker
+        self.roots = roots
+        self.target = target
+        self.match = match or name_matcher(target)
+        self.max_results = max_results
+        self.timeout = timeout
+        self.on_progress = on_progress
+        self.progress_every = progress_every
+        self.cancelled = threading.Event()
+        self.timed_out = False
+        self.dirs = 0
+        self.found = 0
+
+    def cancel(self):
+        self.cancelled.set()
+
+    @property
+    def finished_early(self):
+        return self.timed_out or self.cancelled.is_set() or self.found >= self.max_results
+
+    def __iter__(self):
+        start = time.monotonic()
+        deadline = start + self.timeout if self.timeout else None
+        next_progress = start + self.progress_every
+        walk = self.walker.walk(self.roots, match=self.match, with_stats=False,
+                                deadline=deadline, cancelled=self.cancelled)
+        try:
+            for listing in walk:
+                if self.cancelled.is_set():
+                    return
+                self.dirs += 1
+                for name, _ in listing.files:
+                    self.found += 1
+                    yield os.path.join(listing.path, name)
+                    if self.found >= self.max_results or self.cancelled.is_set():
+                        return
+
+                now = time.monotonic()
+                if deadline and now >= deadline:
+                    self.timed_out = True
+                    return
+                if self.on_progress and now >= next_progress:
+                    next_progress = now + self.progress_every
+                    self.on_progress(self)
+            # El recorrido también corta solo si un listado no vuelve a tiempo
+            if deadline and time.monotonic() >= deadline:
+                self.timed_out = True
+        finally:
+            walk.close()
@@ -0,0 +1,265 @@
+"""
+Actualización del índice de archivos en tiempo real con inotify (Linux).
+
+Usa la API de inotify de libc mediante ctypes, sin dependencias externas.
+Los eventos se agrupan durante `watch_coalesce` segundos y se aplican al
+índice por lotes (solo se releen los directorios afectados). Si se agota
+el límite de watches (fs.inotify.max_user_watches) no se intenta ninguno
+más: el subárbol del antepasado vigilado más cercano se reescanea
+periódicamente.
+"""
+import os
+import time
+import errno
+import select
+import struct
+import ctypes
+import ctypes.util
+import threading
+from .file_index import is_under
+
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+
+WATCH_MASK = (IN_CLOSE_WRITE | IN_ATTRIB | IN_MOVED_FROM | IN_MOVED_TO |
+              IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR)
+
+EVENT_HEADER = struct.Struct('iIII')
+
+
+class InotifyUnavailable(Exception):
+    pass
+
+
+class IndexWatcher:
+    """
+    Vigila los directorios del índice y le aplica los cambios por lotes.
+
+    El escaneo periódico de FilesSkill sigue funcionando como red de
+    seguridad (eventos perdidos, cambios mientras el asistente estaba parado).
+    """
+
+    def __init__(self, index, logger, coalesce=2.0, poll_interval=600):
+        self.index = index
+        self.logger = logger
+        self.coalesce = coalesce
+        self.poll_interval = poll_interval
+
+        libc_name = ctypes.util.find_library('c') or 'libc.so.6'
+        try:
+            self.libc = ctypes.CDLL(libc_name, use_errno=True)
+            self.libc.inotify_init1
+        except (OSError, AttributeError):
+            raise InotifyUnavailable("inotify no está disponible en este sistema")
+
+        self.fd = self.libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise InotifyUnavailable(os.strerror(ctypes.get_errno()))
+
+        self.watches = {}   # wd -> path
+        self.paths = {}     # path -> wd
+        self.polled = set() # subárboles sin watch (límite agotado)
+        self.exhausted = False
+        self.rescan = threading.Event()
+        self.running = False
+        self.reader = None
+        self.pending = set()
+        self.pending_since = None
+        self.full_rescan = False
+
+    def start(self):
+        self.running = True
+        for folder in sorted(self.index.dirs):
+            self.add_watch(folder)
+        if self.polled:
+            self.logger.warning(
+                f"inotify watch limit reached; polling {len(self.polled)} subtrees every {self.poll_interval}s."
+            )
+        self.logger.info(f"File watcher started ({len(self.watches)} directories).")
+        self.reader = threading.Thread(target=self._read_loop, daemon=True)
+        self.reader.start()
+        threading.Thread(target=self._poll_loop, daemon=True).start()
+        threading.Thread(target=self._rescan_loop, daemon=True).start()
+
+    def stop(self):
+        """Para los hilos y cierra el fd de inotify (lo cierra el lector al salir de select)."""
+        self.running = False
+        if self.reader is None:
+            self._close()
+        else:
+            self.reader.join(timeout=self.coalesce + 2)
+
+    def _close(self):
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+    def add_watch(self, folder):
+        if folder in self.paths or self._is_polled(folder):
+            return
+        if self.exhausted:
+            self._poll(folder)
+            return
+        wd = self.libc.inotify_add_watch(self.fd, os.fsencode(folder), WATCH_MASK)
+        if wd < 0:
+            err = ctypes.get_errno()
+            if err == errno.ENOSPC:
+                # Sin watches libres: no se pide ninguno más, todo lo que falta se sondea
+                self.exhausted = True
+                self._poll(folder)
+            elif err not in (errno.ENOENT, errno.EACCES, errno.ENOTDIR):
+                self.logger.error(f"inotify_add_watch({folder}) failed: {os.strerror(err)}")
+            return
+        # Un directorio renombrado conserva su wd: se actualiza la ruta
+        previous = self.watches.get(wd)
+        if previous is not None and previous != folder:
+            self.paths.pop(previous, None)
+        self.watches[wd] = folder
+        self.paths[folder] = wd
+
+    def _is_polled(self, folder):
+        """True si `folder` está dentro de algún subárbol sondeado (mira sus antepasados)."""
+        while folder not in self.polled:
+            parent = os.path.dirname(folder)
+            if parent == folder:
+                return False
+            folder = parent
+        return True
+
+    def _poll(self, folder):
+        """
+        Pasa a sondeo el subárbol del antepasado vigilado más cercano, así
+        todos los hermanos sin watch comparten una sola raíz.
+        """
+        root = os.path.dirname(folder)
+        while root not in self.paths and os.path.dirname(root) != root:
+            root = os.path.dirname(root)
+        if root not in self.paths:
+            root = folder
+        self.polled = {p for p in self.polled if not is_under(p, [root])}
+        self.polled.add(root)
+
+    def _forget(self, wd):
+        folder = self.watches.pop(wd, None)
+        if folder is not None and self.paths.get(folder) == wd:
+            del self.paths[folder]
+
+    def _read_loop(self):
+        try:
+            self._read_events()
+        finally:
+            self._close()
+
+    def _read_events(self):
+        while self.running:
+            timeout = None
+            if self.pending_since is not None:
+                timeout = max(0, self.pending_since + self.coalesce - time.time())
+            readable, _, _ = select.select([self.fd], [], [], timeout if timeout is not None else 1.0)
+            if readable:
+                try:
+                    data = os.read(self.fd, 64 * 1024)
+                except BlockingIOError:
+                    data = b''
+                self._parse(data)
+
+            if self.pending_since is not None and time.time() - self.pending_since >= self.coalesce:
+                self._flush()
+
+    def _parse(self, data):
+        offset = 0
+        while offset + EVENT_HEADER.size <= len(data):
+            wd, mask, _cookie, length = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            name = os.fsdecode(data[offset:offset + length].rstrip(b'\0'))
+            offset += length
+
+            if mask & IN_Q_OVERFLOW:
+                self.full_rescan = True
+                self._mark(None)
+                continue
+
+            folder = self.watches.get(wd)
+            if folder is None:
+                continue
+            if mask & IN_IGNORED:
+                self._forget(wd)
+                continue
+            if mask & IN_MOVE_SELF and not os.path.isdir(folder):
+                # Movido fuera de las rutas vigiladas
+                self.libc.inotify_rm_watch(self.fd, wd)
+                continue
+            if mask & (IN_DELETE_SELF | IN_MOVE_SELF):
+                # Lo da de baja el evento del directorio padre
+                continue
+
+            self._mark(folder)
+            if mask & IN_ISDIR and mask & (IN_CREATE | IN_MOVED_TO):
+                self._watch_tree(os.path.join(folder, name))
+
+    def _watch_tree(self, folder):
+        # El watch se pone antes de listar: lo que se cree después genera evento
+        walker = self.index.walker()
+        stack = [folder]
+        while stack:
+            path = stack.pop()
+            self.add_watch(path)
+            if path not in self.paths:
+                continue  # sondeado (o ya no existe): no hace falta bajar
+            listing = walker.list_dir(path, match=lambda name: False, with_stats=False)
+            if listing:
+                stack.extend(os.path.join(path, name) for name in listing.subdirs)
+
+    def _mark(self, folder):
+        if folder is not None:
+            self.pending.add(folder)
+        if self.pending_since is None:
+            self.pending_since = time.time()
+
+    def _flush(self):
+        folders = self.pending
+        full = self.full_rescan
+        self.pending = set()
+        self.pending_since = None
+        self.full_rescan = False
+        try:
+            if full:
+                # En otro hilo: el lector tiene que seguir vaciando la cola de inotify
+                self.logger.warning("inotify queue overflow; running a full incremental scan.")
+                self.rescan.set()
+            elif folders:
+                changed, removed = self.index.refresh_dirs(sorted(folders))
+                if changed or removed:
+                    self.logger.info(f"File watcher: {changed} new/changed, {removed} removed.")
+        except Exception as e:
+            self.logger.error(f"File watcher error: {e}")
+
+    def _rescan_loop(self):
+        """Escaneos completos pedidos por desbordamiento; si llega otro durante uno, se repite."""
+        while self.running:
+            if not self.rescan.wait(1.0):
+                continue
+            self.rescan.clear()
+            try:
+                self.index.update()
+            except Exception as e:
+                self.logger.error(f"File watcher rescan error: {e}")
+
+    def _poll_loop(self):
+        while self.running:
+            time.sleep(self.poll_interval)
+            if self.polled:
+                try:
+                    self.index.update(roots=sorted(self.polled))
+                except Exception as e:
+                    self.logger.error(f"Error polling unwatched subtrees: {e}")